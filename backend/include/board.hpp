@@ -1,11 +1,18 @@
 #pragma once
 #include "piece.hpp"
+#include <array>
 #include <vector>
 #include <string>
 
 class Board {
 public:
     static const int BOARD_SIZE = 9;
+    static const int CELLS = BOARD_SIZE * BOARD_SIZE;
+    // Фігура ходить максимум на 8 клітинок по рядку і 8 по стовпцю
+    static const int MAX_PIECE_MOVES = 16;
+    // Верхня межа захоплених за один хід: 4 напрямки по 7 клітинок
+    static const int MAX_CAPTURES = 28;
+
     Board();
     
     bool isValidPosition(const Position& pos) const;
@@ -14,11 +21,61 @@ public:
     bool movePiece(const Position& from, const Position& to);
     std::vector<Position> getValidMoves(const Position& from) const;  // Тільки одне оголошення
     std::vector<Position> checkCaptures(const Position& lastMove);
+    // Варіанти без виділення пам'яті: пишуть у буфер викликача і повертають кількість.
+    // out має вміщати MAX_PIECE_MOVES / MAX_CAPTURES позицій відповідно.
+    int generateMoves(const Position& from, Position* out) const;
+    int findCaptures(const Position& lastMove, Position* out) const;
     std::string serialize() const;
+    // Пише 81 байт (по рядках) у буфер викликача: 0 - порожньо, 1 - чорна, 2 - біла
+    void toBytes(uint8_t* out) const;
+    // Зворотне до toBytes; false, якщо є значення поза EMPTY/BLACK/WHITE
+    bool fromBytes(const uint8_t* data);
     bool deserialize(const std::string& data);
     void initializeBoard();
+    // Zobrist-ключ розстановки фігур, оновлюється інкрементально в setPieceAt
+    uint64_t getHash() const;
+
+    // Карти рухливості й загроз. setPieceAt оновлює маски зайнятості рядка і стовпця
+    // клітинки і позначає ці дві лінії зміненими; рухливість фігури і досяжність
+    // клітинки - O(1) з масок, кількість ходів сторони перераховує лише змінені лінії.
+    // Загрози виводяться з досяжності одним проходом по лініях і кешуються до
+    // наступної зміни дошки.
+    // Кількість ходів фігури на pos (0 для порожньої клітинки)
+    int getMobility(const Position& pos) const;
+    // Скільки фігур кольору color можуть одним ходом стати на порожню клітинку pos
+    int getReach(const Position& pos, PieceColor color) const;
+    // Усі ходи кольору color (сума рухливості його фігур)
+    int getSideMobility(PieceColor color) const;
+    // Чи може суперник захопити фігуру на pos своїм наступним ходом
+    bool isThreatened(const Position& pos) const;
+    // Скільки фігур кольору color під загрозою захоплення наступним ходом
+    int getThreatenedCount(PieceColor color) const;
+    // По 81 байту в порядку toBytes: рухливість фігур, досяжність для color, загрози (0/1)
+    void mobilityMap(uint8_t* out) const;
+    void reachMap(PieceColor color, uint8_t* out) const;
+    void threatMap(uint8_t* out) const;
 
 private:
-    std::vector<std::vector<Piece>> board;
+    // Плоский масив 9x9 по рядках: індекс = row * BOARD_SIZE + col
+    std::array<PieceColor, CELLS> cells;
+    uint64_t hash = 0;
+    // Біт col у rowMask[колір - 1][row] і біт row у colMask[колір - 1][col] - фігура на клітинці
+    uint16_t rowMask[2][BOARD_SIZE];
+    uint16_t colMask[2][BOARD_SIZE];
+    // Ходів кольору вздовж рядка / стовпця і їх сума; актуальні для ліній поза dirty*
+    mutable uint8_t rowMoves[2][BOARD_SIZE];
+    mutable uint8_t colMoves[2][BOARD_SIZE];
+    mutable int sideMobility[2] = {0, 0};
+    mutable uint16_t dirtyRows = 0;
+    mutable uint16_t dirtyCols = 0;
+    mutable std::array<uint8_t, CELLS> threats;
+    mutable int threatenedCount[2] = {0, 0};
+    mutable bool threatsValid = false;
     bool isPathClear(const Position& from, const Position& to) const;
-};
\ No newline at end of file
+    void recomputeHash();
+    void recomputeMaps();
+    void updateMaps(int square, PieceColor oldColor, PieceColor newColor);
+    void updateLineMoves(const uint16_t* masks, uint8_t* moves, int line) const;
+    void flushLineMoves() const;
+    void computeThreats() const;
+};
@@ -5,19 +5,104 @@
     #define EXPORT __declspec(dllexport)
 #else
     #define EXPORT
+    // Угода виклику __stdcall існує лише на Windows; деінде вона не потрібна
+    #ifndef __stdcall
+        #define __stdcall
+    #endif
 #endif
 
 #include "game.hpp"
 #include "types.hpp"
 
+#define SEARCH_MAX_PV 64
+#define MOVE_MAX_CAPTURES 28
+
 #ifdef __cplusplus
 extern "C" {
 #endif
 
+// Результат makeMoveEx: усе, що змінилось після ходу, за один виклик.
+// Клітинки - індекси row * 9 + col; кольори - як у PieceColor (0, 1, 2).
+struct MoveResult {
+    int piece;
+    int from;
+    int to;
+    int capturedCount;
+    unsigned char captured[MOVE_MAX_CAPTURES];
+    int blackCaptured;
+    int whiteCaptured;
+    int currentPlayer;
+    int gameOver;
+    int winner;
+};
+
+// Результат searchBestMove; хід і головна варіація (pv) - індекси клітинок row * 9 + col
+struct SearchInfo {
+    int fromRow;
+    int fromCol;
+    int toRow;
+    int toCol;
+    int score;
+    int depth;
+    long long nodes;
+    long long nodesPerSecond;
+    int elapsedMs;
+    int pvLength;
+    unsigned char pv[2 * SEARCH_MAX_PV];
+};
+
+// Результат mctsSearch; статистика ходів кореня пишеться окремо в масив MctsMoveInfo
+struct MctsInfo {
+    int fromRow;
+    int fromCol;
+    int toRow;
+    int toCol;
+    long long playouts;
+    long long playoutsPerSecond;
+    int elapsedMs;
+    int treeNodes;
+    int reusedVisits;
+    int rootMoveCount;
+};
+
+// Хід кореня MCTS: клітинки - індекси row * 9 + col; value - середній результат
+// для гравця, що ходить (1 - виграш, 0 - програш)
+struct MctsMoveInfo {
+    int from;
+    int to;
+    int visits;
+    double value;
+};
+
+// Кожна гра - незалежний дескриптор із власними буферами результатів:
+// рядки від getBoardState/getValidMoves дійсні до наступного виклику для тієї ж гри.
+// Різні ігри можна використовувати з різних потоків; одну гру - лише з одного.
 EXPORT void* __stdcall createGame(void);
+// Нова незалежна гра з копією стану (позиція, історія, ліміт повторень), без рушія пошуку
+EXPORT void* __stdcall cloneGame(void* game);
+// Копіює стан гри src у dst, зберігаючи рушій пошуку і налаштування dst
+EXPORT void __stdcall copyGame(void* dst, const void* src);
 EXPORT void __stdcall deleteGame(void* game);
 EXPORT bool __stdcall makeMove(void* game, int fromRow, int fromCol, int toRow, int toCol);
+// makeMove + дельта ходу в result (якщо не NULL); false - хід неможливий
+EXPORT bool __stdcall makeMoveEx(void* game, int fromRow, int fromCol, int toRow, int toCol,
+                                 MoveResult* result);
+// Грає count ходів по 2 байти (from, to), як у getAllLegalMoves, за один виклик.
+// deltas (count MoveResult) отримує дельту кожного ходу, branching (count int) - кількість
+// ходів у позиції перед ним; обидва можна передати як NULL. Зупиняється на першому
+// неможливому ході і повертає кількість зіграних.
+EXPORT int __stdcall replayMoves(void* game, const unsigned char* moves, int count,
+                                 MoveResult* deltas, int* branching);
 EXPORT const char* __stdcall getBoardState(void* game);
+// Бінарний знімок дошки: 81 байт у буфер викликача + хто ходить і рахунок захоплень.
+// Будь-який з int* можна передати як NULL.
+EXPORT bool __stdcall getBoardSnapshot(void* game, unsigned char* cells, int* currentPlayer,
+                                       int* blackCaptured, int* whiteCaptured);
+// Карти рухливості й загроз: maps - 4 * 81 байт (рухливість фігур, скільки чорних
+// і скільки білих фігур можуть стати на порожню клітинку, 1 - фігуру можна захопити
+// наступним ходом), totals - 4 int (ходів у чорних, у білих, чорних і білих фігур під
+// загрозою). Будь-який вказівник можна передати як NULL.
+EXPORT bool __stdcall getBoardMaps(void* game, unsigned char* maps, int* totals);
 EXPORT int __stdcall getCurrentPlayer(void* game);
 EXPORT bool __stdcall isGameOver(void* game);
 EXPORT int __stdcall getBlackCaptured(void* game);
@@ -25,8 +110,64 @@ EXPORT int __stdcall getWhiteCaptured(void* game);
 EXPORT bool __stdcall saveGame(void* game, const char* filename);
 EXPORT bool __stdcall loadGame(void* game, const char* filename);
 EXPORT void __stdcall startNewGame(void* game);
+// 0 - немає переможця (гра триває або нічия), 1 - чорні, 2 - білі
+EXPORT int __stdcall getWinner(void* game);
+EXPORT unsigned long long __stdcall getPositionHash(void* game);
+// Найменший ключ серед симетричних варіантів позиції (zobrist::canonicalHash);
+// symmetry, якщо не NULL, отримує перетворення 0..3, що дає цей ключ
+EXPORT unsigned long long __stdcall getCanonicalHash(void* game, int* symmetry);
+EXPORT int __stdcall getRepetitionCount(void* game);
+// Нічия після limit повторень позиції; 0 вимикає правило
+EXPORT void __stdcall setRepetitionLimit(void* game, int limit);
+EXPORT bool __stdcall undoMove(void* game);
+EXPORT bool __stdcall redoMove(void* game);
+EXPORT int __stdcall getHistoryLength(void* game);
+EXPORT int __stdcall getRedoLength(void* game);
 // Додаємо новий метод для отримання можливих ходів
 EXPORT const char* __stdcall getValidMoves(void* game, int row, int col);
+// Усі ходи поточного гравця за один виклик: по 2 байти на хід (from, to),
+// індекс клітинки = row * 9 + col. Повертає кількість записаних ходів.
+EXPORT int __stdcall getAllLegalMoves(void* game, unsigned char* out, int maxMoves);
+
+// Історія партії для архівів: зіграні ходи по 2 байти (from, to), як у getAllLegalMoves.
+// Повертає кількість записаних ходів; з out == NULL - повну довжину історії.
+EXPORT int __stdcall getMoveHistory(void* game, unsigned char* out, int maxMoves);
+// Позиція, з якої почалась історія (початкова або завантажена), у форматі getBoardSnapshot
+EXPORT bool __stdcall getStartSnapshot(void* game, unsigned char* cells, int* currentPlayer,
+                                       int* blackCaptured, int* whiteCaptured);
+// Встановлює позицію з 81 байта і очищує історію; false, якщо дані некоректні
+EXPORT bool __stdcall setPosition(void* game, const unsigned char* cells, int currentPlayer,
+                                  int blackCaptured, int whiteCaptured);
+
+// Пошук найкращого ходу для поточного гравця: depth - максимальна глибина,
+// ms - ліміт часу (0 - без ліміту). Повертає false, якщо ходів немає.
+EXPORT bool __stdcall searchBestMove(void* game, int depth, int ms, SearchInfo* info);
+// Проміжні результати searchBestMove (після кожної ітерації і приблизно раз на 100 мс).
+// Викликається з потоку пошуку; NULL вимикає. Звичайна угода виклику C (не __stdcall).
+typedef void (*SearchProgressCallback)(const SearchInfo* info, void* userData);
+EXPORT void __stdcall setSearchProgressCallback(void* game, SearchProgressCallback callback,
+                                                void* userData);
+// Зупинка пошуку з будь-якого потоку: поточний і наступні searchBestMove повертають
+// найкращий уже знайдений хід, доки прапорець не скинуто clearSearchStop
+EXPORT void __stdcall stopSearch(void* game);
+EXPORT void __stdcall clearSearchStop(void* game);
+// Налаштування пошуку для конкретної гри (у кожної гри своя таблиця транспозицій)
+EXPORT void __stdcall setSearchHashSize(void* game, int sizeMb);
+EXPORT void __stdcall setSearchNodeLimit(void* game, long long maxNodes);
+
+// MCTS (UCT) для поточного гравця: playouts - бюджет розіграшів, ms - часу (обидва 0 - 1 с),
+// threads - потоків, batch - розіграшів на листок. Дерево зберігається між викликами
+// для тієї ж гри. У moves пише до maxMoves ходів кореня за спаданням відвідувань.
+// Зупиняється також через stopSearch. Повертає false, якщо ходів немає.
+EXPORT bool __stdcall mctsSearch(void* game, long long playouts, int ms, int threads, int batch,
+                                 MctsInfo* info, MctsMoveInfo* moves, int maxMoves);
+// Бюджет пам'яті пулу вузлів MCTS (МБ); скидає дерево
+EXPORT void __stdcall setMctsMemory(void* game, int sizeMb);
+
+// Оцінка поточної позиції за ендшпільними таблицями (файл hasami_tbgen, відображений
+// у пам'ять викликачем: data, size). Повертає -1, якщо позиції немає в таблицях,
+// інакше 0 - нічия, 1 - виграш, 2 - програш для того, хто ходить; distance - півходів до кінця.
+EXPORT int __stdcall probeTablebase(void* game, const unsigned char* data, long long size, int* distance);
 
 #ifdef __cplusplus
 }
@@ -9,25 +9,74 @@ struct Move {
     Position to;
 };
 
+// Компактний запис для скасування ходу: клітинки ходу і захоплених фігур.
+// Колір захоплених, лічильники і чергу ходу відновлюємо з кольору фігури на "to".
+struct UndoRecord {
+    static const int MAX_CAPTURES = Board::MAX_CAPTURES;
+    uint8_t from;
+    uint8_t to;
+    uint8_t capturedCount;
+    uint8_t captured[MAX_CAPTURES];
+};
+
 class Game {
 public:
+    // Верхня межа кількості ходів у будь-якій позиції: 81 клітинка * 16 напрямків-кроків
+    static const int MAX_LEGAL_MOVES = Board::BOARD_SIZE * Board::BOARD_SIZE * 16;
+
     Game();
+    // Нова гра зі збереженням налаштувань (ліміт повторень)
+    void reset();
     bool makeMove(const Position& from, const Position& to);
+    // Скасовує останній хід за UndoRecord без копіювання Game (для пошуку й аналізу)
+    bool unmakeMove();
+    // Undo/redo для гравця: undoMove кладе хід у стек redo, новий makeMove його очищує
+    bool undoMove();
+    bool redoMove();
+    int getHistoryLength() const;
+    // Запис останнього ходу (клітинки ходу і захоплених) або nullptr, якщо ходів не було
+    const UndoRecord* getLastMove() const;
+    int getRedoLength() const;
     PieceColor getCurrentPlayer() const;
     bool isGameOver() const;
+    // BLACK/WHITE - переможець, NONE - гра триває або нічия за повторенням
+    PieceColor getWinner() const;
+    // 64-бітний Zobrist-ключ позиції з урахуванням того, хто ходить
+    uint64_t getPositionHash() const;
+    // Скільки разів поточна позиція вже траплялась (враховуючи поточну)
+    int getRepetitionCount() const;
+    // Гра закінчується нічиєю, коли позиція повторилась limit разів; 0 - вимкнено
+    void setRepetitionLimit(int limit);
+    int getRepetitionLimit() const;
     int getBlackCaptured() const;
     int getWhiteCaptured() const;
     bool save(const std::string& filename) const;
     bool load(const std::string& filename);
+    // Довільна позиція (81 байт як у getBoardBytes) стає початком нової історії
+    bool setPosition(const uint8_t* cells, PieceColor player, int black, int white);
+    // Зіграні ходи від початку історії; пише не більше maxMoves у out, повертає кількість
+    int getMoveHistory(Move* out, int maxMoves) const;
     std::string getBoardState() const;
+    void getBoardBytes(uint8_t* out) const;
     PieceColor getPieceAt(const Position& pos) const;
+    // Дошка для запитів до карт рухливості й загроз (Board::getMobility тощо)
+    const Board& getBoard() const;
     std::vector<Position> getValidMoves(const Position& pos) const;  // Новий метод
+    // Усі ходи поточного гравця; пише не більше maxMoves у out, повертає кількість
+    int getAllLegalMoves(Move* out, int maxMoves) const;
+    // Ходи фігури з from без виділення пам'яті (як Board::generateMoves), out - MAX_PIECE_MOVES
+    int generateMoves(const Position& from, Position* out) const;
 
 private:
     Board board;
     PieceColor currentPlayer;
-    std::vector<Move> moveHistory;
+    std::vector<UndoRecord> moveHistory;
+    std::vector<Move> redoMoves;
+    // Ключі позицій: [0] - початкова, [i + 1] - після moveHistory[i]
+    std::vector<uint64_t> positionHistory;
     int blackCaptured;
     int whiteCaptured;
+    int repetitionLimit;
     void switchPlayer();
+    bool applyMove(const Position& from, const Position& to);
 };
\ No newline at end of file
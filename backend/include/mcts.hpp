@@ -0,0 +1,85 @@
+// backend/include/mcts.hpp
+#pragma once
+#include "game.hpp"
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+struct MctsLimits {
+    uint64_t maxPlayouts = 0;  // 0 - без обмеження кількості розіграшів
+    int timeMs = 0;            // 0 - без обмеження часу (якщо обидва 0 - 1000 мс)
+    int threads = 1;
+    int batch = 1;             // розіграшів з одного листка за одне проходження дерева
+    // Зовнішня зупинка з іншого потоку; nullptr - не використовується
+    const std::atomic<bool>* stop = nullptr;
+};
+
+struct MctsMoveStat {
+    Move move;
+    uint32_t visits;
+    double value;  // середній результат для гравця, що ходить у корені: 1 - виграш, 0 - програш
+};
+
+struct MctsResult {
+    bool hasMove = false;
+    Move bestMove{};              // хід кореня з найбільшою кількістю відвідувань
+    uint64_t playouts = 0;
+    uint64_t iterations = 0;      // проходжень дерева (кожне - batch розіграшів)
+    int elapsedMs = 0;
+    uint64_t playoutsPerSecond = 0;
+    uint32_t treeNodes = 0;
+    uint32_t reusedVisits = 0;    // відвідування кореня, успадковані з попереднього пошуку
+    std::vector<MctsMoveStat> rootMoves;
+};
+
+// Паралельний MCTS (UCT) з віртуальною втратою, спільним деревом для всіх потоків
+// і пулом вузлів фіксованого розміру. Дерево переживає пошук: якщо наступна
+// позиція - нащадок попереднього кореня (до двох ходів), його піддерево стає новим коренем.
+class Mcts {
+public:
+    static const int ROLLOUT_PLIES = 40;  // далі розіграш оцінюємо за рахунком захоплень
+    static const int REUSE_PLIES = 2;
+
+    explicit Mcts(size_t memoryMb = 64);
+    void setMemory(size_t memoryMb);
+    void clear();
+    MctsResult search(const Game& game, const MctsLimits& limits);
+
+    // Вузли зберігаються в одному масиві; діти вузла - суцільний блок [firstChild, +childCount)
+    struct Node {
+        std::atomic<uint32_t> visits{0};   // разом з віртуальними втратами потоків, що в дорозі
+        std::atomic<uint32_t> reward{0};   // у півочках для гравця, що зробив хід у цей вузол
+        std::atomic<uint8_t> state{0};     // UNEXPANDED / EXPANDING / EXPANDED
+        uint8_t from = 0;
+        uint8_t to = 0;
+        uint16_t childCount = 0;
+        uint32_t firstChild = 0;
+    };
+
+private:
+    enum State : uint8_t { UNEXPANDED, EXPANDING, EXPANDED };
+
+    // Два пули: під час перевикористання дерева піддерево копіюється в запасний
+    std::unique_ptr<Node[]> nodes;
+    std::unique_ptr<Node[]> spare;
+    uint32_t capacity = 0;
+    std::atomic<uint32_t> used{0};
+    Game rootGame;
+    bool hasTree = false;
+
+    MctsLimits limits;
+    std::chrono::steady_clock::time_point startTime;
+    std::atomic<uint64_t> iterations{0};
+    std::atomic<uint64_t> playouts{0};
+    std::atomic<bool> stopped{false};
+
+    void resetTree(const Game& game);
+    bool reuseTree(const Game& game);
+    void compact(uint32_t newRoot);
+    bool expand(Node& node, const Game& game);
+    void worker(uint64_t seed);
+    bool checkLimits(uint64_t done);
+    int elapsedMs() const;
+};
@@ -0,0 +1,98 @@
+// backend/include/search.hpp
+#pragma once
+#include "game.hpp"
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <functional>
+#include <vector>
+
+struct SearchResult;
+
+struct SearchLimits {
+    int maxDepth = 6;
+    int timeMs = 0;         // 0 - без обмеження часу
+    uint64_t maxNodes = 0;  // 0 - без обмеження вузлів
+    // Зовнішня зупинка з іншого потоку; nullptr - не використовується
+    const std::atomic<bool>* stop = nullptr;
+    // Проміжний результат: після кожної завершеної ітерації і не частіше
+    // ніж раз на progressIntervalMs між ними (з потоку пошуку)
+    std::function<void(const SearchResult&)> onProgress;
+    int progressIntervalMs = 100;
+};
+
+struct SearchResult {
+    bool hasMove = false;
+    Move bestMove{};
+    int score = 0;
+    int depth = 0;  // глибина останньої повністю завершеної ітерації
+    uint64_t nodes = 0;
+    int elapsedMs = 0;
+    uint64_t nodesPerSecond = 0;
+    std::vector<Move> pv;
+};
+
+class TranspositionTable {
+public:
+    enum Bound : uint8_t { NONE, EXACT, LOWER, UPPER };
+
+    struct Entry {
+        uint64_t key = 0;
+        int16_t score = 0;
+        int8_t depth = 0;
+        uint8_t bound = NONE;
+        uint8_t from = 0;  // індекси клітинок найкращого ходу (row * 9 + col)
+        uint8_t to = 0;
+    };
+
+    explicit TranspositionTable(size_t sizeMb = 16);
+    void resize(size_t sizeMb);
+    void clear();
+    const Entry* probe(uint64_t key) const;
+    void store(uint64_t key, int depth, int score, Bound bound, const Move& move);
+
+private:
+    std::vector<Entry> entries;
+    size_t mask = 0;
+};
+
+// Кількість позицій-листків на глибині depth (perft) через makeMove/unmakeMove
+uint64_t perft(Game& game, int depth);
+
+// Ітеративне поглиблення + альфа-бета (negamax) з таблицею транспозицій
+class Searcher {
+public:
+    static const int MAX_PLY = 64;
+    static const int MATE_SCORE = 30000;
+
+    explicit Searcher(size_t hashMb = 16);
+    void setHashSize(size_t sizeMb);
+    void clear();
+    SearchResult search(const Game& game, const SearchLimits& limits);
+
+private:
+    TranspositionTable tt;
+    // Буфери ходів по одному рядку на ply, щоб не виділяти пам'ять у вузлах
+    std::vector<Move> moveStack;
+    std::vector<int> scoreStack;
+    Move killers[MAX_PLY][2];
+    int history[81][81];
+    Move pvTable[MAX_PLY][MAX_PLY];
+    int pvLength[MAX_PLY];
+
+    SearchLimits limits;
+    std::chrono::steady_clock::time_point startTime;
+    uint64_t nodes = 0;
+    bool stopped = false;
+    // Найкращий результат завершених ітерацій - для onProgress
+    SearchResult* current = nullptr;
+    int lastProgressMs = 0;
+
+    int alphaBeta(Game& game, int depth, int ply, int alpha, int beta);
+    int evaluate(const Game& game) const;
+    void orderMoves(const Game& game, Move* moves, int* scores, int count,
+                    const Move& ttMove, int ply) const;
+    bool checkLimits();
+    int elapsedMs() const;
+    void reportProgress(SearchResult& result);
+};
@@ -0,0 +1,47 @@
+// backend/include/tablebase.hpp
+#pragma once
+#include "game.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <string>
+
+// Ендшпільні таблиці: точна оцінка кожної позиції з 1..maxPieces фігурами кожного
+// кольору для того, хто ходить. Перемога - захопити всі фігури суперника (як 9 захоплень
+// у Game, коли рахунок відповідає фігурам на дошці) або лишити його без ходів, як у пошуку.
+// Повторення позицій не враховуються: усе, що не виграється примусово, - нічия.
+//
+// Файл (little-endian):
+//   заголовок 16 байт: "HSTB", u16 версія, u16 maxPieces, u32 кількість таблиць, u32 0
+//   каталог, 24 байти на таблицю: u8 black, u8 white, u16 0, u32 0, u64 зсув даних, u64 позицій
+//   дані: u16 на позицію - біти 14-15 Value, 0-13 відстань до кінця гри в півходах
+// Індекс позиції в таблиці - комбінаторний номер множини чорних клітинок, потім білих
+// серед решти клітинок, потім хто ходить; див. indexOf.
+namespace tablebase {
+    enum Value : uint8_t { DRAW = 0, WIN = 1, LOSS = 2 };
+
+    struct Entry {
+        Value value;
+        int distance;
+    };
+
+    const uint16_t VERSION = 1;
+    const int MAX_PIECES = 4;
+    const int MAX_DISTANCE = (1 << 14) - 1;
+    const size_t HEADER_SIZE = 16;
+    const size_t DIRECTORY_ENTRY_SIZE = 24;
+
+    uint64_t tableSize(int black, int white);
+    // Індекс у таблиці (black, white); клітинки row * 9 + col, кожен список відсортований
+    uint64_t indexOf(const uint8_t* blackSquares, int black, const uint8_t* whiteSquares, int white,
+                     PieceColor side);
+
+    // Генерує таблиці для всіх (black, white) з 1..maxPieces фігур кожного кольору і не
+    // більше maxTotal разом, потоків - threads, і пише їх у path. log отримує рядки прогресу.
+    bool generate(const std::string& path, int maxPieces, int maxTotal, int threads,
+                  const std::function<void(const std::string&)>& log);
+
+    // Оцінка позиції game за файлом у пам'яті (data, size). false - позиції немає в таблицях:
+    // забагато фігур, рахунок захоплень не відповідає дошці, гра закінчена або файл пошкоджений
+    bool probe(const uint8_t* data, size_t size, const Game& game, Entry* out);
+}
@@ -0,0 +1,26 @@
+// backend/include/zobrist.hpp
+#pragma once
+#include "types.hpp"
+#include <cstdint>
+
+class Game;
+
+// Zobrist-ключі позиції: по одному 64-бітному числу на (клітинка, колір) і на хід білих
+namespace zobrist {
+    uint64_t pieceKey(int square, PieceColor color);
+    uint64_t sideKey();
+    // Повний перерахунок ключа позиції (дошка + хто ходить)
+    uint64_t hash(const Game& game);
+
+    // Симетрії правил і початкової позиції: дзеркало зліва направо (MIRROR) і заміна
+    // кольорів з відображенням згори вниз і зміною того, хто ходить (SWAP). Кожне
+    // перетворення обернене саме до себе, тож хід із канонічної позиції повертається тим самим.
+    enum Symmetry : int { IDENTITY = 0, MIRROR = 1, SWAP = 2, MIRROR_SWAP = 3 };
+    const int SYMMETRIES = 4;
+    int transformSquare(int square, int symmetry);
+    PieceColor transformColor(PieceColor color, int symmetry);
+    // Ключ позиції після перетворення symmetry (hash(game) для IDENTITY)
+    uint64_t symmetricHash(const Game& game, int symmetry);
+    // Найменший ключ серед симетричних варіантів; у symmetry - перетворення, що його дає
+    uint64_t canonicalHash(const Game& game, int* symmetry);
+}
@@ -1,24 +1,66 @@
 // backend/src/board.cpp
 #include "board.hpp"
+#include "zobrist.hpp"
+#include <algorithm>
 #include <sstream>
 
-Board::Board() : board(BOARD_SIZE, std::vector<Piece>(BOARD_SIZE)) {
+namespace {
+const int LINE_STATES = 1 << Board::BOARD_SIZE;
+
+// Для маски зайнятості лінії і позиції на ній: скільки порожніх клітинок до першої
+// фігури або краю в бік менших (біти 0-3) і більших (біти 4-7) індексів
+struct LineGaps {
+    uint8_t gaps[LINE_STATES][Board::BOARD_SIZE];
+    // Номер молодшого і старшого біта ненульової маски
+    uint8_t lowestBit[LINE_STATES];
+    uint8_t highestBit[LINE_STATES];
+
+    LineGaps() {
+        for (int mask = 1; mask < LINE_STATES; ++mask) {
+            int low = 0;
+            while (!(mask >> low & 1)) ++low;
+            int high = Board::BOARD_SIZE - 1;
+            while (!(mask >> high & 1)) --high;
+            lowestBit[mask] = static_cast<uint8_t>(low);
+            highestBit[mask] = static_cast<uint8_t>(high);
+        }
+        for (int mask = 0; mask < LINE_STATES; ++mask) {
+            for (int pos = 0; pos < Board::BOARD_SIZE; ++pos) {
+                int low = 0;
+                while (pos - low - 1 >= 0 && !(mask >> (pos - low - 1) & 1)) ++low;
+                int high = 0;
+                while (pos + high + 1 < Board::BOARD_SIZE && !(mask >> (pos + high + 1) & 1)) ++high;
+                gaps[mask][pos] = static_cast<uint8_t>(low | high << 4);
+            }
+        }
+    }
+};
+
+const LineGaps lineGaps;
+
+// Порожніх клітинок у бік менших / більших індексів від pos
+int lowGap(unsigned occupied, int pos) {
+    return lineGaps.gaps[occupied][pos] & 15;
+}
+
+int highGap(unsigned occupied, int pos) {
+    return lineGaps.gaps[occupied][pos] >> 4;
+}
+}
+
+Board::Board() {
     initializeBoard();
 }
 
 void Board::initializeBoard() {
     // Set up initial positions
+    cells.fill(PieceColor::NONE);
     for (int col = 0; col < BOARD_SIZE; col++) {
-        board[0][col] = Piece(PieceColor::BLACK);
-        board[BOARD_SIZE-1][col] = Piece(PieceColor::WHITE);
-    }
-    
-    // Initialize middle rows with empty pieces
-    for (int row = 1; row < BOARD_SIZE-1; row++) {
-        for (int col = 0; col < BOARD_SIZE; col++) {
-            board[row][col] = Piece(PieceColor::NONE);
-        }
+        cells[col] = PieceColor::BLACK;
+        cells[(BOARD_SIZE - 1) * BOARD_SIZE + col] = PieceColor::WHITE;
     }
+    recomputeHash();
+    recomputeMaps();
 }
 
 bool Board::isValidPosition(const Position& pos) const {
@@ -28,12 +70,17 @@ bool Board::isValidPosition(const Position& pos) const {
 
 PieceColor Board::getPieceAt(const Position& pos) const {
     if (!isValidPosition(pos)) return PieceColor::NONE;
-    return board[pos.row][pos.col].getColor();
+    return cells[pos.row * BOARD_SIZE + pos.col];
 }
 
 bool Board::setPieceAt(const Position& pos, PieceColor color) {
     if (!isValidPosition(pos)) return false;
-    board[pos.row][pos.col] = Piece(color);
+    int square = pos.row * BOARD_SIZE + pos.col;
+    if (cells[square] == color) return true;
+    // Інкрементальне оновлення ключа: прибираємо стару фігуру, додаємо нову
+    hash ^= zobrist::pieceKey(square, cells[square]) ^ zobrist::pieceKey(square, color);
+    updateMaps(square, cells[square], color);
+    cells[square] = color;
     return true;
 }
 
@@ -79,81 +126,68 @@ bool Board::movePiece(const Position& from, const Position& to) {
 }
 
 std::vector<Position> Board::getValidMoves(const Position& from) const {
-    std::vector<Position> validMoves;
-    
+    Position moves[MAX_PIECE_MOVES];
+    int count = generateMoves(from, moves);
+    return std::vector<Position>(moves, moves + count);
+}
+
+int Board::generateMoves(const Position& from, Position* out) const {
     // Перевіряємо, чи позиція валідна і чи є там фігура
     if (!isValidPosition(from) || getPieceAt(from) == PieceColor::NONE) {
-        return validMoves;
-    }
-
-    // Перевіряємо всі можливі ходи по горизонталі вправо
-    for (int col = from.col + 1; col < BOARD_SIZE; col++) {
-        Position to{from.row, col};
-        if (getPieceAt(to) == PieceColor::NONE && isPathClear(from, to)) {
-            validMoves.push_back(to);
-        } else {
-            break;  // Зупиняємось при першій перешкоді
-        }
-    }
-
-    // Перевіряємо всі можливі ходи по горизонталі вліво
-    for (int col = from.col - 1; col >= 0; col--) {
-        Position to{from.row, col};
-        if (getPieceAt(to) == PieceColor::NONE && isPathClear(from, to)) {
-            validMoves.push_back(to);
-        } else {
-            break;
-        }
-    }
-
-    // Перевіряємо всі можливі ходи по вертикалі вниз
-    for (int row = from.row + 1; row < BOARD_SIZE; row++) {
-        Position to{row, from.col};
-        if (getPieceAt(to) == PieceColor::NONE && isPathClear(from, to)) {
-            validMoves.push_back(to);
-        } else {
-            break;
-        }
+        return 0;
     }
 
-    // Перевіряємо всі можливі ходи по вертикалі вгору
-    for (int row = from.row - 1; row >= 0; row--) {
-        Position to{row, from.col};
-        if (getPieceAt(to) == PieceColor::NONE && isPathClear(from, to)) {
-            validMoves.push_back(to);
-        } else {
-            break;
+    // Один прохід по кожному променю: вправо, вліво, вниз, вгору.
+    // Зупиняємось при першій перешкоді, тож шлях до кожної клітинки вже вільний.
+    const int directions[][2] = {{0, 1}, {0, -1}, {1, 0}, {-1, 0}};
+    int count = 0;
+    for (const auto& dir : directions) {
+        int row = from.row + dir[0];
+        int col = from.col + dir[1];
+        while (row >= 0 && row < BOARD_SIZE && col >= 0 && col < BOARD_SIZE &&
+               cells[row * BOARD_SIZE + col] == PieceColor::NONE) {
+            out[count++] = {row, col};
+            row += dir[0];
+            col += dir[1];
         }
     }
-
-    return validMoves;
+    return count;
 }
 
 std::vector<Position> Board::checkCaptures(const Position& lastMove) {
-    std::vector<Position> capturedPositions;
+    Position captured[MAX_CAPTURES];
+    int count = findCaptures(lastMove, captured);
+    return std::vector<Position>(captured, captured + count);
+}
+
+int Board::findCaptures(const Position& lastMove, Position* out) const {
     PieceColor currentColor = getPieceAt(lastMove);
     PieceColor oppositeColor = (currentColor == PieceColor::BLACK) ? 
                                PieceColor::WHITE : PieceColor::BLACK;
 
     // Check captures in all four directions
     const int directions[][2] = {{0, 1}, {0, -1}, {1, 0}, {-1, 0}};
+    int count = 0;
     
     for (const auto& dir : directions) {
         Position checkPos{lastMove.row + dir[0], lastMove.col + dir[1]};
-        std::vector<Position> temp;
+        int run = 0;
         
-        while (isValidPosition(checkPos) && getPieceAt(checkPos) == oppositeColor) {
-            temp.push_back(checkPos);
+        while (isValidPosition(checkPos) && cells[checkPos.row * BOARD_SIZE + checkPos.col] == oppositeColor) {
+            run++;
             checkPos.row += dir[0];
             checkPos.col += dir[1];
         }
         
-        if (isValidPosition(checkPos) && getPieceAt(checkPos) == currentColor && !temp.empty()) {
-            capturedPositions.insert(capturedPositions.end(), temp.begin(), temp.end());
+        if (run > 0 && isValidPosition(checkPos) && getPieceAt(checkPos) == currentColor) {
+            // Ряд суперника закритий нашою фігурою - записуємо його
+            for (int i = 1; i <= run; ++i) {
+                out[count++] = {lastMove.row + dir[0] * i, lastMove.col + dir[1] * i};
+            }
         }
     }
 
-    return capturedPositions;
+    return count;
 }
 
 std::string Board::serialize() const {
@@ -162,7 +196,7 @@ std::string Board::serialize() const {
     for (int i = 0; i < BOARD_SIZE; ++i) {
         ss << "[";
         for (int j = 0; j < BOARD_SIZE; ++j) {
-            switch (board[i][j].getColor()) {
+            switch (cells[i * BOARD_SIZE + j]) {
                 case PieceColor::BLACK:
                     ss << "\"B\"";
                     break;
@@ -181,9 +215,30 @@ std::string Board::serialize() const {
     return ss.str();
 }
 
+void Board::toBytes(uint8_t* out) const {
+    for (int i = 0; i < BOARD_SIZE; ++i) {
+        for (int j = 0; j < BOARD_SIZE; ++j) {
+            *out++ = static_cast<uint8_t>(cells[i * BOARD_SIZE + j]);
+        }
+    }
+}
+
+bool Board::fromBytes(const uint8_t* data) {
+    for (int sq = 0; sq < CELLS; ++sq) {
+        if (data[sq] > static_cast<uint8_t>(PieceColor::WHITE)) return false;
+    }
+    for (int sq = 0; sq < CELLS; ++sq) {
+        cells[sq] = static_cast<PieceColor>(data[sq]);
+    }
+    recomputeHash();
+    recomputeMaps();
+    return true;
+}
+
 bool Board::deserialize(const std::string& data) {
-    // Reset board
-    board = std::vector<std::vector<Piece>>(BOARD_SIZE, std::vector<Piece>(BOARD_SIZE));
+    // Розбираємо у тимчасовий масив, щоб невдалий розбір не зіпсував дошку
+    std::array<PieceColor, CELLS> parsed;
+    parsed.fill(PieceColor::NONE);
     
     size_t pos = 1; // Skip first '['
     for (int i = 0; i < BOARD_SIZE; ++i) {
@@ -197,13 +252,13 @@ bool Board::deserialize(const std::string& data) {
             char piece = data[pos];
             switch (piece) {
                 case 'B':
-                    board[i][j] = Piece(PieceColor::BLACK);
+                    parsed[i * BOARD_SIZE + j] = PieceColor::BLACK;
                     break;
                 case 'W':
-                    board[i][j] = Piece(PieceColor::WHITE);
+                    parsed[i * BOARD_SIZE + j] = PieceColor::WHITE;
                     break;
                 case 'E':
-                    board[i][j] = Piece(PieceColor::NONE);
+                    parsed[i * BOARD_SIZE + j] = PieceColor::NONE;
                     break;
                 default:
                     return false;
@@ -218,5 +273,198 @@ bool Board::deserialize(const std::string& data) {
         if (i < BOARD_SIZE - 1) pos++; // Skip ','
     }
     
+    cells = parsed;
+    recomputeHash();
+    recomputeMaps();
     return true;
-}
\ No newline at end of file
+}
+
+uint64_t Board::getHash() const {
+    return hash;
+}
+
+void Board::recomputeHash() {
+    hash = 0;
+    for (int sq = 0; sq < CELLS; ++sq) {
+        hash ^= zobrist::pieceKey(sq, cells[sq]);
+    }
+}
+int Board::getMobility(const Position& pos) const {
+    if (!isValidPosition(pos) || cells[pos.row * BOARD_SIZE + pos.col] == PieceColor::NONE) return 0;
+    unsigned rowOccupied = rowMask[0][pos.row] | rowMask[1][pos.row];
+    unsigned colOccupied = colMask[0][pos.col] | colMask[1][pos.col];
+    return lowGap(rowOccupied, pos.col) + highGap(rowOccupied, pos.col) +
+           lowGap(colOccupied, pos.row) + highGap(colOccupied, pos.row);
+}
+
+int Board::getReach(const Position& pos, PieceColor color) const {
+    if (!isValidPosition(pos) || color == PieceColor::NONE) return 0;
+    if (cells[pos.row * BOARD_SIZE + pos.col] != PieceColor::NONE) return 0;
+    int c = static_cast<int>(color) - 1;
+    unsigned rowOccupied = rowMask[0][pos.row] | rowMask[1][pos.row];
+    unsigned colOccupied = colMask[0][pos.col] | colMask[1][pos.col];
+    // Найближча фігура в кожному з чотирьох напрямків (або край дошки)
+    int left = pos.col - lowGap(rowOccupied, pos.col) - 1;
+    int right = pos.col + highGap(rowOccupied, pos.col) + 1;
+    int up = pos.row - lowGap(colOccupied, pos.row) - 1;
+    int down = pos.row + highGap(colOccupied, pos.row) + 1;
+    return (left >= 0 && (rowMask[c][pos.row] >> left & 1)) +
+           (right < BOARD_SIZE && (rowMask[c][pos.row] >> right & 1)) +
+           (up >= 0 && (colMask[c][pos.col] >> up & 1)) +
+           (down < BOARD_SIZE && (colMask[c][pos.col] >> down & 1));
+}
+
+int Board::getSideMobility(PieceColor color) const {
+    if (color == PieceColor::NONE) return 0;
+    if (dirtyRows | dirtyCols) flushLineMoves();
+    return sideMobility[static_cast<int>(color) - 1];
+}
+
+bool Board::isThreatened(const Position& pos) const {
+    if (!isValidPosition(pos)) return false;
+    if (!threatsValid) computeThreats();
+    return threats[pos.row * BOARD_SIZE + pos.col] != 0;
+}
+
+int Board::getThreatenedCount(PieceColor color) const {
+    if (color == PieceColor::NONE) return 0;
+    if (!threatsValid) computeThreats();
+    return threatenedCount[static_cast<int>(color) - 1];
+}
+
+void Board::mobilityMap(uint8_t* out) const {
+    for (int sq = 0; sq < CELLS; ++sq) {
+        out[sq] = static_cast<uint8_t>(getMobility({sq / BOARD_SIZE, sq % BOARD_SIZE}));
+    }
+}
+
+void Board::reachMap(PieceColor color, uint8_t* out) const {
+    for (int sq = 0; sq < CELLS; ++sq) {
+        out[sq] = static_cast<uint8_t>(getReach({sq / BOARD_SIZE, sq % BOARD_SIZE}, color));
+    }
+}
+
+void Board::threatMap(uint8_t* out) const {
+    if (!threatsValid) computeThreats();
+    std::copy(threats.begin(), threats.end(), out);
+}
+
+// Ходи вздовж однієї лінії: кожен порожній відрізок дає свою довжину фігурам на його кінцях
+void Board::updateLineMoves(const uint16_t* masks, uint8_t* moves, int line) const {
+    unsigned own[2] = {masks[line], masks[BOARD_SIZE + line]};
+    unsigned occupied = own[0] | own[1];
+    int count[2] = {0, 0};
+    int previous = -1;
+    for (int pos = 0; pos <= BOARD_SIZE; ++pos) {
+        if (pos < BOARD_SIZE && !(occupied >> pos & 1)) continue;
+        int gap = pos - previous - 1;
+        if (gap > 0) {
+            if (previous >= 0) count[own[0] >> previous & 1 ? 0 : 1] += gap;
+            if (pos < BOARD_SIZE) count[own[0] >> pos & 1 ? 0 : 1] += gap;
+        }
+        previous = pos;
+    }
+    for (int c = 0; c < 2; ++c) {
+        sideMobility[c] += count[c] - moves[c * BOARD_SIZE + line];
+        moves[c * BOARD_SIZE + line] = static_cast<uint8_t>(count[c]);
+    }
+}
+
+void Board::flushLineMoves() const {
+    for (int line = 0; line < BOARD_SIZE; ++line) {
+        if (dirtyRows >> line & 1) updateLineMoves(&rowMask[0][0], &rowMoves[0][0], line);
+        if (dirtyCols >> line & 1) updateLineMoves(&colMask[0][0], &colMoves[0][0], line);
+    }
+    dirtyRows = dirtyCols = 0;
+}
+
+void Board::recomputeMaps() {
+    for (int c = 0; c < 2; ++c) {
+        for (int line = 0; line < BOARD_SIZE; ++line) {
+            rowMask[c][line] = colMask[c][line] = 0;
+            rowMoves[c][line] = colMoves[c][line] = 0;
+        }
+        sideMobility[c] = 0;
+    }
+    for (int sq = 0; sq < CELLS; ++sq) {
+        if (cells[sq] == PieceColor::NONE) continue;
+        int c = static_cast<int>(cells[sq]) - 1;
+        rowMask[c][sq / BOARD_SIZE] |= 1 << (sq % BOARD_SIZE);
+        colMask[c][sq % BOARD_SIZE] |= 1 << (sq / BOARD_SIZE);
+    }
+    dirtyRows = dirtyCols = (1 << BOARD_SIZE) - 1;
+    threatsValid = false;
+}
+
+// Клітинка square змінює oldColor на newColor: змінюються лише її рядок і стовпець,
+// ходи вздовж них перераховуються при наступному getSideMobility
+void Board::updateMaps(int square, PieceColor oldColor, PieceColor newColor) {
+    int row = square / BOARD_SIZE;
+    int col = square % BOARD_SIZE;
+    if (oldColor != PieceColor::NONE) {
+        int c = static_cast<int>(oldColor) - 1;
+        rowMask[c][row] &= ~(1 << col);
+        colMask[c][col] &= ~(1 << row);
+    }
+    if (newColor != PieceColor::NONE) {
+        int c = static_cast<int>(newColor) - 1;
+        rowMask[c][row] |= 1 << col;
+        colMask[c][col] |= 1 << row;
+    }
+    dirtyRows |= 1 << row;
+    dirtyCols |= 1 << col;
+    threatsValid = false;
+}
+
+// Ряд фігур одного кольору вздовж рядка чи стовпця під загрозою, якщо з одного боку
+// стоїть суперник, а на порожню клітинку з іншого суперник може стати одним ходом.
+// Ряди поруч із суперником шукаємо бітовими операціями над масками лінії,
+// досяжність перевіряємо лише для них.
+void Board::computeThreats() const {
+    const unsigned FULL = (1u << BOARD_SIZE) - 1;
+    threats.fill(0);
+    threatenedCount[0] = threatenedCount[1] = 0;
+    for (int axis = 0; axis < 2; ++axis) {
+        const uint16_t (*masks)[BOARD_SIZE] = axis == 0 ? rowMask : colMask;
+        for (int line = 0; line < BOARD_SIZE; ++line) {
+            for (int c = 0; c < 2; ++c) {
+                unsigned own = masks[c][line];
+                unsigned opp = masks[1 - c][line];
+                if (!own || !opp) continue;
+                unsigned empty = ~(own | opp) & FULL;
+                unsigned starts = own & ~(own << 1);
+                unsigned ends = own & ~(own >> 1);
+                // Суперник перед рядом - потрібна порожня клітинка після, і навпаки
+                unsigned oppBefore = starts & (opp << 1);
+                unsigned oppAfter = ends & (opp >> 1);
+                while (oppBefore | oppAfter) {
+                    int first;
+                    int last;
+                    int target;
+                    if (oppBefore) {
+                        first = lineGaps.lowestBit[oppBefore];
+                        oppBefore &= oppBefore - 1;
+                        last = first + lineGaps.lowestBit[ends >> first];
+                        target = last + 1;
+                    } else {
+                        last = lineGaps.lowestBit[oppAfter];
+                        oppAfter &= oppAfter - 1;
+                        first = lineGaps.highestBit[starts & ((2u << last) - 1)];
+                        target = first - 1;
+                    }
+                    if (target < 0 || target >= BOARD_SIZE || !(empty >> target & 1)) continue;
+                    Position targetPos = axis == 0 ? Position{line, target} : Position{target, line};
+                    if (!getReach(targetPos, static_cast<PieceColor>(2 - c))) continue;
+                    for (int k = first; k <= last; ++k) {
+                        int sq = axis == 0 ? line * BOARD_SIZE + k : k * BOARD_SIZE + line;
+                        if (!threats[sq]) {
+                            threats[sq] = 1;
+                            threatenedCount[c]++;
+                        }
+                    }
+                }
+            }
+        }
+    }
+    threatsValid = true;
+}
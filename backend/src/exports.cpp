@@ -1,67 +1,212 @@
 // backend/src/exports.cpp
 #include "exports.hpp"
+#include "mcts.hpp"
+#include "search.hpp"
+#include "tablebase.hpp"
+#include "zobrist.hpp"
 #include <string>
 #include <sstream>
+#include <algorithm>
+#include <atomic>
+#include <memory>
 
-static std::string lastBoardState;
+// Дескриптор, який отримує викликач як void* game. Усе змінне стану API
+// (буфери рядків, рушій пошуку) живе тут, а не в статичних змінних, тому
+// різні ігри можна безпечно використовувати з різних потоків одночасно.
+struct GameHandle {
+    Game game;
+    std::unique_ptr<Searcher> searcher;  // створюється при першому пошуку
+    size_t hashMb = 16;
+    std::unique_ptr<Mcts> mcts;          // так само - при першому mctsSearch
+    size_t mctsMb = 64;
+    uint64_t nodeLimit = 0;
+    std::string boardState;
+    std::string validMoves;
+    SearchProgressCallback progressCallback = nullptr;
+    void* progressUserData = nullptr;
+    std::atomic<bool> stop{false};
+};
+
+static GameHandle* handleOf(void* game) {
+    return static_cast<GameHandle*>(game);
+}
+
+static Game* gameOf(void* game) {
+    return &handleOf(game)->game;
+}
 
 void* createGame() {
-    return new Game();
+    return new GameHandle();
+}
+
+void* cloneGame(void* game) {
+    if (!game) return nullptr;
+    GameHandle* clone = new GameHandle();
+    clone->game = handleOf(game)->game;
+    return clone;
+}
+
+void copyGame(void* dst, const void* src) {
+    if (!dst || !src || dst == src) return;
+    handleOf(dst)->game = static_cast<const GameHandle*>(src)->game;
 }
 
 void deleteGame(void* game) {
-    delete static_cast<Game*>(game);
+    delete handleOf(game);
 }
 
 bool makeMove(void* game, int fromRow, int fromCol, int toRow, int toCol) {
-    Game* g = static_cast<Game*>(game);
+    Game* g = gameOf(game);
     Position from{fromRow, fromCol};
     Position to{toRow, toCol};
     return g->makeMove(from, to);
 }
 
+// Дельта щойно зіграного ходу
+static void fillMoveResult(const Game* g, MoveResult* result) {
+    const UndoRecord* record = g->getLastMove();
+    result->piece = static_cast<int>(g->getPieceAt({record->to / Board::BOARD_SIZE,
+                                                    record->to % Board::BOARD_SIZE}));
+    result->from = record->from;
+    result->to = record->to;
+    result->capturedCount = std::min<int>(record->capturedCount, MOVE_MAX_CAPTURES);
+    std::copy(record->captured, record->captured + result->capturedCount, result->captured);
+    result->blackCaptured = g->getBlackCaptured();
+    result->whiteCaptured = g->getWhiteCaptured();
+    result->currentPlayer = static_cast<int>(g->getCurrentPlayer());
+    result->gameOver = g->isGameOver() ? 1 : 0;
+    result->winner = static_cast<int>(g->getWinner());
+}
+
+bool makeMoveEx(void* game, int fromRow, int fromCol, int toRow, int toCol, MoveResult* result) {
+    Game* g = gameOf(game);
+    if (!g->makeMove({fromRow, fromCol}, {toRow, toCol})) return false;
+    if (result) fillMoveResult(g, result);
+    return true;
+}
+
+int replayMoves(void* game, const unsigned char* moves, int count, MoveResult* deltas, int* branching) {
+    if (!game || !moves || count <= 0) return 0;
+    Game* g = gameOf(game);
+    for (int i = 0; i < count; ++i) {
+        int from = moves[2 * i];
+        int to = moves[2 * i + 1];
+        if (from >= Board::CELLS || to >= Board::CELLS) return i;
+        // Сума рухливості фігур того, хто ходить, - без генерації списку ходів
+        if (branching) branching[i] = g->getBoard().getSideMobility(g->getCurrentPlayer());
+        if (!g->makeMove({from / Board::BOARD_SIZE, from % Board::BOARD_SIZE},
+                         {to / Board::BOARD_SIZE, to % Board::BOARD_SIZE})) {
+            return i;
+        }
+        if (deltas) fillMoveResult(g, &deltas[i]);
+    }
+    return count;
+}
+
 const char* getBoardState(void* game) {
-    Game* g = static_cast<Game*>(game);
-    lastBoardState = g->getBoardState();
-    return lastBoardState.c_str();
+    GameHandle* h = handleOf(game);
+    h->boardState = h->game.getBoardState();
+    return h->boardState.c_str();
+}
+
+bool getBoardSnapshot(void* game, unsigned char* cells, int* currentPlayer,
+                      int* blackCaptured, int* whiteCaptured) {
+    if (!game || !cells) return false;
+    Game* g = gameOf(game);
+    g->getBoardBytes(cells);
+    if (currentPlayer) *currentPlayer = static_cast<int>(g->getCurrentPlayer());
+    if (blackCaptured) *blackCaptured = g->getBlackCaptured();
+    if (whiteCaptured) *whiteCaptured = g->getWhiteCaptured();
+    return true;
+}
+
+bool getBoardMaps(void* game, unsigned char* maps, int* totals) {
+    if (!game) return false;
+    const Board& board = gameOf(game)->getBoard();
+    if (maps) {
+        board.mobilityMap(maps);
+        board.reachMap(PieceColor::BLACK, maps + Board::CELLS);
+        board.reachMap(PieceColor::WHITE, maps + 2 * Board::CELLS);
+        board.threatMap(maps + 3 * Board::CELLS);
+    }
+    if (totals) {
+        totals[0] = board.getSideMobility(PieceColor::BLACK);
+        totals[1] = board.getSideMobility(PieceColor::WHITE);
+        totals[2] = board.getThreatenedCount(PieceColor::BLACK);
+        totals[3] = board.getThreatenedCount(PieceColor::WHITE);
+    }
+    return true;
 }
 
 int getCurrentPlayer(void* game) {
-    Game* g = static_cast<Game*>(game);
+    Game* g = gameOf(game);
     return static_cast<int>(g->getCurrentPlayer());
 }
 
 bool isGameOver(void* game) {
-    return static_cast<Game*>(game)->isGameOver();
+    return gameOf(game)->isGameOver();
 }
 
 int getBlackCaptured(void* game) {
-    return static_cast<Game*>(game)->getBlackCaptured();
+    return gameOf(game)->getBlackCaptured();
 }
 
 int getWhiteCaptured(void* game) {
-    return static_cast<Game*>(game)->getWhiteCaptured();
+    return gameOf(game)->getWhiteCaptured();
 }
 
 bool saveGame(void* game, const char* filename) {
-    return static_cast<Game*>(game)->save(filename);
+    return gameOf(game)->save(filename);
 }
 
 bool loadGame(void* game, const char* filename) {
-    return static_cast<Game*>(game)->load(filename);
+    return gameOf(game)->load(filename);
 }
 
 void startNewGame(void* game) {
-    Game* g = static_cast<Game*>(game);
-    *g = Game();
+    gameOf(game)->reset();
+}
+
+int getWinner(void* game) {
+    return static_cast<int>(gameOf(game)->getWinner());
+}
+
+unsigned long long getPositionHash(void* game) {
+    return static_cast<unsigned long long>(gameOf(game)->getPositionHash());
+}
+
+unsigned long long getCanonicalHash(void* game, int* symmetry) {
+    return static_cast<unsigned long long>(zobrist::canonicalHash(*gameOf(game), symmetry));
+}
+
+int getRepetitionCount(void* game) {
+    return gameOf(game)->getRepetitionCount();
 }
 
-// Додаємо зберігання останнього результату для valid moves
-static std::string lastValidMoves;
+void setRepetitionLimit(void* game, int limit) {
+    gameOf(game)->setRepetitionLimit(limit);
+}
+
+bool undoMove(void* game) {
+    return gameOf(game)->undoMove();
+}
+
+bool redoMove(void* game) {
+    return gameOf(game)->redoMove();
+}
+
+int getHistoryLength(void* game) {
+    return gameOf(game)->getHistoryLength();
+}
+
+int getRedoLength(void* game) {
+    return gameOf(game)->getRedoLength();
+}
 
 const char* __stdcall getValidMoves(void* game, int row, int col) {
+    GameHandle* h = handleOf(game);
     try {
-        Game* g = static_cast<Game*>(game);
+        Game* g = &h->game;
         Position pos{row, col};
         
         // Отримуємо список можливих ходів
@@ -76,11 +221,181 @@ const char* __stdcall getValidMoves(void* game, int row, int col) {
         }
         ss << "]";
         
-        lastValidMoves = ss.str();
-        return lastValidMoves.c_str();
+        h->validMoves = ss.str();
+        return h->validMoves.c_str();
     }
     catch (const std::exception&) {
-        lastValidMoves = "[]";
-        return lastValidMoves.c_str();
+        h->validMoves = "[]";
+        return h->validMoves.c_str();
     }
-}
\ No newline at end of file
+}
+
+int __stdcall getAllLegalMoves(void* game, unsigned char* out, int maxMoves) {
+    if (!game || !out || maxMoves <= 0) return 0;
+    Game* g = gameOf(game);
+    Move moves[Game::MAX_LEGAL_MOVES];
+    int count = g->getAllLegalMoves(moves, std::min(maxMoves, Game::MAX_LEGAL_MOVES));
+    for (int i = 0; i < count; ++i) {
+        *out++ = static_cast<unsigned char>(moves[i].from.row * Board::BOARD_SIZE + moves[i].from.col);
+        *out++ = static_cast<unsigned char>(moves[i].to.row * Board::BOARD_SIZE + moves[i].to.col);
+    }
+    return count;
+}
+
+int __stdcall getMoveHistory(void* game, unsigned char* out, int maxMoves) {
+    if (!game) return 0;
+    Game* g = gameOf(game);
+    if (!out) return g->getHistoryLength();
+    if (maxMoves <= 0) return 0;
+    std::vector<Move> moves(std::min(maxMoves, g->getHistoryLength()));
+    int count = g->getMoveHistory(moves.data(), static_cast<int>(moves.size()));
+    for (int i = 0; i < count; ++i) {
+        *out++ = static_cast<unsigned char>(moves[i].from.row * Board::BOARD_SIZE + moves[i].from.col);
+        *out++ = static_cast<unsigned char>(moves[i].to.row * Board::BOARD_SIZE + moves[i].to.col);
+    }
+    return count;
+}
+
+bool __stdcall getStartSnapshot(void* game, unsigned char* cells, int* currentPlayer,
+                                int* blackCaptured, int* whiteCaptured) {
+    if (!game || !cells) return false;
+    // Відкочуємо копію, щоб не чіпати стек redo самої гри
+    Game start = *gameOf(game);
+    while (start.unmakeMove()) {}
+    start.getBoardBytes(cells);
+    if (currentPlayer) *currentPlayer = static_cast<int>(start.getCurrentPlayer());
+    if (blackCaptured) *blackCaptured = start.getBlackCaptured();
+    if (whiteCaptured) *whiteCaptured = start.getWhiteCaptured();
+    return true;
+}
+
+bool __stdcall setPosition(void* game, const unsigned char* cells, int currentPlayer,
+                           int blackCaptured, int whiteCaptured) {
+    if (!game || !cells) return false;
+    if (currentPlayer != static_cast<int>(PieceColor::BLACK) &&
+        currentPlayer != static_cast<int>(PieceColor::WHITE)) return false;
+    return gameOf(game)->setPosition(cells, static_cast<PieceColor>(currentPlayer),
+                                     blackCaptured, whiteCaptured);
+}
+
+static void fillSearchInfo(const SearchResult& result, SearchInfo* info) {
+    info->fromRow = result.bestMove.from.row;
+    info->fromCol = result.bestMove.from.col;
+    info->toRow = result.bestMove.to.row;
+    info->toCol = result.bestMove.to.col;
+    info->score = result.score;
+    info->depth = result.depth;
+    info->nodes = static_cast<long long>(result.nodes);
+    info->nodesPerSecond = static_cast<long long>(result.nodesPerSecond);
+    info->elapsedMs = result.elapsedMs;
+    info->pvLength = std::min(static_cast<int>(result.pv.size()), SEARCH_MAX_PV);
+    for (int i = 0; i < info->pvLength; ++i) {
+        const Move& move = result.pv[i];
+        info->pv[2 * i] = static_cast<unsigned char>(move.from.row * Board::BOARD_SIZE + move.from.col);
+        info->pv[2 * i + 1] = static_cast<unsigned char>(move.to.row * Board::BOARD_SIZE + move.to.col);
+    }
+}
+
+bool __stdcall searchBestMove(void* game, int depth, int ms, SearchInfo* info) {
+    if (!game) return false;
+    GameHandle* h = handleOf(game);
+    if (!h->searcher) h->searcher.reset(new Searcher(h->hashMb));
+
+    SearchLimits limits;
+    limits.maxDepth = depth;
+    limits.timeMs = ms;
+    limits.maxNodes = h->nodeLimit;
+    limits.stop = &h->stop;
+    if (h->progressCallback) {
+        SearchProgressCallback callback = h->progressCallback;
+        void* userData = h->progressUserData;
+        limits.onProgress = [callback, userData](const SearchResult& partial) {
+            SearchInfo progress;
+            fillSearchInfo(partial, &progress);
+            callback(&progress, userData);
+        };
+    }
+    SearchResult result = h->searcher->search(h->game, limits);
+
+    if (info) fillSearchInfo(result, info);
+    return result.hasMove;
+}
+
+void __stdcall setSearchProgressCallback(void* game, SearchProgressCallback callback,
+                                         void* userData) {
+    GameHandle* h = handleOf(game);
+    h->progressCallback = callback;
+    h->progressUserData = userData;
+}
+
+void __stdcall stopSearch(void* game) {
+    if (game) handleOf(game)->stop.store(true);
+}
+
+void __stdcall clearSearchStop(void* game) {
+    if (game) handleOf(game)->stop.store(false);
+}
+
+void __stdcall setSearchHashSize(void* game, int sizeMb) {
+    GameHandle* h = handleOf(game);
+    h->hashMb = static_cast<size_t>(std::max(sizeMb, 1));
+    if (h->searcher) h->searcher->setHashSize(h->hashMb);
+}
+
+void __stdcall setSearchNodeLimit(void* game, long long maxNodes) {
+    handleOf(game)->nodeLimit = maxNodes > 0 ? static_cast<uint64_t>(maxNodes) : 0;
+}
+
+bool __stdcall mctsSearch(void* game, long long playouts, int ms, int threads, int batch,
+                          MctsInfo* info, MctsMoveInfo* moves, int maxMoves) {
+    if (!game) return false;
+    GameHandle* h = handleOf(game);
+    if (!h->mcts) h->mcts.reset(new Mcts(h->mctsMb));
+
+    MctsLimits limits;
+    limits.maxPlayouts = playouts > 0 ? static_cast<uint64_t>(playouts) : 0;
+    limits.timeMs = ms;
+    limits.threads = threads;
+    limits.batch = batch;
+    limits.stop = &h->stop;
+    MctsResult result = h->mcts->search(h->game, limits);
+
+    if (info) {
+        info->fromRow = result.bestMove.from.row;
+        info->fromCol = result.bestMove.from.col;
+        info->toRow = result.bestMove.to.row;
+        info->toCol = result.bestMove.to.col;
+        info->playouts = static_cast<long long>(result.playouts);
+        info->playoutsPerSecond = static_cast<long long>(result.playoutsPerSecond);
+        info->elapsedMs = result.elapsedMs;
+        info->treeNodes = static_cast<int>(result.treeNodes);
+        info->reusedVisits = static_cast<int>(result.reusedVisits);
+        info->rootMoveCount = static_cast<int>(result.rootMoves.size());
+    }
+    if (moves) {
+        int count = std::min(maxMoves, static_cast<int>(result.rootMoves.size()));
+        for (int i = 0; i < count; ++i) {
+            const MctsMoveStat& stat = result.rootMoves[i];
+            moves[i].from = stat.move.from.row * Board::BOARD_SIZE + stat.move.from.col;
+            moves[i].to = stat.move.to.row * Board::BOARD_SIZE + stat.move.to.col;
+            moves[i].visits = static_cast<int>(stat.visits);
+            moves[i].value = stat.value;
+        }
+    }
+    return result.hasMove;
+}
+
+void __stdcall setMctsMemory(void* game, int sizeMb) {
+    if (!game) return;
+    GameHandle* h = handleOf(game);
+    h->mctsMb = static_cast<size_t>(std::max(sizeMb, 1));
+    if (h->mcts) h->mcts->setMemory(h->mctsMb);
+}
+
+int __stdcall probeTablebase(void* game, const unsigned char* data, long long size, int* distance) {
+    if (!game || !data || size <= 0) return -1;
+    tablebase::Entry entry;
+    if (!tablebase::probe(data, static_cast<size_t>(size), handleOf(game)->game, &entry)) return -1;
+    if (distance) *distance = entry.distance;
+    return entry.value;
+}
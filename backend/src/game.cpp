@@ -1,34 +1,117 @@
 // backend/src/game.cpp
 #include "game.hpp"
+#include "zobrist.hpp"
+#include <algorithm>
 #include <fstream>
 #include <sstream>
 
 Game::Game() : 
     currentPlayer(PieceColor::BLACK),
     blackCaptured(0),
-    whiteCaptured(0) {
+    whiteCaptured(0),
+    repetitionLimit(0) {
+    positionHistory.push_back(getPositionHash());
+}
+
+void Game::reset() {
+    int limit = repetitionLimit;
+    *this = Game();
+    repetitionLimit = limit;
 }
 
 bool Game::makeMove(const Position& from, const Position& to) {
+    if (!applyMove(from, to)) return false;
+    redoMoves.clear();
+    return true;
+}
+
+bool Game::applyMove(const Position& from, const Position& to) {
     if (getPieceAt(from) != currentPlayer) return false;
     
     if (!board.movePiece(from, to)) return false;
     
-    auto captures = board.checkCaptures(to);
-    for (const auto& pos : captures) {
+    UndoRecord record;
+    record.from = static_cast<uint8_t>(from.row * Board::BOARD_SIZE + from.col);
+    record.to = static_cast<uint8_t>(to.row * Board::BOARD_SIZE + to.col);
+    record.capturedCount = 0;
+    
+    Position captures[Board::MAX_CAPTURES];
+    int captureCount = board.findCaptures(to, captures);
+    for (int i = 0; i < captureCount; ++i) {
+        const Position& pos = captures[i];
         if (board.getPieceAt(pos) == PieceColor::BLACK) {
             whiteCaptured++;
         } else {
             blackCaptured++;
         }
         board.setPieceAt(pos, PieceColor::NONE);
+        record.captured[record.capturedCount++] =
+            static_cast<uint8_t>(pos.row * Board::BOARD_SIZE + pos.col);
     }
     
-    moveHistory.push_back({from, to});
+    moveHistory.push_back(record);
     switchPlayer();
+    positionHistory.push_back(getPositionHash());
+    return true;
+}
+
+bool Game::unmakeMove() {
+    if (moveHistory.empty()) return false;
+    const UndoRecord& record = moveHistory.back();
+    
+    Position from{record.from / Board::BOARD_SIZE, record.from % Board::BOARD_SIZE};
+    Position to{record.to / Board::BOARD_SIZE, record.to % Board::BOARD_SIZE};
+    PieceColor mover = board.getPieceAt(to);
+    PieceColor victim = (mover == PieceColor::BLACK) ? PieceColor::WHITE : PieceColor::BLACK;
+    
+    for (int i = 0; i < record.capturedCount; ++i) {
+        board.setPieceAt({record.captured[i] / Board::BOARD_SIZE, record.captured[i] % Board::BOARD_SIZE},
+                         victim);
+    }
+    if (mover == PieceColor::BLACK) {
+        blackCaptured -= record.capturedCount;
+    } else {
+        whiteCaptured -= record.capturedCount;
+    }
+    board.setPieceAt(from, mover);
+    board.setPieceAt(to, PieceColor::NONE);
+    currentPlayer = mover;
+    
+    moveHistory.pop_back();
+    positionHistory.pop_back();
     return true;
 }
 
+bool Game::undoMove() {
+    if (moveHistory.empty()) return false;
+    const UndoRecord& record = moveHistory.back();
+    Move move{{record.from / Board::BOARD_SIZE, record.from % Board::BOARD_SIZE},
+              {record.to / Board::BOARD_SIZE, record.to % Board::BOARD_SIZE}};
+    if (!unmakeMove()) return false;
+    redoMoves.push_back(move);
+    return true;
+}
+
+bool Game::redoMove() {
+    if (redoMoves.empty()) return false;
+    Move move = redoMoves.back();
+    if (!applyMove(move.from, move.to)) return false;
+    redoMoves.pop_back();
+    return true;
+}
+
+const UndoRecord* Game::getLastMove() const {
+    return moveHistory.empty() ? nullptr : &moveHistory.back();
+}
+
+int Game::getHistoryLength() const {
+    return static_cast<int>(moveHistory.size());
+}
+
+int Game::getRedoLength() const {
+    return static_cast<int>(redoMoves.size());
+}
+
 void Game::switchPlayer() {
     currentPlayer = (currentPlayer == PieceColor::BLACK) ? 
                     PieceColor::WHITE : PieceColor::BLACK;
@@ -39,7 +122,40 @@ PieceColor Game::getCurrentPlayer() const {
 }
 
 bool Game::isGameOver() const {
-    return blackCaptured >= 9 || whiteCaptured >= 9;
+    if (blackCaptured >= 9 || whiteCaptured >= 9) return true;
+    return repetitionLimit > 0 && getRepetitionCount() >= repetitionLimit;
+}
+
+PieceColor Game::getWinner() const {
+    if (blackCaptured >= 9) return PieceColor::BLACK;
+    if (whiteCaptured >= 9) return PieceColor::WHITE;
+    return PieceColor::NONE;
+}
+
+uint64_t Game::getPositionHash() const {
+    uint64_t key = board.getHash();
+    if (currentPlayer == PieceColor::WHITE) key ^= zobrist::sideKey();
+    return key;
+}
+
+int Game::getRepetitionCount() const {
+    uint64_t key = positionHistory.back();
+    int count = 1;
+    int current = static_cast<int>(moveHistory.size());
+    // Захоплення незворотні, тож далі останнього захоплення позиції не повторюються
+    for (int i = current - 1; i >= 0; --i) {
+        if (moveHistory[i].capturedCount > 0) break;
+        if ((current - i) % 2 == 0 && positionHistory[i] == key) count++;
+    }
+    return count;
+}
+
+void Game::setRepetitionLimit(int limit) {
+    repetitionLimit = limit > 0 ? limit : 0;
+}
+
+int Game::getRepetitionLimit() const {
+    return repetitionLimit;
 }
 
 int Game::getBlackCaptured() const {
@@ -54,6 +170,10 @@ std::string Game::getBoardState() const {
     return board.serialize();
 }
 
+void Game::getBoardBytes(uint8_t* out) const {
+    board.toBytes(out);
+}
+
 bool Game::save(const std::string& filename) const {
     std::ofstream file(filename);
     if (!file.is_open()) return false;
@@ -90,17 +210,49 @@ bool Game::load(const std::string& filename) {
     
     if (!board.deserialize(boardStr)) return false;
     
+    // Завантажена позиція стає початком нової історії
+    moveHistory.clear();
+    redoMoves.clear();
+    
     currentPlayer = (playerStr == "B") ? PieceColor::BLACK : PieceColor::WHITE;
     blackCaptured = std::stoi(blackCapStr);
     whiteCaptured = std::stoi(whiteCapStr);
+    positionHistory.assign(1, getPositionHash());
+    
+    return true;
+}
+
+bool Game::setPosition(const uint8_t* cells, PieceColor player, int black, int white) {
+    if (player == PieceColor::NONE || black < 0 || white < 0) return false;
+    if (!board.fromBytes(cells)) return false;
     
+    moveHistory.clear();
+    redoMoves.clear();
+    currentPlayer = player;
+    blackCaptured = black;
+    whiteCaptured = white;
+    positionHistory.assign(1, getPositionHash());
     return true;
 }
 
+int Game::getMoveHistory(Move* out, int maxMoves) const {
+    int count = std::min(maxMoves, static_cast<int>(moveHistory.size()));
+    for (int i = 0; i < count; ++i) {
+        const UndoRecord& record = moveHistory[i];
+        out[i] = {{record.from / Board::BOARD_SIZE, record.from % Board::BOARD_SIZE},
+                  {record.to / Board::BOARD_SIZE, record.to % Board::BOARD_SIZE}};
+    }
+    return count;
+}
+
 PieceColor Game::getPieceAt(const Position& pos) const {
     return board.getPieceAt(pos);
 }
 
+const Board& Game::getBoard() const {
+    return board;
+}
+
 std::vector<Position> Game::getValidMoves(const Position& pos) const {
     // Перевіряємо, чи фігура належить поточному гравцю
     if (board.getPieceAt(pos) != currentPlayer) {
@@ -108,4 +260,25 @@ std::vector<Position> Game::getValidMoves(const Position& pos) const {
     }
     
     return board.getValidMoves(pos);
-}
\ No newline at end of file
+}
+
+int Game::getAllLegalMoves(Move* out, int maxMoves) const {
+    int count = 0;
+    for (int row = 0; row < Board::BOARD_SIZE; ++row) {
+        for (int col = 0; col < Board::BOARD_SIZE; ++col) {
+            Position from{row, col};
+            if (board.getPieceAt(from) != currentPlayer) continue;
+            Position targets[Board::MAX_PIECE_MOVES];
+            int targetCount = board.generateMoves(from, targets);
+            for (int i = 0; i < targetCount; ++i) {
+                if (count >= maxMoves) return count;
+                out[count++] = {from, targets[i]};
+            }
+        }
+    }
+    return count;
+}
+
+int Game::generateMoves(const Position& from, Position* out) const {
+    return board.generateMoves(from, out);
+}
@@ -0,0 +1,412 @@
+// backend/src/mcts.cpp
+#include "mcts.hpp"
+#include <algorithm>
+#include <cmath>
+#include <thread>
+
+namespace {
+
+// Константа дослідження UCT. При 100+ ходах у корені класичне sqrt(2)
+// розмазує відвідування майже рівномірно, тому менша
+const double EXPLORATION = 0.7;
+const int MAX_THREADS = 64;
+const int MAX_BATCH = 64;
+const int TIME_CHECK_MASK = 15;
+// Скільки випадкових фігур розіграш перевіряє на захоплення, перш ніж зіграти тихий хід
+const int ROLLOUT_CANDIDATES = 4;
+
+Position positionOf(int square) {
+    return {square / Board::BOARD_SIZE, square % Board::BOARD_SIZE};
+}
+
+PieceColor opponentOf(PieceColor color) {
+    return color == PieceColor::BLACK ? PieceColor::WHITE : PieceColor::BLACK;
+}
+
+uint64_t splitmix64(uint64_t x) {
+    x += 0x9E3779B97F4A7C15ULL;
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return x ^ (x >> 31);
+}
+
+// xorshift64*: швидкий генератор на потік для розіграшів
+struct Rng {
+    uint64_t state;
+
+    explicit Rng(uint64_t seed) : state(splitmix64(seed) | 1) {}
+
+    uint64_t next() {
+        state ^= state >> 12;
+        state ^= state << 25;
+        state ^= state >> 27;
+        return state * 2685821657736338717ULL;
+    }
+
+    uint32_t below(uint32_t n) {
+        return static_cast<uint32_t>(((next() >> 32) * n) >> 32);
+    }
+};
+
+// Чи захоплює хід from -> to хоч одну фігуру (по знімку дошки, без виконання ходу)
+bool capturesAny(const uint8_t* cells, uint8_t own, const Position& from, const Position& to) {
+    uint8_t opp = own == static_cast<uint8_t>(PieceColor::BLACK) ?
+        static_cast<uint8_t>(PieceColor::WHITE) : static_cast<uint8_t>(PieceColor::BLACK);
+    const int directions[][2] = {{0, 1}, {0, -1}, {1, 0}, {-1, 0}};
+    for (const auto& dir : directions) {
+        int row = to.row + dir[0];
+        int col = to.col + dir[1];
+        int run = 0;
+        while (row >= 0 && row < Board::BOARD_SIZE && col >= 0 && col < Board::BOARD_SIZE &&
+               cells[row * Board::BOARD_SIZE + col] == opp) {
+            run++;
+            row += dir[0];
+            col += dir[1];
+        }
+        if (run > 0 && row >= 0 && row < Board::BOARD_SIZE && col >= 0 && col < Board::BOARD_SIZE &&
+            !(row == from.row && col == from.col) && cells[row * Board::BOARD_SIZE + col] == own) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Випадковий розіграш від поточної позиції game; повертає переможця (NONE - нічия)
+// і відкочує всі зроблені ходи. Політика: до ROLLOUT_CANDIDATES випадкових фігур,
+// перший знайдений хід із захопленням, інакше випадковий хід першої з них - без
+// генерації всіх ходів позиції, що при 100+ ходах значно дешевше.
+// Повторення позицій у розіграшах не перевіряємо.
+PieceColor rollout(Game& game, Rng& rng) {
+    int plies = 0;
+    PieceColor winner = PieceColor::NONE;
+    bool decided = false;
+    for (; plies < Mcts::ROLLOUT_PLIES; ++plies) {
+        winner = game.getWinner();
+        if (winner != PieceColor::NONE) {
+            decided = true;
+            break;
+        }
+        PieceColor side = game.getCurrentPlayer();
+        // Один знімок дошки дешевший за 81 виклик getPieceAt
+        uint8_t cells[Board::CELLS];
+        game.getBoardBytes(cells);
+        uint8_t squares[Board::CELLS];
+        int count = 0;
+        for (int square = 0; square < Board::CELLS; ++square) {
+            if (cells[square] == static_cast<uint8_t>(side)) squares[count++] = static_cast<uint8_t>(square);
+        }
+        Position targets[Board::MAX_PIECE_MOVES];
+        Move chosen{};
+        bool moved = false;
+        int tried = 0;
+        while (count > 0 && tried < ROLLOUT_CANDIDATES) {
+            int i = static_cast<int>(rng.below(count));
+            Position from = positionOf(squares[i]);
+            int targetCount = game.generateMoves(from, targets);
+            squares[i] = squares[--count];
+            if (targetCount == 0) continue;
+            if (!moved) {
+                chosen = {from, targets[rng.below(targetCount)]};
+                moved = true;
+            }
+            bool capture = false;
+            for (int t = 0; t < targetCount && !capture; ++t) {
+                if (capturesAny(cells, static_cast<uint8_t>(side), from, targets[t])) {
+                    chosen = {from, targets[t]};
+                    capture = true;
+                }
+            }
+            if (capture) break;
+            ++tried;
+        }
+        if (moved) game.makeMove(chosen.from, chosen.to);
+        if (!moved) {
+            // Немає ходів - поразка того, хто ходить
+            winner = opponentOf(side);
+            decided = true;
+            break;
+        }
+    }
+    if (!decided) {
+        // Розіграш обірвано: перемагає той, хто захопив більше
+        int black = game.getBlackCaptured();
+        int white = game.getWhiteCaptured();
+        winner = black > white ? PieceColor::BLACK : white > black ? PieceColor::WHITE : PieceColor::NONE;
+    }
+    for (int i = 0; i < plies; ++i) game.unmakeMove();
+    return winner;
+}
+
+void copyNode(Mcts::Node& dst, const Mcts::Node& src) {
+    dst.visits.store(src.visits.load(std::memory_order_relaxed), std::memory_order_relaxed);
+    dst.reward.store(src.reward.load(std::memory_order_relaxed), std::memory_order_relaxed);
+    dst.state.store(src.state.load(std::memory_order_relaxed), std::memory_order_relaxed);
+    dst.from = src.from;
+    dst.to = src.to;
+    dst.childCount = src.childCount;
+    dst.firstChild = src.firstChild;
+}
+
+}  // namespace
+
+Mcts::Mcts(size_t memoryMb) {
+    setMemory(memoryMb);
+}
+
+void Mcts::setMemory(size_t memoryMb) {
+    // Половина бюджету - робочий пул, половина - запасний для перевикористання дерева
+    size_t count = memoryMb * 1024 * 1024 / (2 * sizeof(Node));
+    capacity = static_cast<uint32_t>(std::min<size_t>(std::max<size_t>(count, 1024), UINT32_MAX / 2));
+    nodes.reset(new Node[capacity]);
+    spare.reset();
+    clear();
+}
+
+void Mcts::clear() {
+    used.store(0);
+    hasTree = false;
+}
+
+int Mcts::elapsedMs() const {
+    return static_cast<int>(std::chrono::duration_cast<std::chrono::milliseconds>(
+        std::chrono::steady_clock::now() - startTime).count());
+}
+
+void Mcts::resetTree(const Game& game) {
+    Node& root = nodes[0];
+    root.visits.store(0);
+    root.reward.store(0);
+    root.state.store(UNEXPANDED);
+    root.childCount = 0;
+    used.store(1);
+    rootGame = game;
+}
+
+bool Mcts::reuseTree(const Game& game) {
+    uint64_t key = game.getPositionHash();
+    int black = game.getBlackCaptured();
+    int white = game.getWhiteCaptured();
+    Game probe = rootGame;
+    uint32_t found = UINT32_MAX;
+
+    // Пошук у глибину по вже розкритих вузлах, не далі REUSE_PLIES ходів від кореня
+    auto find = [&](auto& self, uint32_t index, int depth) -> bool {
+        if (probe.getPositionHash() == key && probe.getBlackCaptured() == black &&
+            probe.getWhiteCaptured() == white) {
+            found = index;
+            return true;
+        }
+        const Node& node = nodes[index];
+        if (depth >= REUSE_PLIES || node.state.load() != EXPANDED) return false;
+        for (uint32_t i = 0; i < node.childCount; ++i) {
+            const Node& child = nodes[node.firstChild + i];
+            probe.makeMove(positionOf(child.from), positionOf(child.to));
+            bool hit = self(self, node.firstChild + i, depth + 1);
+            probe.unmakeMove();
+            if (hit) return true;
+        }
+        return false;
+    };
+    if (!find(find, 0, 0)) return false;
+    if (found != 0) compact(found);
+    // Історія потрібна для правила повторень під час спуску деревом
+    rootGame = game;
+    return true;
+}
+
+void Mcts::compact(uint32_t newRoot) {
+    // Копіюємо піддерево в запасний пул у ширину, зберігаючи суцільні блоки дітей
+    if (!spare) spare.reset(new Node[capacity]);
+    Node* src = nodes.get();
+    Node* dst = spare.get();
+    copyNode(dst[0], src[newRoot]);
+    uint32_t next = 1;
+    for (uint32_t i = 0; i < next; ++i) {
+        Node& node = dst[i];
+        if (node.state.load(std::memory_order_relaxed) != EXPANDED) continue;
+        uint32_t first = node.firstChild;
+        node.firstChild = next;
+        for (uint32_t c = 0; c < node.childCount; ++c) copyNode(dst[next + c], src[first + c]);
+        next += node.childCount;
+    }
+    used.store(next);
+    std::swap(nodes, spare);
+}
+
+bool Mcts::expand(Node& node, const Game& game) {
+    uint8_t expected = UNEXPANDED;
+    if (!node.state.compare_exchange_strong(expected, EXPANDING, std::memory_order_acquire)) {
+        return false;
+    }
+    Move moves[Game::MAX_LEGAL_MOVES];
+    uint32_t count = static_cast<uint32_t>(game.getAllLegalMoves(moves, Game::MAX_LEGAL_MOVES));
+    uint32_t first = used.load(std::memory_order_relaxed);
+    do {
+        if (first + count > capacity) {
+            // Пул вичерпано: вузол лишається листком, розіграші йдуть з нього
+            node.state.store(UNEXPANDED, std::memory_order_release);
+            return false;
+        }
+    } while (!used.compare_exchange_weak(first, first + count, std::memory_order_relaxed));
+
+    for (uint32_t i = 0; i < count; ++i) {
+        Node& child = nodes[first + i];
+        child.visits.store(0, std::memory_order_relaxed);
+        child.reward.store(0, std::memory_order_relaxed);
+        child.state.store(UNEXPANDED, std::memory_order_relaxed);
+        child.from = static_cast<uint8_t>(moves[i].from.row * Board::BOARD_SIZE + moves[i].from.col);
+        child.to = static_cast<uint8_t>(moves[i].to.row * Board::BOARD_SIZE + moves[i].to.col);
+        child.childCount = 0;
+    }
+    node.firstChild = first;
+    node.childCount = static_cast<uint16_t>(count);
+    node.state.store(EXPANDED, std::memory_order_release);
+    return true;
+}
+
+bool Mcts::checkLimits(uint64_t done) {
+    if (stopped.load(std::memory_order_relaxed)) return true;
+    if (limits.maxPlayouts > 0 && done * limits.batch >= limits.maxPlayouts) {
+        stopped.store(true);
+        return true;
+    }
+    if ((done & TIME_CHECK_MASK) == 0) {
+        if ((limits.stop && limits.stop->load(std::memory_order_relaxed)) ||
+            (limits.timeMs > 0 && elapsedMs() >= limits.timeMs)) {
+            stopped.store(true);
+            return true;
+        }
+    }
+    return false;
+}
+
+void Mcts::worker(uint64_t seed) {
+    Game game = rootGame;  // своя копія на потік, спуск і розіграші - через make/unmake
+    Rng rng(seed);
+    const uint32_t batch = static_cast<uint32_t>(limits.batch);
+    std::vector<uint32_t> path;
+    std::vector<PieceColor> movers;
+
+    while (!checkLimits(iterations.fetch_add(1, std::memory_order_relaxed))) {
+        path.assign(1, 0);
+        movers.clear();
+        nodes[0].visits.fetch_add(batch, std::memory_order_relaxed);
+
+        // Вибір: UCT до листка. Кожен пройдений вузол одразу отримує batch відвідувань
+        // без винагороди (віртуальна втрата), тож інші потоки обирають інші гілки
+        bool terminal = false;
+        PieceColor winner = PieceColor::NONE;
+        while (true) {
+            Node& node = nodes[path.back()];
+            if (game.isGameOver()) {
+                terminal = true;
+                winner = game.getWinner();
+                break;
+            }
+            uint8_t state = node.state.load(std::memory_order_acquire);
+            if (state != EXPANDED) {
+                // Розкриваємо листок, який уже відвідували, інакше - розіграш з нього
+                if (state != UNEXPANDED || node.visits.load(std::memory_order_relaxed) <= batch ||
+                    !expand(node, game)) {
+                    break;
+                }
+            }
+            if (node.childCount == 0) {
+                terminal = true;
+                winner = opponentOf(game.getCurrentPlayer());
+                break;
+            }
+
+            double logVisits = std::log(static_cast<double>(node.visits.load(std::memory_order_relaxed)) + 1.0);
+            uint32_t offset = rng.below(node.childCount);
+            uint32_t best = node.firstChild + offset;
+            double bestScore = -1.0;
+            for (uint32_t j = 0; j < node.childCount; ++j) {
+                uint32_t index = node.firstChild + (offset + j) % node.childCount;
+                const Node& child = nodes[index];
+                uint32_t visits = child.visits.load(std::memory_order_relaxed);
+                if (visits == 0) {
+                    // Невідвідані - першими; випадковий зсув прибирає перевагу порядку генерації
+                    best = index;
+                    break;
+                }
+                double score = child.reward.load(std::memory_order_relaxed) / (2.0 * visits) +
+                               EXPLORATION * std::sqrt(logVisits / visits);
+                if (score > bestScore) {
+                    bestScore = score;
+                    best = index;
+                }
+            }
+            Node& child = nodes[best];
+            child.visits.fetch_add(batch, std::memory_order_relaxed);
+            movers.push_back(game.getCurrentPlayer());
+            game.makeMove(positionOf(child.from), positionOf(child.to));
+            path.push_back(best);
+        }
+
+        // Пакет розіграшів з одного листка; результати в півочках для кожного кольору
+        uint32_t blackReward = 0;
+        uint32_t whiteReward = 0;
+        for (uint32_t b = 0; b < batch; ++b) {
+            PieceColor result = terminal ? winner : rollout(game, rng);
+            blackReward += result == PieceColor::BLACK ? 2 : result == PieceColor::NONE ? 1 : 0;
+            whiteReward += result == PieceColor::WHITE ? 2 : result == PieceColor::NONE ? 1 : 0;
+        }
+
+        // Зворотне поширення: відвідування вже враховані при спуску, додаємо лише винагороду
+        for (size_t k = 1; k < path.size(); ++k) {
+            uint32_t reward = movers[k - 1] == PieceColor::BLACK ? blackReward : whiteReward;
+            nodes[path[k]].reward.fetch_add(reward, std::memory_order_relaxed);
+        }
+        for (size_t k = 1; k < path.size(); ++k) game.unmakeMove();
+        playouts.fetch_add(batch, std::memory_order_relaxed);
+    }
+}
+
+MctsResult Mcts::search(const Game& game, const MctsLimits& searchLimits) {
+    MctsResult result;
+    limits = searchLimits;
+    limits.threads = std::max(1, std::min(limits.threads, MAX_THREADS));
+    limits.batch = std::max(1, std::min(limits.batch, MAX_BATCH));
+    if (limits.maxPlayouts == 0 && limits.timeMs <= 0) limits.timeMs = 1000;
+    startTime = std::chrono::steady_clock::now();
+    iterations.store(0);
+    playouts.store(0);
+    stopped.store(limits.stop && limits.stop->load());
+
+    if (!hasTree || !reuseTree(game)) resetTree(game);
+    hasTree = true;
+    Node& root = nodes[0];
+    result.reusedVisits = root.visits.load();
+    if (!rootGame.isGameOver() && root.state.load() != EXPANDED) expand(root, rootGame);
+
+    if (root.state.load() == EXPANDED && root.childCount > 0) {
+        uint64_t seed = static_cast<uint64_t>(startTime.time_since_epoch().count());
+        std::vector<std::thread> helpers;
+        for (int t = 1; t < limits.threads; ++t) {
+            helpers.emplace_back(&Mcts::worker, this, seed + t);
+        }
+        worker(seed);
+        for (std::thread& helper : helpers) helper.join();
+
+        for (uint32_t i = 0; i < root.childCount; ++i) {
+            const Node& child = nodes[root.firstChild + i];
+            uint32_t visits = child.visits.load();
+            double value = visits ? child.reward.load() / (2.0 * visits) : 0.0;
+            result.rootMoves.push_back({{positionOf(child.from), positionOf(child.to)}, visits, value});
+        }
+        std::stable_sort(result.rootMoves.begin(), result.rootMoves.end(),
+                         [](const MctsMoveStat& a, const MctsMoveStat& b) {
+                             return a.visits != b.visits ? a.visits > b.visits : a.value > b.value;
+                         });
+        result.hasMove = true;
+        result.bestMove = result.rootMoves[0].move;
+    }
+
+    result.playouts = playouts.load();
+    result.iterations = result.playouts / limits.batch;
+    result.elapsedMs = elapsedMs();
+    result.playoutsPerSecond = result.playouts * 1000 / static_cast<uint64_t>(std::max(result.elapsedMs, 1));
+    result.treeNodes = used.load();
+    return result;
+}
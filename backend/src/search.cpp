@@ -0,0 +1,334 @@
+// backend/src/search.cpp
+#include "search.hpp"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+
+namespace {
+
+const int INF = 32000;
+const int CAPTURE_VALUE = 100;
+const int MOBILITY_VALUE = 2;           // за кожен хід понад ходи суперника
+const int THREAT_VALUE = 80;            // можемо захопити щось наступним ходом
+const int THREATENED_PIECE_VALUE = 30;  // за кожну нашу фігуру під загрозою
+
+int squareOf(const Position& pos) {
+    return pos.row * Board::BOARD_SIZE + pos.col;
+}
+
+Position positionOf(int square) {
+    return {square / Board::BOARD_SIZE, square % Board::BOARD_SIZE};
+}
+
+bool sameMove(const Move& a, const Move& b) {
+    return a.from == b.from && a.to == b.to;
+}
+
+// Скільки фігур суперника захопить хід (без виконання ходу; from вважається порожньою)
+int captureCount(const Game& game, const Move& move) {
+    PieceColor own = game.getCurrentPlayer();
+    PieceColor opp = (own == PieceColor::BLACK) ? PieceColor::WHITE : PieceColor::BLACK;
+    const int directions[][2] = {{0, 1}, {0, -1}, {1, 0}, {-1, 0}};
+    int total = 0;
+
+    for (const auto& dir : directions) {
+        Position pos{move.to.row + dir[0], move.to.col + dir[1]};
+        int run = 0;
+        while (pos.row >= 0 && pos.row < Board::BOARD_SIZE &&
+               pos.col >= 0 && pos.col < Board::BOARD_SIZE &&
+               game.getPieceAt(pos) == opp) {
+            run++;
+            pos.row += dir[0];
+            pos.col += dir[1];
+        }
+        if (run > 0 && !(pos == move.from) && game.getPieceAt(pos) == own) {
+            total += run;
+        }
+    }
+    return total;
+}
+
+// Перетворення рахунку мату між "від кореня" і "від поточного вузла" для TT
+int scoreToTT(int score, int ply) {
+    if (score > Searcher::MATE_SCORE - Searcher::MAX_PLY) return score + ply;
+    if (score < -Searcher::MATE_SCORE + Searcher::MAX_PLY) return score - ply;
+    return score;
+}
+
+int scoreFromTT(int score, int ply) {
+    if (score > Searcher::MATE_SCORE - Searcher::MAX_PLY) return score - ply;
+    if (score < -Searcher::MATE_SCORE + Searcher::MAX_PLY) return score + ply;
+    return score;
+}
+
+}
+
+uint64_t perft(Game& game, int depth) {
+    if (depth <= 0) return 1;
+    if (game.isGameOver()) return 0;
+
+    Move moves[Game::MAX_LEGAL_MOVES];
+    int count = game.getAllLegalMoves(moves, Game::MAX_LEGAL_MOVES);
+    if (depth == 1) return static_cast<uint64_t>(count);
+
+    uint64_t nodes = 0;
+    for (int i = 0; i < count; ++i) {
+        game.makeMove(moves[i].from, moves[i].to);
+        nodes += perft(game, depth - 1);
+        game.unmakeMove();
+    }
+    return nodes;
+}
+
+TranspositionTable::TranspositionTable(size_t sizeMb) {
+    resize(sizeMb);
+}
+
+void TranspositionTable::resize(size_t sizeMb) {
+    // Кількість записів - найбільший степінь двійки, що вміщається у sizeMb
+    size_t bytes = std::max<size_t>(sizeMb, 1) * 1024 * 1024;
+    size_t count = 1;
+    while (count * 2 * sizeof(Entry) <= bytes) count *= 2;
+    entries.assign(count, Entry());
+    mask = count - 1;
+}
+
+void TranspositionTable::clear() {
+    std::fill(entries.begin(), entries.end(), Entry());
+}
+
+const TranspositionTable::Entry* TranspositionTable::probe(uint64_t key) const {
+    const Entry& entry = entries[key & mask];
+    return (entry.bound != NONE && entry.key == key) ? &entry : nullptr;
+}
+
+void TranspositionTable::store(uint64_t key, int depth, int score, Bound bound, const Move& move) {
+    Entry& entry = entries[key & mask];
+    // Заміна: інша позиція або не менша глибина
+    if (entry.key != key || depth >= entry.depth) {
+        entry.key = key;
+        entry.score = static_cast<int16_t>(score);
+        entry.depth = static_cast<int8_t>(depth);
+        entry.bound = bound;
+        entry.from = static_cast<uint8_t>(squareOf(move.from));
+        entry.to = static_cast<uint8_t>(squareOf(move.to));
+    }
+}
+
+Searcher::Searcher(size_t hashMb) :
+    tt(hashMb),
+    moveStack(MAX_PLY * Game::MAX_LEGAL_MOVES),
+    scoreStack(MAX_PLY * Game::MAX_LEGAL_MOVES) {
+    clear();
+}
+
+void Searcher::setHashSize(size_t sizeMb) {
+    tt.resize(sizeMb);
+}
+
+void Searcher::clear() {
+    tt.clear();
+    std::memset(killers, 0, sizeof(killers));
+    std::memset(history, 0, sizeof(history));
+}
+
+int Searcher::elapsedMs() const {
+    return static_cast<int>(std::chrono::duration_cast<std::chrono::milliseconds>(
+        std::chrono::steady_clock::now() - startTime).count());
+}
+
+bool Searcher::checkLimits() {
+    int elapsed = elapsedMs();
+    if (limits.maxNodes > 0 && nodes >= limits.maxNodes) stopped = true;
+    if (limits.timeMs > 0 && elapsed >= limits.timeMs) stopped = true;
+    if (limits.stop && limits.stop->load(std::memory_order_relaxed)) stopped = true;
+    if (!stopped && limits.onProgress && current &&
+        elapsed - lastProgressMs >= limits.progressIntervalMs) {
+        reportProgress(*current);
+    }
+    return stopped;
+}
+
+void Searcher::reportProgress(SearchResult& result) {
+    result.nodes = nodes;
+    result.elapsedMs = elapsedMs();
+    result.nodesPerSecond = nodes * 1000 / static_cast<uint64_t>(std::max(result.elapsedMs, 1));
+    lastProgressMs = result.elapsedMs;
+    limits.onProgress(result);
+}
+
+int Searcher::evaluate(const Game& game) const {
+    PieceColor side = game.getCurrentPlayer();
+    int black = game.getBlackCaptured();
+    int white = game.getWhiteCaptured();
+    int material = (side == PieceColor::BLACK) ? black - white : white - black;
+
+    // Невеликий бонус за фігури ближче до центру: їх важче затиснути біля краю
+    int positional = 0;
+    for (int row = 0; row < Board::BOARD_SIZE; ++row) {
+        for (int col = 0; col < Board::BOARD_SIZE; ++col) {
+            PieceColor piece = game.getPieceAt({row, col});
+            if (piece == PieceColor::NONE) continue;
+            int centrality = 4 - std::max(std::abs(row - 4), std::abs(col - 4));
+            positional += (piece == side) ? centrality : -centrality;
+        }
+    }
+
+    // Карти дошки: рухливість сторін і фігури, які можна захопити одним ходом.
+    // Ходимо ми, тож загроза фігурам суперника - майже захоплення, а нашим - лише ризик
+    const Board& board = game.getBoard();
+    PieceColor opp = (side == PieceColor::BLACK) ? PieceColor::WHITE : PieceColor::BLACK;
+    int mobility = board.getSideMobility(side) - board.getSideMobility(opp);
+    int threats = (board.getThreatenedCount(opp) > 0 ? THREAT_VALUE : 0) -
+                  board.getThreatenedCount(side) * THREATENED_PIECE_VALUE;
+    return material * CAPTURE_VALUE + positional + mobility * MOBILITY_VALUE + threats;
+}
+
+void Searcher::orderMoves(const Game& game, Move* moves, int* scores, int count,
+                          const Move& ttMove, int ply) const {
+    for (int i = 0; i < count; ++i) {
+        const Move& move = moves[i];
+        if (sameMove(move, ttMove)) {
+            scores[i] = 1 << 30;
+        } else if (int captured = captureCount(game, move)) {
+            scores[i] = (1 << 29) + captured;
+        } else if (sameMove(move, killers[ply][0])) {
+            scores[i] = (1 << 28) + 1;
+        } else if (sameMove(move, killers[ply][1])) {
+            scores[i] = 1 << 28;
+        } else {
+            scores[i] = history[squareOf(move.from)][squareOf(move.to)];
+        }
+    }
+
+    // Сортування вставками: ходів небагато, а масиви вже виділені
+    for (int i = 1; i < count; ++i) {
+        Move move = moves[i];
+        int score = scores[i];
+        int j = i - 1;
+        while (j >= 0 && scores[j] < score) {
+            moves[j + 1] = moves[j];
+            scores[j + 1] = scores[j];
+            --j;
+        }
+        moves[j + 1] = move;
+        scores[j + 1] = score;
+    }
+}
+
+int Searcher::alphaBeta(Game& game, int depth, int ply, int alpha, int beta) {
+    pvLength[ply] = ply;
+    if ((++nodes & 1023) == 0 && checkLimits()) return 0;
+
+    if (game.isGameOver()) {
+        // Перемогу міг здобути лише суперник своїм останнім ходом; інакше - нічия
+        return game.getWinner() == PieceColor::NONE ? 0 : -MATE_SCORE + ply;
+    }
+    // Повторення позиції всередині дерева рахуємо нічиєю, щоб не ганяти фігури по колу
+    if (ply > 0 && game.getRepetitionCount() > 1) return 0;
+    if (depth <= 0 || ply >= MAX_PLY - 1) return evaluate(game);
+
+    uint64_t key = game.getPositionHash();
+    Move ttMove{{-1, -1}, {-1, -1}};
+    if (const TranspositionTable::Entry* entry = tt.probe(key)) {
+        ttMove = {positionOf(entry->from), positionOf(entry->to)};
+        if (ply > 0 && entry->depth >= depth) {
+            int score = scoreFromTT(entry->score, ply);
+            if (entry->bound == TranspositionTable::EXACT ||
+                (entry->bound == TranspositionTable::LOWER && score >= beta) ||
+                (entry->bound == TranspositionTable::UPPER && score <= alpha)) {
+                return score;
+            }
+        }
+    }
+
+    Move* moves = &moveStack[ply * Game::MAX_LEGAL_MOVES];
+    int* scores = &scoreStack[ply * Game::MAX_LEGAL_MOVES];
+    int count = game.getAllLegalMoves(moves, Game::MAX_LEGAL_MOVES);
+    if (count == 0) return -MATE_SCORE + ply;  // немає ходів - поразка
+    orderMoves(game, moves, scores, count, ttMove, ply);
+
+    int originalAlpha = alpha;
+    int bestScore = -INF;
+    Move bestMove = moves[0];
+
+    for (int i = 0; i < count; ++i) {
+        const Move move = moves[i];
+        game.makeMove(move.from, move.to);
+        int score = -alphaBeta(game, depth - 1, ply + 1, -beta, -alpha);
+        game.unmakeMove();
+        if (stopped) return 0;
+
+        if (score > bestScore) {
+            bestScore = score;
+            bestMove = move;
+            if (score > alpha) {
+                alpha = score;
+                pvTable[ply][ply] = move;
+                for (int j = ply + 1; j < pvLength[ply + 1]; ++j) {
+                    pvTable[ply][j] = pvTable[ply + 1][j];
+                }
+                pvLength[ply] = pvLength[ply + 1];
+
+                if (alpha >= beta) {
+                    if (captureCount(game, move) == 0) {
+                        if (!sameMove(move, killers[ply][0])) {
+                            killers[ply][1] = killers[ply][0];
+                            killers[ply][0] = move;
+                        }
+                        history[squareOf(move.from)][squareOf(move.to)] += depth * depth;
+                    }
+                    break;
+                }
+            }
+        }
+    }
+
+    TranspositionTable::Bound bound = TranspositionTable::EXACT;
+    if (bestScore <= originalAlpha) bound = TranspositionTable::UPPER;
+    else if (bestScore >= beta) bound = TranspositionTable::LOWER;
+    tt.store(key, depth, scoreToTT(bestScore, ply), bound, bestMove);
+    return bestScore;
+}
+
+SearchResult Searcher::search(const Game& game, const SearchLimits& searchLimits) {
+    SearchResult result;
+    limits = searchLimits;
+    limits.maxDepth = std::max(1, std::min(limits.maxDepth, MAX_PLY - 1));
+    startTime = std::chrono::steady_clock::now();
+    nodes = 0;
+    stopped = limits.stop && limits.stop->load();
+    current = &result;
+    lastProgressMs = 0;
+    std::memset(killers, 0, sizeof(killers));
+
+    // Єдина копія на пошук: далі дерево обходимо через makeMove/unmakeMove
+    Game root = game;
+    Move rootMoves[Game::MAX_LEGAL_MOVES];
+    int rootCount = root.isGameOver() ? 0 : root.getAllLegalMoves(rootMoves, Game::MAX_LEGAL_MOVES);
+    if (rootCount > 0) {
+        // Запасний хід на випадок, якщо ліміт спрацює ще на першій ітерації
+        result.hasMove = true;
+        result.bestMove = rootMoves[0];
+    }
+
+    for (int depth = 1; rootCount > 0 && !stopped && depth <= limits.maxDepth; ++depth) {
+        int score = alphaBeta(root, depth, 0, -INF, INF);
+        if (stopped) break;
+
+        result.bestMove = pvTable[0][0];
+        result.score = score;
+        result.depth = depth;
+        result.pv.assign(pvTable[0], pvTable[0] + pvLength[0]);
+        if (limits.onProgress) reportProgress(result);
+
+        // Знайдений форсований результат глибша ітерація вже не змінить
+        if (std::abs(score) >= MATE_SCORE - MAX_PLY) break;
+    }
+
+    current = nullptr;
+    result.nodes = nodes;
+    result.elapsedMs = elapsedMs();
+    result.nodesPerSecond = nodes * 1000 / static_cast<uint64_t>(std::max(result.elapsedMs, 1));
+    return result;
+}
@@ -0,0 +1,511 @@
+// backend/src/tablebase.cpp
+#include "tablebase.hpp"
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <climits>
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <memory>
+#include <thread>
+#include <vector>
+
+namespace tablebase {
+namespace {
+
+const int CELLS = Board::CELLS;
+// Фігур у кожного на початку гри: захопити всі = 9 захоплень
+const int START_PIECES = Board::BOARD_SIZE;
+const int VALUE_SHIFT = 14;
+const uint64_t CHUNK = 1 << 14;
+// Понад це таблиця не вміщається в пам'ять генератора (3 байти на позицію)
+const uint64_t MAX_TABLE_POSITIONS = 1ULL << 31;
+
+struct Binomials {
+    uint64_t c[CELLS + 1][MAX_PIECES + 1];
+
+    Binomials() {
+        for (int n = 0; n <= CELLS; ++n) {
+            c[n][0] = 1;
+            for (int k = 1; k <= MAX_PIECES; ++k) c[n][k] = n == 0 ? 0 : c[n - 1][k - 1] + c[n - 1][k];
+        }
+    }
+};
+
+const Binomials binomials;
+
+uint64_t choose(int n, int k) {
+    return n < 0 ? 0 : binomials.c[n][k];
+}
+
+uint16_t pack(Value value, int distance) {
+    return static_cast<uint16_t>((value << VALUE_SHIFT) | std::min(distance, MAX_DISTANCE));
+}
+
+Value valueOf(uint16_t entry) {
+    return static_cast<Value>(entry >> VALUE_SHIFT);
+}
+
+int distanceOf(uint16_t entry) {
+    return entry & MAX_DISTANCE;
+}
+
+Position positionOf(int square) {
+    return {square / Board::BOARD_SIZE, square % Board::BOARD_SIZE};
+}
+
+uint8_t squareOf(const Position& pos) {
+    return static_cast<uint8_t>(pos.row * Board::BOARD_SIZE + pos.col);
+}
+
+PieceColor opponentOf(PieceColor color) {
+    return color == PieceColor::BLACK ? PieceColor::WHITE : PieceColor::BLACK;
+}
+
+// Комбінаторна система числення: відсортована множина s0 < s1 < ... -> sum C(s_i, i + 1)
+uint64_t rankSet(const uint8_t* squares, int count) {
+    uint64_t rank = 0;
+    for (int i = 0; i < count; ++i) rank += choose(squares[i], i + 1);
+    return rank;
+}
+
+void unrankSet(uint64_t rank, int count, int n, uint8_t* out) {
+    int square = n - 1;
+    for (int i = count; i >= 1; --i) {
+        while (choose(square, i) > rank) --square;
+        out[i - 1] = static_cast<uint8_t>(square);
+        rank -= choose(square, i);
+        --square;
+    }
+}
+
+uint16_t read16(const uint8_t* p) {
+    return static_cast<uint16_t>(p[0] | (p[1] << 8));
+}
+
+uint32_t read32(const uint8_t* p) {
+    return static_cast<uint32_t>(read16(p)) | (static_cast<uint32_t>(read16(p + 2)) << 16);
+}
+
+uint64_t read64(const uint8_t* p) {
+    return static_cast<uint64_t>(read32(p)) | (static_cast<uint64_t>(read32(p + 4)) << 32);
+}
+
+void write16(uint8_t* p, uint16_t v) {
+    p[0] = static_cast<uint8_t>(v);
+    p[1] = static_cast<uint8_t>(v >> 8);
+}
+
+void write32(uint8_t* p, uint32_t v) {
+    write16(p, static_cast<uint16_t>(v));
+    write16(p + 2, static_cast<uint16_t>(v >> 16));
+}
+
+void write64(uint8_t* p, uint64_t v) {
+    write32(p, static_cast<uint32_t>(v));
+    write32(p + 4, static_cast<uint32_t>(v >> 32));
+}
+
+// Розстановка з таблиці: відсортовані клітинки фігур кожного кольору і хто ходить
+struct Pieces {
+    int count[3];                     // індекс - PieceColor
+    uint8_t squares[3][MAX_PIECES];
+    PieceColor side;
+
+    uint64_t index() const {
+        return indexOf(squares[1], count[1], squares[2], count[2], side);
+    }
+};
+
+void decode(uint64_t index, int black, int white, Pieces& pieces) {
+    pieces.count[1] = black;
+    pieces.count[2] = white;
+    pieces.side = (index & 1) ? PieceColor::WHITE : PieceColor::BLACK;
+    index >>= 1;
+    uint64_t whiteSets = choose(CELLS - black, white);
+    uint8_t* blackSquares = pieces.squares[1];
+    uint8_t* whiteSquares = pieces.squares[2];
+    unrankSet(index / whiteSets, black, CELLS, blackSquares);
+    unrankSet(index % whiteSets, white, CELLS - black, whiteSquares);
+    // Номер серед вільних від чорних клітинок -> клітинка дошки
+    for (int i = 0; i < white; ++i) {
+        int square = whiteSquares[i];
+        for (int j = 0; j < black; ++j) {
+            if (blackSquares[j] <= square) ++square;
+        }
+        whiteSquares[i] = static_cast<uint8_t>(square);
+    }
+}
+
+void place(Board& board, const Pieces& pieces, bool on) {
+    for (int color = 1; color <= 2; ++color) {
+        for (int i = 0; i < pieces.count[color]; ++i) {
+            board.setPieceAt(positionOf(pieces.squares[color][i]),
+                             on ? static_cast<PieceColor>(color) : PieceColor::NONE);
+        }
+    }
+}
+
+// Переставляє фігуру з from на to, зберігаючи список відсортованим
+void moveSquare(uint8_t* squares, int count, uint8_t from, uint8_t to) {
+    int i = 0;
+    while (squares[i] != from) ++i;
+    squares[i] = to;
+    while (i > 0 && squares[i - 1] > squares[i]) {
+        std::swap(squares[i - 1], squares[i]);
+        --i;
+    }
+    while (i + 1 < count && squares[i + 1] < squares[i]) {
+        std::swap(squares[i + 1], squares[i]);
+        ++i;
+    }
+}
+
+struct Table {
+    int black;
+    int white;
+    std::vector<uint16_t> values;
+};
+
+class Generator {
+public:
+    Generator(int threads, const std::function<void(const std::string&)>& log)
+        : threads(threads), log(log) {}
+
+    bool build(int black, int white);
+    const std::vector<std::unique_ptr<Table>>& tables() const { return done; }
+
+private:
+    int threads;
+    const std::function<void(const std::string&)>& log;
+    std::vector<std::unique_ptr<Table>> done;
+    const Table* byMaterial[MAX_PIECES + 1][MAX_PIECES + 1] = {};
+
+    // Таблиця, що генерується: значення (0 - ще невідоме; тоді в бітах відстані -
+    // найбільша відстань виграшу суперника серед уже відомих нащадків) і скільки
+    // нащадків ще можуть виявитись не програшними для того, хто ходить
+    int black = 0;
+    int white = 0;
+    uint64_t size = 0;
+    std::unique_ptr<std::atomic<uint16_t>[]> state;
+    std::unique_ptr<std::atomic<uint8_t>[]> pending;
+    std::atomic<int> maxDistance{0};
+
+    template <typename F>
+    void parallelFor(uint64_t total, F body);
+    void initPosition(uint64_t index, Board& board);
+    void propagate(uint64_t index, int level, Board& board);
+    void raiseMaxDistance(int distance);
+};
+
+template <typename F>
+void Generator::parallelFor(uint64_t total, F body) {
+    std::atomic<uint64_t> next{0};
+    auto work = [&] {
+        Board board;
+        uint8_t empty[CELLS] = {};
+        board.fromBytes(empty);
+        for (;;) {
+            uint64_t begin = next.fetch_add(CHUNK);
+            if (begin >= total) break;
+            uint64_t end = std::min(total, begin + CHUNK);
+            for (uint64_t i = begin; i < end; ++i) body(i, board);
+        }
+    };
+    std::vector<std::thread> helpers;
+    for (int t = 1; t < threads; ++t) helpers.emplace_back(work);
+    work();
+    for (std::thread& helper : helpers) helper.join();
+}
+
+void Generator::raiseMaxDistance(int distance) {
+    int current = maxDistance.load(std::memory_order_relaxed);
+    while (distance > current && !maxDistance.compare_exchange_weak(current, distance)) {}
+}
+
+// Оцінка за ходами, що ведуть у вже готові таблиці (захоплення); ходи без захоплень
+// лишаються в pending і розв'язуються зворотним проходом
+void Generator::initPosition(uint64_t index, Board& board) {
+    Pieces pieces;
+    decode(index, black, white, pieces);
+    PieceColor side = pieces.side;
+    PieceColor opp = opponentOf(side);
+    int own = static_cast<int>(side);
+    int other = static_cast<int>(opp);
+    place(board, pieces, true);
+
+    bool anyMove = false;
+    int bestWin = INT_MAX;
+    int maxLoss = 0;
+    int unresolved = 0;
+    Position targets[Board::MAX_PIECE_MOVES];
+    Position captured[Board::MAX_CAPTURES];
+    for (int k = 0; k < pieces.count[own]; ++k) {
+        uint8_t fromSquare = pieces.squares[own][k];
+        Position from = positionOf(fromSquare);
+        int targetCount = board.generateMoves(from, targets);
+        for (int t = 0; t < targetCount; ++t) {
+            anyMove = true;
+            const Position& to = targets[t];
+            board.setPieceAt(from, PieceColor::NONE);
+            board.setPieceAt(to, side);
+            int captureCount = board.findCaptures(to, captured);
+            board.setPieceAt(to, PieceColor::NONE);
+            board.setPieceAt(from, side);
+            if (captureCount == 0) {
+                ++unresolved;
+                continue;
+            }
+
+            uint16_t child;
+            if (captureCount >= pieces.count[other]) {
+                child = pack(LOSS, 0);  // суперник без фігур - він програв
+            } else {
+                Pieces next = pieces;
+                moveSquare(next.squares[own], next.count[own], fromSquare, squareOf(to));
+                int kept = 0;
+                for (int i = 0; i < pieces.count[other]; ++i) {
+                    uint8_t square = pieces.squares[other][i];
+                    bool taken = false;
+                    for (int c = 0; c < captureCount && !taken; ++c) taken = squareOf(captured[c]) == square;
+                    if (!taken) next.squares[other][kept++] = square;
+                }
+                next.count[other] = kept;
+                next.side = opp;
+                child = byMaterial[next.count[1]][next.count[2]]->values[next.index()];
+            }
+            switch (valueOf(child)) {
+                case LOSS: bestWin = std::min(bestWin, distanceOf(child) + 1); break;
+                case WIN: maxLoss = std::max(maxLoss, distanceOf(child)); break;
+                default: ++unresolved; break;  // нічия - ніколи не стане програшем
+            }
+        }
+    }
+    place(board, pieces, false);
+
+    uint16_t entry;
+    if (!anyMove) {
+        entry = pack(LOSS, 0);
+    } else if (bestWin != INT_MAX) {
+        entry = pack(WIN, bestWin);
+    } else if (unresolved == 0) {
+        entry = pack(LOSS, maxLoss + 1);
+    } else {
+        entry = static_cast<uint16_t>(maxLoss);
+    }
+    if (valueOf(entry) != DRAW) raiseMaxDistance(distanceOf(entry));
+    state[index].store(entry, std::memory_order_relaxed);
+    pending[index].store(static_cast<uint8_t>(unresolved), std::memory_order_relaxed);
+}
+
+// Позиція index розв'язана на рівні level: оновлюємо попередників у цій же таблиці -
+// позиції, з яких суперник дійшов сюди ходом без захоплення
+void Generator::propagate(uint64_t index, int level, Board& board) {
+    uint16_t entry = state[index].load(std::memory_order_relaxed);
+    Value value = valueOf(entry);
+    if (value == DRAW || distanceOf(entry) != level) return;
+
+    Pieces pieces;
+    decode(index, black, white, pieces);
+    PieceColor mover = opponentOf(pieces.side);
+    int own = static_cast<int>(mover);
+    place(board, pieces, true);
+
+    Position captured[Board::MAX_CAPTURES];
+    const int directions[][2] = {{0, 1}, {0, -1}, {1, 0}, {-1, 0}};
+    for (int k = 0; k < pieces.count[own]; ++k) {
+        uint8_t toSquare = pieces.squares[own][k];
+        Position to = positionOf(toSquare);
+        // Якби фігура прийшла сюди ходом, вона б уже захопила ці фігури
+        if (board.findCaptures(to, captured) > 0) continue;
+        for (const auto& dir : directions) {
+            Position from{to.row + dir[0], to.col + dir[1]};
+            while (board.isValidPosition(from) && board.getPieceAt(from) == PieceColor::NONE) {
+                Pieces previous = pieces;
+                moveSquare(previous.squares[own], previous.count[own], toSquare, squareOf(from));
+                previous.side = mover;
+                uint64_t parent = previous.index();
+
+                if (value == LOSS) {
+                    uint16_t want = pack(WIN, level + 1);
+                    uint16_t current = state[parent].load(std::memory_order_relaxed);
+                    while (valueOf(current) == DRAW ||
+                           (valueOf(current) == WIN && distanceOf(current) > level + 1)) {
+                        if (state[parent].compare_exchange_weak(current, want)) {
+                            raiseMaxDistance(level + 1);
+                            break;
+                        }
+                    }
+                } else if (pending[parent].fetch_sub(1, std::memory_order_relaxed) == 1) {
+                    // Усі ходи попередника ведуть до виграшу суперника
+                    uint16_t current = state[parent].load(std::memory_order_relaxed);
+                    while (valueOf(current) == DRAW) {
+                        int distance = std::max(distanceOf(current), level) + 1;
+                        if (state[parent].compare_exchange_weak(current, pack(LOSS, distance))) {
+                            raiseMaxDistance(distance);
+                            break;
+                        }
+                    }
+                }
+                from.row += dir[0];
+                from.col += dir[1];
+            }
+        }
+    }
+    place(board, pieces, false);
+}
+
+bool Generator::build(int blackCount, int whiteCount) {
+    auto start = std::chrono::steady_clock::now();
+    black = blackCount;
+    white = whiteCount;
+    size = tableSize(black, white);
+    char line[256];
+    if (size > MAX_TABLE_POSITIONS) {
+        std::snprintf(line, sizeof(line), "table %dv%d: %llu positions is too large",
+                      black, white, static_cast<unsigned long long>(size));
+        log(line);
+        return false;
+    }
+    state.reset(new std::atomic<uint16_t>[size]);
+    pending.reset(new std::atomic<uint8_t>[size]);
+    maxDistance.store(0);
+
+    parallelFor(size, [this](uint64_t i, Board& board) { initPosition(i, board); });
+    int levels = 0;
+    for (int level = 0; level <= maxDistance.load() && level < MAX_DISTANCE; ++level, ++levels) {
+        parallelFor(size, [this, level](uint64_t i, Board& board) { propagate(i, level, board); });
+    }
+
+    std::unique_ptr<Table> table(new Table{black, white, std::vector<uint16_t>(size)});
+    uint64_t counts[3] = {0, 0, 0};
+    for (uint64_t i = 0; i < size; ++i) {
+        uint16_t entry = state[i].load(std::memory_order_relaxed);
+        Value value = valueOf(entry);
+        table->values[i] = value == DRAW ? 0 : entry;  // невідоме після всіх рівнів - нічия
+        counts[value]++;
+    }
+    state.reset();
+    pending.reset();
+    byMaterial[black][white] = table.get();
+    done.push_back(std::move(table));
+
+    double seconds = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    std::snprintf(line, sizeof(line),
+                  "table %dv%d: %llu positions, win %llu, loss %llu, draw %llu, "
+                  "max distance %d, %d levels, %.1f s",
+                  black, white, static_cast<unsigned long long>(size),
+                  static_cast<unsigned long long>(counts[WIN]),
+                  static_cast<unsigned long long>(counts[LOSS]),
+                  static_cast<unsigned long long>(counts[DRAW]),
+                  maxDistance.load(), levels, seconds);
+    log(line);
+    return true;
+}
+
+bool writeFile(const std::string& path, int maxPieces, const std::vector<std::unique_ptr<Table>>& tables) {
+    std::ofstream out(path, std::ios::binary | std::ios::trunc);
+    if (!out) return false;
+    uint8_t header[HEADER_SIZE] = {'H', 'S', 'T', 'B'};
+    write16(header + 4, VERSION);
+    write16(header + 6, static_cast<uint16_t>(maxPieces));
+    write32(header + 8, static_cast<uint32_t>(tables.size()));
+    out.write(reinterpret_cast<const char*>(header), sizeof(header));
+
+    uint64_t offset = HEADER_SIZE + DIRECTORY_ENTRY_SIZE * tables.size();
+    for (const auto& table : tables) {
+        uint8_t entry[DIRECTORY_ENTRY_SIZE] = {};
+        entry[0] = static_cast<uint8_t>(table->black);
+        entry[1] = static_cast<uint8_t>(table->white);
+        write64(entry + 8, offset);
+        write64(entry + 16, table->values.size());
+        out.write(reinterpret_cast<const char*>(entry), sizeof(entry));
+        offset += 2 * table->values.size();
+    }
+    std::vector<uint8_t> buffer;
+    for (const auto& table : tables) {
+        buffer.resize(2 * table->values.size());
+        for (size_t i = 0; i < table->values.size(); ++i) write16(&buffer[2 * i], table->values[i]);
+        out.write(reinterpret_cast<const char*>(buffer.data()), static_cast<std::streamsize>(buffer.size()));
+    }
+    return static_cast<bool>(out);
+}
+
+}  // namespace
+
+uint64_t tableSize(int black, int white) {
+    return choose(CELLS, black) * choose(CELLS - black, white) * 2;
+}
+
+uint64_t indexOf(const uint8_t* blackSquares, int black, const uint8_t* whiteSquares, int white,
+                 PieceColor side) {
+    // Білі нумеруються серед клітинок, не зайнятих чорними
+    uint8_t compressed[MAX_PIECES];
+    for (int i = 0; i < white; ++i) {
+        int below = 0;
+        for (int j = 0; j < black; ++j) below += blackSquares[j] < whiteSquares[i];
+        compressed[i] = static_cast<uint8_t>(whiteSquares[i] - below);
+    }
+    uint64_t index = rankSet(blackSquares, black) * choose(CELLS - black, white) + rankSet(compressed, white);
+    return (index << 1) | (side == PieceColor::WHITE ? 1 : 0);
+}
+
+bool generate(const std::string& path, int maxPieces, int maxTotal, int threads,
+              const std::function<void(const std::string&)>& log) {
+    if (maxPieces < 1 || maxPieces > MAX_PIECES) return false;
+    if (maxTotal <= 0 || maxTotal > 2 * maxPieces) maxTotal = 2 * maxPieces;
+    if (threads <= 0) threads = std::max(1u, std::thread::hardware_concurrency());
+
+    // Захоплення лише зменшують кількість фігур, тож таблиці будуємо від меншої до більшої
+    Generator generator(threads, log);
+    for (int total = 2; total <= maxTotal; ++total) {
+        for (int black = 1; black <= maxPieces; ++black) {
+            int white = total - black;
+            if (white < 1 || white > maxPieces) continue;
+            if (!generator.build(black, white)) return false;
+        }
+    }
+    return writeFile(path, maxPieces, generator.tables());
+}
+
+bool probe(const uint8_t* data, size_t size, const Game& game, Entry* out) {
+    if (!data || size < HEADER_SIZE || std::memcmp(data, "HSTB", 4) != 0) return false;
+    if (read16(data + 4) != VERSION) return false;
+    uint64_t tableCount = read32(data + 8);
+    if (HEADER_SIZE + tableCount * DIRECTORY_ENTRY_SIZE > size) return false;
+    if (game.isGameOver()) return false;
+
+    uint8_t cells[CELLS];
+    game.getBoardBytes(cells);
+    uint8_t squares[3][MAX_PIECES];
+    int count[3] = {0, 0, 0};
+    for (int square = 0; square < CELLS; ++square) {
+        int color = cells[square];
+        if (color == 0) continue;
+        if (count[color] == MAX_PIECES) return false;
+        squares[color][count[color]++] = static_cast<uint8_t>(square);
+    }
+    if (count[1] == 0 || count[2] == 0) return false;
+    // Таблиці рахують перемогу як захоплення всіх фігур на дошці
+    if (game.getBlackCaptured() != START_PIECES - count[2] ||
+        game.getWhiteCaptured() != START_PIECES - count[1]) {
+        return false;
+    }
+
+    for (uint64_t t = 0; t < tableCount; ++t) {
+        const uint8_t* entry = data + HEADER_SIZE + t * DIRECTORY_ENTRY_SIZE;
+        if (entry[0] != count[1] || entry[1] != count[2]) continue;
+        uint64_t offset = read64(entry + 8);
+        uint64_t positions = read64(entry + 16);
+        uint64_t index = indexOf(squares[1], count[1], squares[2], count[2], game.getCurrentPlayer());
+        if (index >= positions || offset > size || 2 * positions > size - offset) return false;
+        uint16_t value = read16(data + offset + 2 * index);
+        out->value = valueOf(value);
+        out->distance = distanceOf(value);
+        return true;
+    }
+    return false;
+}
+
+}  // namespace tablebase
@@ -0,0 +1,103 @@
+// backend/src/zobrist.cpp
+#include "zobrist.hpp"
+#include "game.hpp"
+
+namespace {
+
+const int SQUARES = Board::BOARD_SIZE * Board::BOARD_SIZE;
+
+struct KeyTable {
+    uint64_t pieces[SQUARES][3];
+    uint64_t side;
+
+    KeyTable() {
+        // splitmix64 з фіксованим seed, щоб ключі були однакові між запусками
+        uint64_t state = 0x9E3779B97F4A7C15ULL;
+        auto next = [&state]() {
+            uint64_t z = (state += 0x9E3779B97F4A7C15ULL);
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+            return z ^ (z >> 31);
+        };
+        for (int sq = 0; sq < SQUARES; ++sq) {
+            pieces[sq][0] = 0;  // порожня клітинка не змінює ключ
+            pieces[sq][1] = next();
+            pieces[sq][2] = next();
+        }
+        side = next();
+    }
+};
+
+const KeyTable& keys() {
+    static const KeyTable table;
+    return table;
+}
+
+}
+
+namespace zobrist {
+
+uint64_t pieceKey(int square, PieceColor color) {
+    return keys().pieces[square][static_cast<int>(color)];
+}
+
+uint64_t sideKey() {
+    return keys().side;
+}
+
+int transformSquare(int square, int symmetry) {
+    int row = square / Board::BOARD_SIZE;
+    int col = square % Board::BOARD_SIZE;
+    if (symmetry & MIRROR) col = Board::BOARD_SIZE - 1 - col;
+    if (symmetry & SWAP) row = Board::BOARD_SIZE - 1 - row;
+    return row * Board::BOARD_SIZE + col;
+}
+
+PieceColor transformColor(PieceColor color, int symmetry) {
+    if (!(symmetry & SWAP) || color == PieceColor::NONE) return color;
+    return color == PieceColor::BLACK ? PieceColor::WHITE : PieceColor::BLACK;
+}
+
+uint64_t symmetricHash(const Game& game, int symmetry) {
+    uint64_t key = 0;
+    for (int sq = 0; sq < SQUARES; ++sq) {
+        PieceColor color = game.getPieceAt({sq / Board::BOARD_SIZE, sq % Board::BOARD_SIZE});
+        key ^= pieceKey(transformSquare(sq, symmetry), transformColor(color, symmetry));
+    }
+    if (transformColor(game.getCurrentPlayer(), symmetry) == PieceColor::WHITE) key ^= sideKey();
+    return key;
+}
+
+uint64_t canonicalHash(const Game& game, int* symmetry) {
+    // Усі чотири ключі за один прохід по дошці
+    uint64_t keysOf[SYMMETRIES] = {0, 0, 0, 0};
+    for (int sq = 0; sq < SQUARES; ++sq) {
+        PieceColor color = game.getPieceAt({sq / Board::BOARD_SIZE, sq % Board::BOARD_SIZE});
+        if (color == PieceColor::NONE) continue;
+        for (int s = 0; s < SYMMETRIES; ++s) {
+            keysOf[s] ^= pieceKey(transformSquare(sq, s), transformColor(color, s));
+        }
+    }
+    for (int s = 0; s < SYMMETRIES; ++s) {
+        if (transformColor(game.getCurrentPlayer(), s) == PieceColor::WHITE) keysOf[s] ^= sideKey();
+    }
+    int best = IDENTITY;
+    for (int s = 1; s < SYMMETRIES; ++s) {
+        if (keysOf[s] < keysOf[best]) best = s;
+    }
+    if (symmetry) *symmetry = best;
+    return keysOf[best];
+}
+
+uint64_t hash(const Game& game) {
+    uint64_t key = 0;
+    for (int row = 0; row < Board::BOARD_SIZE; ++row) {
+        for (int col = 0; col < Board::BOARD_SIZE; ++col) {
+            key ^= pieceKey(row * Board::BOARD_SIZE + col, game.getPieceAt({row, col}));
+        }
+    }
+    if (game.getCurrentPlayer() == PieceColor::WHITE) key ^= sideKey();
+    return key;
+}
+
+}
@@ -0,0 +1,257 @@
+// backend/tools/bench.cpp
+// Мікробенчмарки ядра: perft від початкової і фіксованих позицій мідлгейму,
+// генерація ходів, пошук захоплень, карти рухливості й загроз, серіалізація дошки,
+// розіграші MCTS.
+// Використання: hasami_bench [--json] [--depth N] [--repeat N]
+// З --json друкує один JSON-об'єкт (його читає frontend/benchmarks.py).
+#include "game.hpp"
+#include "mcts.hpp"
+#include "search.hpp"
+#include <algorithm>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <vector>
+
+namespace {
+
+struct BenchPosition {
+    const char* name;
+    const char* cells;  // 81 символ по рядках: '.', 'B', 'W'
+    PieceColor player;
+    int blackCaptured;
+    int whiteCaptured;
+};
+
+// Позиції з випадкових партій після 24-120 ходів.
+// Не змінювати: від них залежать базові кількості вузлів perft.
+const BenchPosition POSITIONS[] = {
+    {"initial",
+     "BBBBBBBBB" "........." "........." "........." "........."
+     "........." "........." "........." "WWWWWWWWW",
+     PieceColor::BLACK, 0, 0},
+    {"midgame-24",
+     "BB.....BB" "....BB..." "....B.B.." "...B....." ".W.....W."
+     "W.....W.." "..W..W..." "....W...." "...WW....",
+     PieceColor::BLACK, 0, 0},
+    {"midgame-48",
+     ".......B." "......BB." "B........" ".....W.W." "....B...B"
+     "...WB...B" "....W...." ".WB.W..W." "..W.....W",
+     PieceColor::BLACK, 0, 0},
+    {"midgame-80",
+     "W....B.B." "..W....W." ".B.B....." "....BW..." "W........"
+     "..WBBB..." "...B....." "........." ".W......W",
+     PieceColor::BLACK, 1, 0},
+    {"endgame-120",
+     "..B..B..." "........." "B..W....." "...B.B..." ".W...W..."
+     "...W....." "...W....." "BB.W.W..." ".....W...",
+     PieceColor::BLACK, 1, 2},
+};
+
+Game makeGame(const BenchPosition& position) {
+    uint8_t cells[Board::CELLS];
+    for (int sq = 0; sq < Board::CELLS; ++sq) {
+        char c = position.cells[sq];
+        cells[sq] = static_cast<uint8_t>(c == 'B' ? PieceColor::BLACK :
+                                         c == 'W' ? PieceColor::WHITE : PieceColor::NONE);
+    }
+    Game game;
+    game.setPosition(cells, position.player, position.blackCaptured, position.whiteCaptured);
+    return game;
+}
+
+Board makeBoard(const Game& game) {
+    Board board;
+    board.deserialize(game.getBoardState());
+    return board;
+}
+
+double secondsSince(std::chrono::steady_clock::time_point start) {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+// Найкращий із repeat замірів, нс на одну операцію
+template <typename F>
+double timeOps(int repeat, long ops, F body) {
+    double best = 1e30;
+    for (int r = 0; r < repeat; ++r) {
+        auto start = std::chrono::steady_clock::now();
+        body();
+        best = std::min(best, secondsSince(start));
+    }
+    return best * 1e9 / ops;
+}
+
+volatile size_t sink;
+
+struct MicroResult {
+    std::string name;
+    double nsPerOp;
+};
+
+std::vector<MicroResult> runMicro(int repeat) {
+    const int ROUNDS = 2000;
+    std::vector<MicroResult> results;
+    std::vector<Board> boards;
+    std::vector<Position> pieces;
+    for (const BenchPosition& position : POSITIONS) {
+        boards.push_back(makeBoard(makeGame(position)));
+    }
+    for (int row = 0; row < Board::BOARD_SIZE; ++row) {
+        for (int col = 0; col < Board::BOARD_SIZE; ++col) pieces.push_back({row, col});
+    }
+    long squareOps = static_cast<long>(ROUNDS) * boards.size() * pieces.size();
+
+    results.push_back({"board.getValidMoves", timeOps(repeat, squareOps, [&] {
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards)
+                for (const Position& pos : pieces) sink = board.getValidMoves(pos).size();
+    })});
+    results.push_back({"board.generateMoves", timeOps(repeat, squareOps, [&] {
+        Position out[Board::MAX_PIECE_MOVES];
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards)
+                for (const Position& pos : pieces) sink = board.generateMoves(pos, out);
+    })});
+    results.push_back({"board.checkCaptures", timeOps(repeat, squareOps, [&] {
+        for (int i = 0; i < ROUNDS; ++i)
+            for (Board& board : boards)
+                for (const Position& pos : pieces) sink = board.checkCaptures(pos).size();
+    })});
+    results.push_back({"board.findCaptures", timeOps(repeat, squareOps, [&] {
+        Position out[Board::MAX_CAPTURES];
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards)
+                for (const Position& pos : pieces) sink = board.findCaptures(pos, out);
+    })});
+
+    results.push_back({"board.getMobility", timeOps(repeat, squareOps, [&] {
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards)
+                for (const Position& pos : pieces) sink = board.getMobility(pos);
+    })});
+
+    long boardOps = static_cast<long>(ROUNDS) * boards.size();
+    // Зміна клітинки туди й назад, потім ходи сторін і загрози - як в оцінці позиції
+    results.push_back({"board.mapsAfterChange", timeOps(repeat, boardOps, [&] {
+        const Position center{4, 4};
+        for (int i = 0; i < ROUNDS; ++i)
+            for (Board& board : boards) {
+                PieceColor piece = board.getPieceAt(center);
+                board.setPieceAt(center, piece == PieceColor::NONE ? PieceColor::BLACK : PieceColor::NONE);
+                board.setPieceAt(center, piece);
+                sink = board.getSideMobility(PieceColor::BLACK) + board.getThreatenedCount(PieceColor::WHITE);
+            }
+    })});
+    std::vector<std::string> serialized;
+    for (const Board& board : boards) serialized.push_back(board.serialize());
+    results.push_back({"board.serialize", timeOps(repeat, boardOps, [&] {
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards) sink = board.serialize().size();
+    })});
+    results.push_back({"board.deserialize", timeOps(repeat, boardOps, [&] {
+        Board board;
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const std::string& data : serialized) sink = board.deserialize(data);
+    })});
+    results.push_back({"board.toBytes", timeOps(repeat, boardOps, [&] {
+        uint8_t out[Board::CELLS];
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Board& board : boards) {
+                board.toBytes(out);
+                sink = out[40];
+            }
+    })});
+
+    std::vector<Game> games;
+    for (const BenchPosition& position : POSITIONS) games.push_back(makeGame(position));
+    results.push_back({"game.getAllLegalMoves", timeOps(repeat, boardOps, [&] {
+        Move moves[Game::MAX_LEGAL_MOVES];
+        for (int i = 0; i < ROUNDS; ++i)
+            for (const Game& game : games) sink = game.getAllLegalMoves(moves, Game::MAX_LEGAL_MOVES);
+    })});
+    results.push_back({"game.makeUnmakeMove", timeOps(repeat, boardOps, [&] {
+        Move moves[Game::MAX_LEGAL_MOVES];
+        for (int i = 0; i < ROUNDS; ++i)
+            for (Game& game : games) {
+                int count = game.getAllLegalMoves(moves, Game::MAX_LEGAL_MOVES);
+                const Move& move = moves[i % count];
+                game.makeMove(move.from, move.to);
+                game.unmakeMove();
+            }
+    })});
+
+    // Один потік, свіже дерево на кожен замір: нс на розіграш
+    const uint64_t PLAYOUTS = 4000;
+    Mcts mcts(8);
+    MctsLimits limits;
+    limits.maxPlayouts = PLAYOUTS;
+    results.push_back({"mcts.playout", timeOps(repeat, static_cast<long>(PLAYOUTS) * games.size(), [&] {
+        for (const Game& game : games) {
+            mcts.clear();
+            sink = mcts.search(game, limits).playouts;
+        }
+    })});
+    return results;
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    bool json = false;
+    int maxDepth = 4;
+    int repeat = 5;
+    for (int i = 1; i < argc; ++i) {
+        if (std::strcmp(argv[i], "--json") == 0) {
+            json = true;
+        } else if (std::strcmp(argv[i], "--depth") == 0 && i + 1 < argc) {
+            maxDepth = std::atoi(argv[++i]);
+        } else if (std::strcmp(argv[i], "--repeat") == 0 && i + 1 < argc) {
+            repeat = std::max(1, std::atoi(argv[++i]));
+        } else {
+            std::fprintf(stderr, "usage: %s [--json] [--depth N] [--repeat N]\n", argv[0]);
+            return 2;
+        }
+    }
+
+    if (json) std::printf("{\"perft\": [");
+    bool first = true;
+    for (const BenchPosition& position : POSITIONS) {
+        Game game = makeGame(position);
+        // Найкращий час із repeat прогонів; кількість вузлів однакова в усіх
+        uint64_t nodes = 0;
+        double best = 1e30;
+        for (int r = 0; r < repeat; ++r) {
+            auto start = std::chrono::steady_clock::now();
+            nodes = perft(game, maxDepth);
+            best = std::min(best, secondsSince(start));
+        }
+        double mnps = best > 0 ? nodes / best / 1e6 : 0.0;
+        if (json) {
+            std::printf("%s\n  {\"position\": \"%s\", \"depth\": %d, \"nodes\": %llu, "
+                        "\"seconds\": %.6f, \"mnps\": %.3f}",
+                        first ? "" : ",", position.name, maxDepth,
+                        static_cast<unsigned long long>(nodes), best, mnps);
+        } else {
+            std::printf("perft %-12s depth %d  nodes %12llu  time %8.3f s  %8.2f Mnps\n",
+                        position.name, maxDepth, static_cast<unsigned long long>(nodes), best, mnps);
+        }
+        first = false;
+    }
+
+    std::vector<MicroResult> micro = runMicro(repeat);
+    if (json) {
+        std::printf("\n], \"micro\": {");
+        for (size_t i = 0; i < micro.size(); ++i) {
+            std::printf("%s\n  \"%s\": %.3f", i ? "," : "", micro[i].name.c_str(), micro[i].nsPerOp);
+        }
+        std::printf("\n}}\n");
+    } else {
+        for (const MicroResult& result : micro) {
+            std::printf("%-24s %10.1f ns/op\n", result.name.c_str(), result.nsPerOp);
+        }
+    }
+    return 0;
+}
@@ -0,0 +1,24 @@
+// backend/tools/perft.cpp
+// Perft-бенчмарк: кількість позицій на кожній глибині від початкової позиції
+// і швидкість генерації/виконання ходів.
+// Використання: hasami_perft [max_depth]
+#include "game.hpp"
+#include "search.hpp"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+
+int main(int argc, char** argv) {
+    int maxDepth = argc > 1 ? std::atoi(argv[1]) : 4;
+
+    for (int depth = 1; depth <= maxDepth; ++depth) {
+        Game game;
+        auto start = std::chrono::steady_clock::now();
+        uint64_t nodes = perft(game, depth);
+        double seconds = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+        std::printf("depth %d  nodes %12llu  time %8.3f s  %8.2f Mnps\n",
+                    depth, static_cast<unsigned long long>(nodes), seconds,
+                    seconds > 0 ? nodes / seconds / 1e6 : 0.0);
+    }
+    return 0;
+}
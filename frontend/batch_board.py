@@ -0,0 +1,258 @@
+# frontend/batch_board.py
+"""Vectorized batch of Hasami Shogi positions on NumPy arrays.
+
+BatchBoard holds N games as an (N, 9, 9) int8 array and steps all of them
+with array operations: legal-move masks, move application, custodial
+captures (Board::checkCaptures) and the capture-count win condition
+(Game::isGameOver) are computed for the whole batch at once.
+
+Actions are indices into a fixed space of 81 squares * 4 directions *
+8 distances: action = square * 32 + direction * 8 + (distance - 1), with
+directions right, left, down, up as in Board::getValidMoves.
+
+    python -m frontend.batch_board --verify   # differential test vs C++
+    python -m frontend.batch_board --bench    # random-playout throughput
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from .cpp_bridge import BOARD_SIZE, BOARD_CELLS, EMPTY, BLACK, WHITE
+
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+MAX_DISTANCE = BOARD_SIZE - 1
+ACTIONS_PER_SQUARE = len(DIRECTIONS) * MAX_DISTANCE
+NUM_ACTIONS = BOARD_CELLS * ACTIONS_PER_SQUARE
+# Game::isGameOver: перемога після 9 захоплених фігур
+WIN_CAPTURES = 9
+# Індекс "за межами дошки" у таблицях променів і значення клітинки-стіни
+OFF_BOARD = BOARD_CELLS
+WALL = 3
+
+
+def _build_tables():
+    rays = np.full((BOARD_CELLS, len(DIRECTIONS), MAX_DISTANCE), OFF_BOARD, dtype=np.intp)
+    for square in range(BOARD_CELLS):
+        row, col = divmod(square, BOARD_SIZE)
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            for k in range(1, MAX_DISTANCE + 1):
+                r, c = row + k * dr, col + k * dc
+                if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+                    rays[square, d, k - 1] = r * BOARD_SIZE + c
+    action_from = np.repeat(np.arange(BOARD_CELLS, dtype=np.intp), ACTIONS_PER_SQUARE)
+    action_to = rays.reshape(-1)
+    return rays, action_from, action_to
+
+
+# RAYS[square, direction, distance - 1] -> клітинка або OFF_BOARD
+RAYS, ACTION_FROM, ACTION_TO = _build_tables()
+# Ті самі промені з відстанню в першому вимірі: кожен крок - суцільний зріз
+RAYS_BY_DISTANCE = np.ascontiguousarray(RAYS.transpose(2, 0, 1))
+
+
+def encode_action(from_pos, to_pos):
+    """Map ((row, col), (row, col)) to an action index."""
+    (fr, fc), (tr, tc) = from_pos, to_pos
+    if fr == tr:
+        direction, distance = (0, tc - fc) if tc > fc else (1, fc - tc)
+    else:
+        direction, distance = (2, tr - fr) if tr > fr else (3, fr - tr)
+    return (fr * BOARD_SIZE + fc) * ACTIONS_PER_SQUARE + direction * MAX_DISTANCE + distance - 1
+
+
+def decode_action(action):
+    """Map an action index back to ((row, col), (row, col))."""
+    return divmod(int(ACTION_FROM[action]), BOARD_SIZE), divmod(int(ACTION_TO[action]), BOARD_SIZE)
+
+
+class BatchBoard:
+    """N independent games stepped together.
+
+    Attributes:
+        boards: (N, 9, 9) int8, EMPTY/BLACK/WHITE
+        side: (N,) int8, side to move (BLACK/WHITE)
+        captures: (N, 2) int16, pieces captured by black and by white
+        done: (N,) bool, game finished by captures
+        winner: (N,) int8, BLACK/WHITE for finished games, EMPTY otherwise
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.boards = np.zeros((n, BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+        self.side = np.empty(n, dtype=np.int8)
+        self.captures = np.empty((n, 2), dtype=np.int16)
+        self.done = np.empty(n, dtype=bool)
+        self.winner = np.empty(n, dtype=np.int8)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset all games, or only those selected by a boolean mask, to the start position."""
+        index = slice(None) if mask is None else np.asarray(mask, dtype=bool)
+        boards = self.boards[index]
+        boards[...] = EMPTY
+        boards[:, 0, :] = BLACK
+        boards[:, BOARD_SIZE - 1, :] = WHITE
+        self.boards[index] = boards
+        self.side[index] = BLACK
+        self.captures[index] = 0
+        self.done[index] = False
+        self.winner[index] = EMPTY
+
+    def _padded(self):
+        # (N, 82): остання клітинка - стіна для променів, що виходять за дошку
+        padded = np.empty((self.n, BOARD_CELLS + 1), dtype=np.int8)
+        padded[:, :BOARD_CELLS] = self.boards.reshape(self.n, BOARD_CELLS)
+        padded[:, OFF_BOARD] = WALL
+        return padded
+
+    def legal_mask(self):
+        """(N, NUM_ACTIONS) bool mask of legal actions; all False for finished games."""
+        padded = self._padded()
+        own = padded[:, :BOARD_CELLS] == self.side[:, None]
+        own &= ~self.done[:, None]
+        # Порожні клітинки вздовж променів: (N, 8, 81, 4); хід на відстань k можливий,
+        # поки порожні всі клітинки до k включно
+        empty = padded[:, RAYS_BY_DISTANCE] == EMPTY
+        mask = np.empty((self.n, BOARD_CELLS, len(DIRECTIONS), MAX_DISTANCE), dtype=bool)
+        reachable = own[:, :, None] & empty[:, 0]
+        mask[..., 0] = reachable
+        for k in range(1, MAX_DISTANCE):
+            reachable &= empty[:, k]
+            mask[..., k] = reachable
+        return mask.reshape(self.n, NUM_ACTIONS)
+
+    def sample_random_actions(self, rng, mask=None):
+        """One uniformly random legal action per game, -1 where there is none."""
+        if mask is None:
+            mask = self.legal_mask()
+        games, legal = np.nonzero(mask)
+        counts = np.bincount(games, minlength=self.n)
+        offsets = np.cumsum(counts) - counts
+        picks = offsets + (rng.random(self.n) * counts).astype(np.intp)
+        actions = np.full(self.n, -1, dtype=np.intp)
+        has_moves = counts > 0
+        actions[has_moves] = legal[picks[has_moves]]
+        return actions
+
+    def step(self, actions):
+        """Apply one action per game. Games with action -1 or already finished are skipped.
+
+        Actions must be legal (see legal_mask). Returns the (N,) number of
+        pieces captured by each move.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        active = (actions >= 0) & ~self.done
+        games = np.flatnonzero(active)
+        captured = np.zeros(self.n, dtype=np.int16)
+        if games.size == 0:
+            return captured
+
+        acts = actions[games]
+        src = ACTION_FROM[acts]
+        dst = ACTION_TO[acts]
+        own = self.side[games]
+        opp = np.where(own == BLACK, WHITE, BLACK).astype(np.int8)
+
+        flat = self.boards.reshape(self.n, BOARD_CELLS)
+        flat[games, dst] = own
+        flat[games, src] = EMPTY
+
+        # Захоплення як у Board::checkCaptures: ряд фігур суперника, закритий нашою фігурою
+        padded = self._padded()[games]
+        rows = np.arange(games.size)[:, None]
+        total = np.zeros(games.size, dtype=np.int16)
+        for d in range(len(DIRECTIONS)):
+            ray = RAYS[dst, d]                       # (G, 8)
+            cells = padded[rows, ray]                # (G, 8)
+            is_opp = cells == opp[:, None]
+            run = np.logical_and.accumulate(is_opp, axis=1).sum(axis=1)
+            closer = np.full(games.size, WALL, dtype=np.int8)
+            inside = run < MAX_DISTANCE
+            closer[inside] = cells[inside, run[inside]]
+            closed = (run > 0) & (closer == own)
+            victims = closed[:, None] & (np.arange(MAX_DISTANCE)[None, :] < run[:, None])
+            if victims.any():
+                g, k = np.nonzero(victims)
+                flat[games[g], ray[g, k]] = EMPTY
+            total += np.where(closed, run, 0).astype(np.int16)
+
+        captured[games] = total
+        self.captures[games, own - 1] += total
+        won = self.captures[games, own - 1] >= WIN_CAPTURES
+        self.done[games[won]] = True
+        self.winner[games[won]] = own[won]
+        self.side[games] = opp
+        return captured
+
+
+def verify_against_bridge(games=32, plies=200, seed=0):
+    """Differential test: play random games in BatchBoard and the C++ Game side by side.
+
+    Compares legal moves, boards, captures and game-over state after every
+    ply and raises AssertionError on the first mismatch. Returns plies checked.
+    """
+    from .cpp_bridge import GameBridge
+
+    rng = np.random.default_rng(seed)
+    batch = BatchBoard(games)
+    bridges = [GameBridge() for _ in range(games)]
+    checked = 0
+    for ply in range(plies):
+        mask = batch.legal_mask()
+        for i, bridge in enumerate(bridges):
+            native = {encode_action(f, t) for f, t in bridge.get_all_legal_moves()}
+            if bridge.is_game_over():
+                native = set()
+            assert set(np.flatnonzero(mask[i]).tolist()) == native, f'game {i} ply {ply}: moves'
+        actions = batch.sample_random_actions(rng, mask)
+        batch.step(actions)
+        for i, bridge in enumerate(bridges):
+            if actions[i] >= 0:
+                assert bridge.make_move(*decode_action(actions[i])), f'game {i} ply {ply}: move'
+                checked += 1
+            assert bridge.get_board_bytes() == batch.boards[i].tobytes(), f'game {i} ply {ply}: board'
+            captures = bridge.get_captures()
+            assert (captures['black'], captures['white']) == tuple(batch.captures[i]), \
+                f'game {i} ply {ply}: captures'
+            assert bridge.is_game_over() == bool(batch.done[i]), f'game {i} ply {ply}: game over'
+        if batch.done.all():
+            break
+    return checked
+
+
+def benchmark(games=4096, plies=200, seed=0):
+    """Random playouts with auto-reset; returns plies per second."""
+    rng = np.random.default_rng(seed)
+    batch = BatchBoard(games)
+    stepped = 0
+    start = time.perf_counter()
+    for _ in range(plies):
+        actions = batch.sample_random_actions(rng)
+        batch.step(actions)
+        stepped += int((actions >= 0).sum())
+        if batch.done.any():
+            batch.reset(batch.done)
+    return stepped / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='NumPy batch board tools')
+    parser.add_argument('--verify', action='store_true', help='differential test vs the C++ library')
+    parser.add_argument('--bench', action='store_true', help='measure batched plies per second')
+    parser.add_argument('--games', type=int, default=None)
+    parser.add_argument('--plies', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=random.randrange(1 << 30))
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        checked = verify_against_bridge(args.games or 32, args.plies, args.seed)
+        print(f'OK: {checked} plies match the C++ engine (seed {args.seed})')
+    if args.bench or not args.verify:
+        rate = benchmark(args.games or 4096, args.plies, args.seed)
+        print(f'{rate:,.0f} plies/s')
+
+
+if __name__ == '__main__':
+    main()
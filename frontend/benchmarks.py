@@ -0,0 +1,324 @@
+# frontend/benchmarks.py
+"""Headless benchmark suite: native core micro-benchmarks and GameBridge call costs.
+
+Runs the hasami_bench tool built with the backend (perft node counts and
+times from the initial and fixed midgame positions, move generation,
+captures, serialization), then times every public GameBridge method from
+a fixed midgame position. Results are written as JSON and can be compared
+with a stored baseline. Needs only the native library, not PyQt5.
+
+    python -m frontend.benchmarks --output bench.json
+    python -m frontend.benchmarks --baseline bench.json --threshold 0.10
+
+Timings are "lower is better" nanoseconds. A timing more than threshold
+slower than the baseline is a regression. Any change in a perft node
+count is a correctness failure. Either makes the exit status 1.
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .cpp_bridge import GameBridge, EMPTY, BLACK, WHITE, pack_squares
+from . import tablebase
+
+# Позиція midgame-48 з backend/tools/bench.cpp
+MIDGAME = (".......B." "......BB." "B........" ".....W.W." "....B...B"
+           "...WB...B" "....W...." ".WB.W..W." "..W.....W")
+MIDGAME_CELLS = bytes({'.': EMPTY, 'B': BLACK, 'W': WHITE}[c] for c in MIDGAME)
+MIDGAME_MOVE = ((4, 4), (3, 4))
+
+BENCH_NAMES = ('hasami_bench', 'hasami_bench.exe')
+
+
+def find_native_bench():
+    """Path of the hasami_bench executable, from HASAMI_BENCH or the usual build directories."""
+    if os.environ.get('HASAMI_BENCH'):
+        return Path(os.environ['HASAMI_BENCH'])
+    backend = Path(__file__).resolve().parent.parent / 'backend'
+    for build in ('build', 'biuld'):
+        for subdir in ('bin', 'bin/Release', 'bin/Debug', 'Release', 'Debug'):
+            for name in BENCH_NAMES:
+                path = backend / build / subdir / name
+                if path.exists():
+                    return path
+    return None
+
+
+def run_native(path, depth=4, repeat=5):
+    """Run hasami_bench --json and flatten its output into (timings, counts)."""
+    output = subprocess.run([str(path), '--json', '--depth', str(depth), '--repeat', str(repeat)],
+                            check=True, capture_output=True, text=True).stdout
+    data = json.loads(output)
+    timings, counts = {}, {}
+    for entry in data['perft']:
+        name = f"native.perft.{entry['position']}.d{entry['depth']}"
+        counts[name] = entry['nodes']
+        timings[name + '.ns_per_node'] = entry['seconds'] * 1e9 / max(entry['nodes'], 1)
+    for name, ns in data['micro'].items():
+        timings[f'native.{name}'] = ns
+    return timings, counts
+
+
+def _midgame(bridge):
+    bridge.set_position(MIDGAME_CELLS, 'black', {'black': 0, 'white': 0})
+
+
+def _bridge_benchmarks(tmpdir, resources):
+    """{method: (setup(bridge), call(bridge))}; setup runs once, call is timed.
+
+    Files opened for the benchmarks are registered with the resources ExitStack.
+    """
+    save_path = os.path.join(tmpdir, 'bench.hsg')
+
+    def make_and_undo(bridge):
+        bridge.make_move(*MIDGAME_MOVE)
+        bridge.undo_move()
+
+    def make_ex_and_undo(bridge):
+        bridge.make_move_ex(*MIDGAME_MOVE)
+        bridge.undo_move()
+
+    def undo_and_redo(bridge):
+        bridge.undo_move()
+        bridge.redo_move()
+
+    def with_history(bridge):
+        _midgame(bridge)
+        bridge.make_move(*MIDGAME_MOVE)
+        bridge.make_move((3, 5), (2, 5))
+
+    def with_save(bridge):
+        _midgame(bridge)
+        bridge.save_game(save_path)
+
+    def instrumentation(bridge):
+        bridge.enable_instrumentation()
+        bridge.disable_instrumentation()
+
+    def search(bridge):
+        bridge.search_best_move(3)
+
+    # Таблиця 1 проти 1 з нулів (усе нічия): індексація і читання ті самі, що й у справжніх
+    tablebase_path = os.path.join(tmpdir, 'bench.hstb')
+    positions = 81 * 80 * 2
+    with open(tablebase_path, 'wb') as f:
+        f.write(tablebase.HEADER.pack(tablebase.MAGIC, tablebase.VERSION, 1, 1, 0))
+        offset = tablebase.HEADER.size + tablebase.DIRECTORY_ENTRY.size
+        f.write(tablebase.DIRECTORY_ENTRY.pack(1, 1, offset, positions))
+        f.write(bytes(2 * positions))
+    tables = resources.enter_context(tablebase.Tablebase(tablebase_path))
+
+    def endgame(bridge):
+        cells = bytearray([EMPTY]) * 81
+        cells[40], cells[44] = BLACK, WHITE
+        bridge.set_position(bytes(cells), 'black', {'black': 8, 'white': 8})
+
+    # Перші 40 ходів детермінованої партії для пакетного відтворення
+    recorded = GameBridge()
+    for _ in range(40):
+        legal = recorded.get_all_legal_moves()
+        recorded.make_move(*legal[len(legal) // 2])
+    replay_squares = pack_squares(recorded.get_move_history())
+
+    def replay(bridge):
+        bridge.start_new_game()
+        bridge.replay_moves(replay_squares, deltas=True, branching=True)
+
+    def mcts(bridge):
+        # Скидаємо дерево, щоб кожен виклик починав з нуля
+        bridge.set_mcts_memory(1)
+        bridge.mcts_search(playouts=500, time_ms=0)
+
+    return {
+        'create_initial_board': (_midgame, lambda b: b.create_initial_board()),
+        'get_board_snapshot': (_midgame, lambda b: b.get_board_snapshot()),
+        'get_board_bytes': (_midgame, lambda b: b.get_board_bytes()),
+        'get_board_state': (_midgame, lambda b: b.get_board_state()),
+        'get_board_state_json': (_midgame, lambda b: b.get_board_state_json()),
+        'make_move': (_midgame, make_and_undo),
+        'make_move_ex': (_midgame, make_ex_and_undo),
+        'undo_move': (with_history, undo_and_redo),
+        'redo_move': (with_history, undo_and_redo),
+        'get_all_legal_moves_packed': (_midgame, lambda b: b.get_all_legal_moves_packed()),
+        'get_all_legal_moves': (_midgame, lambda b: b.get_all_legal_moves()),
+        'get_valid_moves': (_midgame, lambda b: b.get_valid_moves((4, 4))),
+        'get_current_player': (_midgame, lambda b: b.get_current_player()),
+        'is_game_over': (_midgame, lambda b: b.is_game_over()),
+        'get_winner': (_midgame, lambda b: b.get_winner()),
+        'get_position_hash': (_midgame, lambda b: b.get_position_hash()),
+        'get_canonical_hash': (_midgame, lambda b: b.get_canonical_hash()),
+        'get_repetition_count': (with_history, lambda b: b.get_repetition_count()),
+        'set_repetition_limit': (_midgame, lambda b: b.set_repetition_limit(3)),
+        'get_captures': (_midgame, lambda b: b.get_captures()),
+        'get_board_maps': (_midgame, lambda b: b.get_board_maps()),
+        'can_undo': (with_history, lambda b: b.can_undo()),
+        'can_redo': (with_history, lambda b: b.can_redo()),
+        'get_move_history': (with_history, lambda b: b.get_move_history()),
+        'get_start_snapshot': (with_history, lambda b: b.get_start_snapshot()),
+        'replay_moves': (_midgame, replay),
+        'set_position': (_midgame, _midgame),
+        'start_new_game': (_midgame, lambda b: b.start_new_game()),
+        'save_game': (_midgame, lambda b: b.save_game(save_path)),
+        'load_game': (with_save, lambda b: b.load_game(save_path)),
+        'search_best_move': (_midgame, search),
+        'mcts_search': (_midgame, mcts),
+        'set_mcts_memory': (_midgame, lambda b: b.set_mcts_memory(1)),
+        'probe_tablebase': (endgame, lambda b: b.probe_tablebase(tables)),
+        'set_search_hash_size': (_midgame, lambda b: b.set_search_hash_size(1)),
+        'set_search_node_limit': (_midgame, lambda b: b.set_search_node_limit(0)),
+        'enable_instrumentation': (_midgame, instrumentation),
+        'disable_instrumentation': (_midgame, instrumentation),
+        'stop_search': (_midgame, lambda b: b.stop_search()),
+        'clear_search_stop': (_midgame, lambda b: b.clear_search_stop()),
+        'clone': (_midgame, lambda b: b.clone()),
+        'copy_from': (_midgame, lambda b: b.copy_from(b)),
+    }
+
+
+def public_bridge_methods():
+    return sorted(name for name, _ in inspect.getmembers(GameBridge, inspect.isfunction)
+                  if not name.startswith('_'))
+
+
+def _time_call(bridge, call, repeat, min_time):
+    # Калібруємо кількість викликів так, щоб один замір тривав щонайменше min_time
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            call(bridge)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9 or number >= 1 << 20:
+            break
+        number *= 4
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            call(bridge)
+        best = min(best, (time.perf_counter_ns() - start) / number)
+    return best
+
+
+def run_bridge(repeat=5, min_time=0.05):
+    """ns per call for every GameBridge method, keyed 'bridge.<method>'."""
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmpdir, contextlib.ExitStack() as resources:
+        benchmarks = _bridge_benchmarks(tmpdir, resources)
+        missing = set(public_bridge_methods()) - set(benchmarks)
+        if missing:
+            print(f"warning: no benchmark for GameBridge.{', '.join(sorted(missing))}",
+                  file=sys.stderr)
+        for name, (setup, call) in sorted(benchmarks.items()):
+            bridge = GameBridge()
+            setup(bridge)
+            timings[f'bridge.{name}'] = _time_call(bridge, call, repeat, min_time)
+    return timings
+
+
+def run_suite(native=None, depth=4, repeat=5, min_time=0.05):
+    """Run everything; native is the hasami_bench path or None to skip it."""
+    timings, counts = {}, {}
+    if native is not None:
+        timings, counts = run_native(native, depth, repeat)
+    timings.update(run_bridge(repeat, min_time))
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'native_bench': str(native) if native else None,
+            'perft_depth': depth,
+        },
+        'timings_ns': timings,
+        'counts': counts,
+    }
+
+
+def compare(results, baseline, threshold=0.15):
+    """Compare with a baseline. Returns (rows, failures).
+
+    rows are (name, baseline, current, ratio, status) for every metric
+    present in both; failures lists the regressed or changed metrics.
+    """
+    rows, failures = [], []
+    for name, base in sorted(baseline.get('counts', {}).items()):
+        current = results['counts'].get(name)
+        if current is None:
+            continue
+        status = 'ok' if current == base else 'CHANGED'
+        if status != 'ok':
+            failures.append(name)
+        rows.append((name, base, current, current / base if base else 1.0, status))
+    for name, base in sorted(baseline.get('timings_ns', {}).items()):
+        current = results['timings_ns'].get(name)
+        if current is None:
+            continue
+        ratio = current / base if base else 1.0
+        if ratio > 1 + threshold:
+            status = 'SLOWER'
+            failures.append(name)
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, base, current, ratio, status))
+    return rows, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hasami Shogi benchmark suite')
+    parser.add_argument('--native', help='hasami_bench executable (default: search build dirs)')
+    parser.add_argument('--no-native', action='store_true', help='only time the Python bridge')
+    parser.add_argument('--depth', type=int, default=4, help='perft depth for native positions')
+    parser.add_argument('--repeat', type=int, default=5, help='take the best of N runs')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='seconds per timing run for bridge methods')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed slowdown vs baseline (0.15 = 15%%)')
+    args = parser.parse_args(argv)
+
+    native = None
+    if not args.no_native:
+        native = Path(args.native) if args.native else find_native_bench()
+        if native is None:
+            print('hasami_bench not found (set HASAMI_BENCH or build with HASAMI_BUILD_TOOLS), '
+                  'skipping native benchmarks', file=sys.stderr)
+
+    results = run_suite(native, args.depth, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        for name, nodes in sorted(results['counts'].items()):
+            print(f'{name:48s} {nodes:14,d} nodes')
+        for name, ns in sorted(results['timings_ns'].items()):
+            print(f'{name:48s} {ns:14,.1f} ns')
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows, failures = compare(results, baseline, args.threshold)
+    for name, base, current, ratio, status in rows:
+        print(f'{name:48s} {base:14,.1f} {current:14,.1f} {ratio:6.2f}x  {status}')
+    if failures:
+        print(f'{len(failures)} regression(s) over {args.threshold:.0%}: {", ".join(failures)}')
+        return 1
+    print(f'no regressions over {args.threshold:.0%} ({len(rows)} metrics compared)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
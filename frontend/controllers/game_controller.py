@@ -1,40 +1,99 @@
-from ..cpp_bridge import GameBridge
+import logging
+
+from ..cpp_bridge import create_bridge
+from ..symmetry import AnalysisCache, canonical_key, transform_result
+
+logger = logging.getLogger(__name__)
 
 class GameController:
-    def __init__(self):
-        self.game_bridge = GameBridge()
+    def __init__(self, engine=None):
+        # engine: 'auto', 'native' або 'python' (див. cpp_bridge.bridge_class)
+        self.game_bridge = create_bridge(engine)
+        # Слухачі отримують MoveDelta після кожного успішного ходу
+        self._move_listeners = []
+        # Таблиця ходів поточного ходу: {(row, col): [(row, col), ...]}
+        self._legal_moves = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # PositionIndex для дебютних ходів (open_book)
+        self.book = None
+        # Tablebase для точної гри в ендшпілі (open_tablebase)
+        self.tablebase = None
+        # Результати аналізу, спільні для симетричних позицій (cached_analysis)
+        self.analysis_cache = AnalysisCache()
+
+    def add_move_listener(self, callback):
+        """Call callback(delta) with a MoveDelta after every successful make_move."""
+        self._move_listeners.append(callback)
+
+    def remove_move_listener(self, callback):
+        self._move_listeners.remove(callback)
     
     def is_game_over(self):
-        """Check if the game is over (9 or more pieces captured)."""
+        """Check if the game is over: nine captures or the repetition rule."""
         try:
-            captures = self.get_captures()
-            return captures['black'] >= 8 or captures['white'] >= 8
+            return self.game_bridge.is_game_over()
         except Exception as e:
-            print(f"Error checking game over: {e}")
+            logger.exception("Error checking game over: %s", e)
             return False
         
     def get_winner(self):
-        """Get the winner of the game if it's over."""
-        captures = self.get_captures()
-        if captures['white'] >= 8:
-            return 'Black'
-        elif captures['black'] >= 8:
-            return 'White'
-        return None
+        """'Black' or 'White' once the game is won, None otherwise (also for a draw)."""
+        winner = self.game_bridge.get_winner()
+        return winner.capitalize() if winner else None
         
+    def get_position_hash(self):
+        return self.game_bridge.get_position_hash()
+
+    def get_repetition_count(self):
+        return self.game_bridge.get_repetition_count()
+
+    def set_repetition_limit(self, limit):
+        self.game_bridge.set_repetition_limit(limit)
+
+    def _legal_move_table(self):
+        if self._legal_moves is None:
+            self._cache_misses += 1
+            table = {}
+            for from_pos, to_pos in self.game_bridge.get_all_legal_moves():
+                table.setdefault(from_pos, []).append(to_pos)
+            self._legal_moves = table
+        else:
+            self._cache_hits += 1
+        return self._legal_moves
+
+    def invalidate_move_cache(self):
+        """Drop the cached legal moves; needed after changing the game through game_bridge directly."""
+        self._legal_moves = None
+
+    def move_cache_stats(self):
+        return {'hits': self._cache_hits, 'misses': self._cache_misses}
+
     def get_valid_moves(self, position):
         try:
-            print(f"GameController: Getting valid moves for position {position}")  # Debug print
-            moves = self.game_bridge.get_valid_moves(position)
-            print(f"GameController: Got moves from bridge: {moves}")  # Debug print
+            moves = list(self._legal_move_table().get(tuple(position), ()))
+            logger.debug("Valid moves for %s: %s", position, moves)
             return moves
         except Exception as e:
-            print(f"GameController: Error getting valid moves: {e}")  # Debug print
+            logger.exception("Error getting valid moves: %s", e)
             return []
 
+    def get_all_legal_moves(self):
+        """All legal moves of the side to move as ((row, col), (row, col)) pairs."""
+        return [(from_pos, to_pos)
+                for from_pos, targets in self._legal_move_table().items()
+                for to_pos in targets]
+
+    def has_legal_moves(self):
+        return bool(self._legal_move_table())
+
     def get_board_state(self):
         return self.game_bridge.get_board_state()
 
+    def get_board_maps(self):
+        """Mobility, reach and capture-threat maps; see GameBridge.get_board_maps."""
+        return self.game_bridge.get_board_maps()
+
     def get_current_player(self):
         return self.game_bridge.get_current_player()
 
@@ -42,15 +101,209 @@ class GameController:
         return self.game_bridge.get_captures()
 
     def make_move(self, from_pos, to_pos):
-        print(f"GameController: Making move from {from_pos} to {to_pos}")  # Debug print
-        return self.game_bridge.make_move(from_pos, to_pos)
+        logger.debug("Making move from %s to %s", from_pos, to_pos)
+        if not self._move_listeners:
+            moved = self.game_bridge.make_move(from_pos, to_pos)
+            if moved:
+                self._legal_moves = None
+            return moved
+        delta = self.game_bridge.make_move_ex(from_pos, to_pos)
+        if delta is None:
+            return False
+        self._legal_moves = None
+        for callback in list(self._move_listeners):
+            callback(delta)
+        return True
+
+    def undo_move(self):
+        self._legal_moves = None
+        return self.game_bridge.undo_move()
+
+    def redo_move(self):
+        self._legal_moves = None
+        return self.game_bridge.redo_move()
+
+    def can_undo(self):
+        return self.game_bridge.can_undo()
+
+    def can_redo(self):
+        return self.game_bridge.can_redo()
+
+    def open_book(self, path):
+        """Use a position index (frontend.position_index) for book_moves."""
+        from ..position_index import PositionIndex
+
+        self.close_book()
+        self.book = PositionIndex(path)
+
+    def close_book(self):
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+
+    def book_moves(self):
+        """Legal BookMoves recorded for the current position, most played first."""
+        if self.book is None:
+            return []
+        moves = self.book.lookup(self.game_bridge.get_position_hash())
+        # Колізія ключів не повинна дати нелегальний хід
+        return [m for m in moves if m.move[1] in self._legal_move_table().get(m.move[0], ())]
+
+    def book_move(self, rng=None, min_games=1):
+        """A book move for the current position or None.
+
+        Without rng the most played move is returned, otherwise one chosen
+        at random weighted by how often it was played.
+        """
+        moves = [m for m in self.book_moves() if m.games >= min_games]
+        if not moves:
+            return None
+        if rng is None:
+            return moves[0].move
+        return rng.choices([m.move for m in moves], weights=[m.games for m in moves])[0]
+
+    def open_tablebase(self, path):
+        """Use endgame tables (frontend.tablebase) for tablebase_move."""
+        from ..tablebase import Tablebase
+
+        self.close_tablebase()
+        self.tablebase = Tablebase(path)
+
+    def close_tablebase(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+
+    def probe_tablebase(self):
+        """Tablebase result for the current position or None; see GameBridge.probe_tablebase."""
+        if self.tablebase is None:
+            return None
+        return self.game_bridge.probe_tablebase(self.tablebase)
+
+    def tablebase_move(self):
+        """The best move by the tables for the current position or None.
+
+        Wins take the shortest way, losses the longest, and a drawn position
+        keeps to moves that stay drawn. Returns (move, entry) where entry is
+        the current position's probe_tablebase result.
+        """
+        entry = self.probe_tablebase()
+        if entry is None:
+            return None
+        # Ходи перебираються на копії, щоб не чіпати історію справжньої партії
+        bridge = self.game_bridge.clone()
+        mover = bridge.get_current_player()
+        ranked = []
+        for from_pos, to_pos in self.get_all_legal_moves():
+            bridge.make_move(from_pos, to_pos)
+            if not bridge.is_game_over():
+                child = bridge.probe_tablebase(self.tablebase)
+            elif bridge.get_winner() == mover:
+                # Захоплення останньої фігури - найкоротший виграш
+                child = {'result': 'loss', 'distance': -1}
+            elif bridge.get_winner() is None:
+                # Нічия за правилом повторень
+                child = {'result': 'draw', 'distance': 0}
+            else:
+                child = {'result': 'win', 'distance': 0}
+            bridge.undo_move()
+            if child is None:
+                continue
+            # Менше - краще для того, хто ходить: програш суперника, нічия, його виграш
+            if child['result'] == 'loss':
+                rank = (0, child['distance'])
+            elif child['result'] == 'draw':
+                rank = (1, 0)
+            else:
+                rank = (2, -child['distance'])
+            ranked.append((rank, (from_pos, to_pos)))
+        if not ranked:
+            return None
+        return min(ranked)[1], entry
+
+    def canonical_key(self):
+        """(key, symmetry) of the current position; see frontend.symmetry.canonical_key."""
+        return canonical_key(self.game_bridge)
+
+    def cached_analysis(self, kind, compute):
+        """Result of compute() for the current position, shared between symmetric twins.
+
+        kind names the analysis and its parameters (e.g. ('search', 6, 0))
+        and is part of the cache key. compute() runs on the real board on a
+        miss; its result is stored in the canonical frame and on a hit is
+        mapped back to this position with 'cached': True added.
+        """
+        key, symmetry = self.canonical_key()
+        cache_key = (key, kind)
+        stored = self.analysis_cache.get(cache_key)
+        if stored is not None:
+            result = transform_result(stored, symmetry)
+            if isinstance(result, dict):
+                result = dict(result, cached=True)
+            return result
+        result = compute()
+        self.analysis_cache.put(cache_key, transform_result(result, symmetry))
+        return result
+
+    def set_analysis_cache_size(self, max_entries):
+        """Limit the analysis cache to max_entries results, 0 disables it."""
+        self.analysis_cache.resize(max_entries)
+
+    def analysis_cache_stats(self):
+        """{'entries', 'max_entries', 'hits', 'misses', 'evictions', 'hit_rate'}."""
+        return self.analysis_cache.stats()
+
+    def search_best_move(self, depth=6, time_ms=1000, use_cache=False):
+        """Ask the native engine for the best move of the side to move.
+
+        With use_cache a result found earlier for this position or a
+        symmetric one is reused (its nodes and timings are those of the
+        original search); best for fixed-depth searches with time_ms=0.
+        """
+        if not use_cache:
+            return self.game_bridge.search_best_move(depth, time_ms)
+        return self.cached_analysis(('search', depth, time_ms),
+                                    lambda: self.game_bridge.search_best_move(depth, time_ms))
+
+    def mcts_search(self, time_ms=1000, playouts=0, threads=1, batch=1):
+        """Ask the native MCTS player for a move; see GameBridge.mcts_search."""
+        return self.game_bridge.mcts_search(playouts, time_ms, threads, batch)
+
+    def make_engine_move(self, depth=6, time_ms=1000, use_book=True, use_tablebase=True,
+                         use_cache=False):
+        """Search and play the engine's move. Returns the search result or None.
+
+        With an open book a book move is played without searching; the
+        result then has 'book': True and zero depth and nodes. Likewise a
+        position covered by open tables plays tablebase_move, and the result
+        has 'tablebase' with the position's probe_tablebase entry. use_cache
+        is passed on to search_best_move.
+        """
+        found = self.tablebase_move() if use_tablebase else None
+        if found is not None:
+            move, entry = found
+            result = {'move': move, 'score': 0, 'depth': 0, 'nodes': 0, 'nps': 0,
+                      'time_ms': 0, 'pv': [move], 'tablebase': entry}
+            return result if self.make_move(*move) else None
+        move = self.book_move() if use_book else None
+        if move is not None:
+            result = {'move': move, 'score': 0, 'depth': 0, 'nodes': 0, 'nps': 0,
+                      'time_ms': 0, 'pv': [move], 'book': True}
+            return result if self.make_move(*move) else None
+        result = self.search_best_move(depth, time_ms, use_cache)
+        if result['move'] is None:
+            return None
+        from_pos, to_pos = result['move']
+        return result if self.make_move(from_pos, to_pos) else None
 
     def start_new_game(self):
+        self._legal_moves = None
         self.game_bridge.start_new_game()
 
     def save_game(self, filename):
         return self.game_bridge.save_game(filename)
 
     def load_game(self, filename):
+        self._legal_moves = None
         return self.game_bridge.load_game(filename)
 
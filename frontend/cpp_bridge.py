@@ -1,105 +1,421 @@
 # frontend/cpp_bridge.py
 import ctypes
-import json
+from collections import namedtuple
+import logging
 import platform
 from pathlib import Path
 import os
+import threading
+import time
+
+from .ffi_stats import InstrumentedLibrary, ffi_stats
+
+logger = logging.getLogger(__name__)
+
+# Явний шлях до бібліотеки; після першого пошуку сюди ж записується знайдений шлях,
+# щоб дочірні процеси (пули воркерів) не шукали її знову
+LIBRARY_ENV = 'HASAMI_SHOGI_LIB'
+# Тривалість етапів запуску в секундах (для run.py --startup-profile)
+startup_timings = {}
+
+_numpy = None
+
+
+def _np():
+    """NumPy module or None; imported on first use, it dominates import time otherwise."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:  # NumPy необов'язковий
+            _numpy = False
+    return _numpy or None
+
+
+def library_names():
+    system = platform.system()
+    if system == "Windows":
+        return ["hasami_shogi.dll"]
+    if system == "Darwin":
+        return ["libhasami_shogi.dylib", "hasami_shogi.dylib"]
+    # Старі збірки CMake давали hasami_shogi.so (PREFIX "")
+    return ["libhasami_shogi.so", "hasami_shogi.so"]
+
+
+def library_candidates():
+    """Paths checked by find_library, in order."""
+    roots = [Path(__file__).resolve().parent.parent]
+    if Path.cwd().resolve() != roots[0]:
+        roots.append(Path.cwd())
+    subdirs = ["", "frontend", "backend/build/lib", "backend/build/bin",
+               "backend/build/Release", "backend/build/Debug",
+               "backend/build/bin/Release", "backend/build/bin/Debug"]
+    return [root / subdir / name
+            for root in roots for subdir in subdirs for name in library_names()]
+
+
+_library_path = None
+
+
+def _has_exports(path):
+    # Стара збірка (наприклад, закомічена hasami_shogi.dll) без нових експортів пропускається
+    try:
+        GameBridge._setup_function_signatures(ctypes.CDLL(str(path)))
+    except (OSError, AttributeError) as e:
+        logger.debug("Skipping native library %s: %s", path, e)
+        return False
+    return True
+
+
+def find_library():
+    """Resolve the native library path once per process.
+
+    HASAMI_SHOGI_LIB wins if set. Otherwise the repository root and the
+    CMake output directories are searched for the first library that loads
+    and has every export GameBridge uses. The result is cached and exported
+    as HASAMI_SHOGI_LIB for child processes.
+    """
+    global _library_path
+    if _library_path is not None:
+        return _library_path
+    explicit = os.environ.get(LIBRARY_ENV)
+    if explicit:
+        path = Path(explicit)
+        if not path.is_file():
+            raise RuntimeError(f"{LIBRARY_ENV}={explicit} does not exist")
+    else:
+        path = next((p for p in library_candidates() if p.is_file() and _has_exports(p)), None)
+        if path is None:
+            raise RuntimeError(f"Could not find an up-to-date {' or '.join(library_names())}; "
+                               f"build the backend or set {LIBRARY_ENV}")
+        os.environ[LIBRARY_ENV] = str(path)
+    logger.debug("Native library: %s", path)
+    _library_path = path
+    return path
+
+BOARD_SIZE = 9
+BOARD_CELLS = BOARD_SIZE * BOARD_SIZE
+# Коди клітинок у бінарному знімку (збігаються з PieceColor у C++)
+EMPTY, BLACK, WHITE = 0, 1, 2
+CELL_SYMBOLS = ('E', 'B', 'W')
+# Game::MAX_LEGAL_MOVES: 81 клітинка * 16 можливих кроків
+MAX_LEGAL_MOVES = BOARD_CELLS * 16
+SEARCH_MAX_PV = 64
+MOVE_MAX_CAPTURES = 28
+# tablebase::Value: результат probeTablebase для того, хто ходить
+TABLEBASE_RESULTS = ('draw', 'win', 'loss')
+
+# Результат make_move_ex: що змінилось після ходу.
+# piece - 'B'/'W', captured - список (row, col), captures - {'black': n, 'white': n}
+MoveDelta = namedtuple('MoveDelta', ['piece', 'from_pos', 'to_pos', 'captured', 'captures',
+                                     'current_player', 'game_over', 'winner'])
+
+
+class MoveResult(ctypes.Structure):
+    """Mirror of struct MoveResult in exports.hpp."""
+    _fields_ = [
+        ('piece', ctypes.c_int),
+        ('from_', ctypes.c_int),
+        ('to', ctypes.c_int),
+        ('capturedCount', ctypes.c_int),
+        ('captured', ctypes.c_uint8 * MOVE_MAX_CAPTURES),
+        ('blackCaptured', ctypes.c_int),
+        ('whiteCaptured', ctypes.c_int),
+        ('currentPlayer', ctypes.c_int),
+        ('gameOver', ctypes.c_int),
+        ('winner', ctypes.c_int),
+    ]
+
+
+class SearchInfo(ctypes.Structure):
+    """Mirror of struct SearchInfo in exports.hpp."""
+    _fields_ = [
+        ('fromRow', ctypes.c_int),
+        ('fromCol', ctypes.c_int),
+        ('toRow', ctypes.c_int),
+        ('toCol', ctypes.c_int),
+        ('score', ctypes.c_int),
+        ('depth', ctypes.c_int),
+        ('nodes', ctypes.c_longlong),
+        ('nodesPerSecond', ctypes.c_longlong),
+        ('elapsedMs', ctypes.c_int),
+        ('pvLength', ctypes.c_int),
+        ('pv', ctypes.c_uint8 * (2 * SEARCH_MAX_PV)),
+    ]
+
+
+class MctsInfo(ctypes.Structure):
+    """Mirror of struct MctsInfo in exports.hpp."""
+    _fields_ = [
+        ('fromRow', ctypes.c_int),
+        ('fromCol', ctypes.c_int),
+        ('toRow', ctypes.c_int),
+        ('toCol', ctypes.c_int),
+        ('playouts', ctypes.c_longlong),
+        ('playoutsPerSecond', ctypes.c_longlong),
+        ('elapsedMs', ctypes.c_int),
+        ('treeNodes', ctypes.c_int),
+        ('reusedVisits', ctypes.c_int),
+        ('rootMoveCount', ctypes.c_int),
+    ]
+
+
+class MctsMoveInfo(ctypes.Structure):
+    """Mirror of struct MctsMoveInfo in exports.hpp."""
+    _fields_ = [
+        ('from_', ctypes.c_int),
+        ('to', ctypes.c_int),
+        ('visits', ctypes.c_int),
+        ('value', ctypes.c_double),
+    ]
+
+
+# void (*)(const SearchInfo*, void*): виклик із потоку пошуку, звичайна угода C
+SEARCH_PROGRESS_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.POINTER(SearchInfo), ctypes.c_void_p)
+
+
+def _search_info_dict(info, found=True):
+    pv = [(divmod(info.pv[i], BOARD_SIZE), divmod(info.pv[i + 1], BOARD_SIZE))
+          for i in range(0, 2 * info.pvLength, 2)]
+    return {
+        'move': ((info.fromRow, info.fromCol), (info.toRow, info.toCol)) if found else None,
+        'score': info.score,
+        'depth': info.depth,
+        'nodes': info.nodes,
+        'nps': info.nodesPerSecond,
+        'time_ms': info.elapsedMs,
+        'pv': pv
+    }
+
+
+_PLAYER_NAMES = {BLACK: 'black', WHITE: 'white'}
+
+
+def _move_delta(result):
+    return MoveDelta(
+        piece=CELL_SYMBOLS[result.piece],
+        from_pos=divmod(result.from_, BOARD_SIZE),
+        to_pos=divmod(result.to, BOARD_SIZE),
+        captured=[divmod(square, BOARD_SIZE)
+                  for square in result.captured[:result.capturedCount]],
+        captures={'black': result.blackCaptured, 'white': result.whiteCaptured},
+        current_player=_PLAYER_NAMES[result.currentPlayer],
+        game_over=bool(result.gameOver),
+        winner=_PLAYER_NAMES.get(result.winner)
+    )
+
+
+def pack_squares(moves):
+    """Moves as bytes of (from, to) square indices; packed input (bytes, NumPy) is copied as is."""
+    if isinstance(moves, (bytes, bytearray)):
+        return bytes(moves)
+    if hasattr(moves, 'tobytes'):
+        return moves.tobytes()
+    return bytes(square for (fr, fc), (tr, tc) in moves
+                 for square in (fr * BOARD_SIZE + fc, tr * BOARD_SIZE + tc))
+
 
 class GameBridge:
-    def __init__(self):
-        self._load_library()
-        self._setup_function_signatures()
-        self.game = self.lib.createGame()
-        print("Game instance created")
-
-    def _load_library(self):
-        if platform.system() == "Windows":
-            lib_name = "hasami_shogi.dll"
-        elif platform.system() == "Darwin":
-            lib_name = "libhasami_shogi.dylib"
-        else:
-            lib_name = "libhasami_shogi.so"
-
-        # Додаємо діагностичний вивід
-        print("\nLooking for DLL:", lib_name)
-        print("Current working directory:", Path.cwd())
-
-        # Розширюємо список можливих шляхів
-        possible_paths = [
-            Path.cwd() / lib_name,
-            Path.cwd() / "backend" / "build" / "Debug" / lib_name,
-            Path.cwd() / "backend" / "build" / "Release" / lib_name,
-            Path.cwd() / "backend" / "build" / "bin" / lib_name,
-            Path.cwd() / "backend" / "build" / "bin" / "Debug" / lib_name,
-            Path.cwd() / "backend" / "build" / "bin" / "Release" / lib_name,
-            Path(__file__).parent / lib_name,
-            Path(__file__).parent.parent / "backend" / "build" / "Debug" / lib_name,
-            Path(__file__).parent.parent / "backend" / "build" / "Release" / lib_name,
-        ]
-
-        print("\nChecking paths:")
-        for path in possible_paths:
-            print(f"- {path} (exists: {path.exists()})")
-
-        # Спроба завантажити бібліотеку
-        for path in possible_paths:
-            if path.exists():
-                try:
-                    print(f"\nTrying to load: {path}")
-                    self.lib = ctypes.CDLL(str(path))
-                    print("Successfully loaded!")
-                    break
-                except Exception as e:
-                    print(f"Failed to load {path}: {str(e)}")
-                    continue
-        else:
-            raise RuntimeError(f"Could not find or load {lib_name}")
-        pass
+    """ctypes wrapper around one native game.
 
-    def _setup_function_signatures(self):
+    Thread safety: every GameBridge owns its own native game handle and
+    result buffers, so independent instances can be driven from different
+    threads at once (e.g. one bridge per ThreadPoolExecutor task). A single
+    instance must not be shared between threads without external locking.
+    ctypes releases the GIL for the duration of every native call, so long
+    calls such as search_best_move run in parallel across threads.
+    """
+
+    # Бібліотека завантажується один раз на процес і спільна для всіх екземплярів
+    _lib = None
+    _lib_lock = threading.Lock()
+
+    def __init__(self, handle=None):
+        """Create a new native game, or wrap handle (taking ownership), as clone() does."""
+        self.lib = GameBridge.load_library()
+        self.game = handle if handle is not None else self.lib.createGame()
+        # Буфери для getBoardSnapshot, виділяються один раз на екземпляр
+        self._cells = (ctypes.c_uint8 * BOARD_CELLS)()
+        self._player = ctypes.c_int()
+        self._black_captured = ctypes.c_int()
+        self._white_captured = ctypes.c_int()
+        # Буфер для getAllLegalMoves: по 2 байти (from, to) на хід
+        self._moves = (ctypes.c_uint8 * (2 * MAX_LEGAL_MOVES))()
+        self._move_result = MoveResult()
+        if os.environ.get('HASAMI_FFI_STATS'):
+            self.enable_instrumentation()
+        logger.debug("Game instance created")
+
+    def enable_instrumentation(self, stats=None):
+        """Record call counts and latency histograms for this bridge's native calls.
+
+        Args:
+            stats: FFIStats to record into, defaults to the process-wide ffi_stats
+        Returns:
+            the FFIStats object; dump it with .to_json() or .dump(path)
+        """
+        stats = stats or ffi_stats
+        self.lib = InstrumentedLibrary(GameBridge._lib, stats)
+        return stats
+
+    def disable_instrumentation(self):
+        self.lib = GameBridge._lib
+
+    @classmethod
+    def load_library(cls):
+        """Load the native library and declare its signatures once per process."""
+        with cls._lib_lock:
+            if cls._lib is None:
+                start = time.perf_counter()
+                path = find_library()
+                startup_timings['find_library'] = time.perf_counter() - start
+                lib = ctypes.CDLL(str(path))
+                cls._setup_function_signatures(lib)
+                startup_timings['load_library'] = time.perf_counter() - start
+                cls._lib = lib
+        return cls._lib
+
+    @staticmethod
+    def _setup_function_signatures(lib):
         """Setup C++ function signatures."""
         # createGame
-        self.lib.createGame.restype = ctypes.c_void_p
+        lib.createGame.restype = ctypes.c_void_p
         
         # deleteGame
-        self.lib.deleteGame.argtypes = [ctypes.c_void_p]
+        lib.deleteGame.argtypes = [ctypes.c_void_p]
         
         # makeMove
-        self.lib.makeMove.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, 
-                                     ctypes.c_int, ctypes.c_int]
-        self.lib.makeMove.restype = ctypes.c_bool
+        lib.makeMove.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, 
+                                ctypes.c_int, ctypes.c_int]
+        lib.makeMove.restype = ctypes.c_bool
+        
+        # makeMoveEx
+        lib.makeMoveEx.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                   ctypes.c_int, ctypes.c_int, ctypes.POINTER(MoveResult)]
+        lib.makeMoveEx.restype = ctypes.c_bool
+        lib.replayMoves.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8), ctypes.c_int,
+                                    ctypes.POINTER(MoveResult), ctypes.POINTER(ctypes.c_int)]
+        lib.replayMoves.restype = ctypes.c_int
         
         # getValidMoves
-        self.lib.getValidMoves.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
-        self.lib.getValidMoves.restype = ctypes.c_char_p
+        lib.getValidMoves.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+        lib.getValidMoves.restype = ctypes.c_char_p
+        
+        # getAllLegalMoves
+        lib.getAllLegalMoves.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                         ctypes.c_int]
+        lib.getAllLegalMoves.restype = ctypes.c_int
+        
+        # getMoveHistory / getStartSnapshot / setPosition
+        lib.getMoveHistory.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                       ctypes.c_int]
+        lib.getMoveHistory.restype = ctypes.c_int
+        lib.getStartSnapshot.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                         ctypes.POINTER(ctypes.c_int),
+                                         ctypes.POINTER(ctypes.c_int),
+                                         ctypes.POINTER(ctypes.c_int)]
+        lib.getStartSnapshot.restype = ctypes.c_bool
+        lib.setPosition.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                    ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.setPosition.restype = ctypes.c_bool
         
         # getBoardState
-        self.lib.getBoardState.argtypes = [ctypes.c_void_p]
-        self.lib.getBoardState.restype = ctypes.c_char_p
+        lib.getBoardState.argtypes = [ctypes.c_void_p]
+        lib.getBoardState.restype = ctypes.c_char_p
+        
+        # getBoardSnapshot
+        lib.getBoardSnapshot.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                         ctypes.POINTER(ctypes.c_int),
+                                         ctypes.POINTER(ctypes.c_int),
+                                         ctypes.POINTER(ctypes.c_int)]
+        lib.getBoardSnapshot.restype = ctypes.c_bool
         
+        # getBoardMaps
+        lib.getBoardMaps.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8),
+                                     ctypes.POINTER(ctypes.c_int)]
+        lib.getBoardMaps.restype = ctypes.c_bool
+
         # getCurrentPlayer
-        self.lib.getCurrentPlayer.argtypes = [ctypes.c_void_p]
-        self.lib.getCurrentPlayer.restype = ctypes.c_int
+        lib.getCurrentPlayer.argtypes = [ctypes.c_void_p]
+        lib.getCurrentPlayer.restype = ctypes.c_int
         
         # isGameOver
-        self.lib.isGameOver.argtypes = [ctypes.c_void_p]
-        self.lib.isGameOver.restype = ctypes.c_bool
+        lib.isGameOver.argtypes = [ctypes.c_void_p]
+        lib.isGameOver.restype = ctypes.c_bool
         
         # Captures
-        self.lib.getBlackCaptured.argtypes = [ctypes.c_void_p]
-        self.lib.getBlackCaptured.restype = ctypes.c_int
+        lib.getBlackCaptured.argtypes = [ctypes.c_void_p]
+        lib.getBlackCaptured.restype = ctypes.c_int
         
-        self.lib.getWhiteCaptured.argtypes = [ctypes.c_void_p]
-        self.lib.getWhiteCaptured.restype = ctypes.c_int
+        lib.getWhiteCaptured.argtypes = [ctypes.c_void_p]
+        lib.getWhiteCaptured.restype = ctypes.c_int
         
         # Game state
-        self.lib.saveGame.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
-        self.lib.saveGame.restype = ctypes.c_bool
+        lib.saveGame.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.saveGame.restype = ctypes.c_bool
+        
+        lib.loadGame.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.loadGame.restype = ctypes.c_bool
+        
+        lib.startNewGame.argtypes = [ctypes.c_void_p]
+        
+        # Position identity
+        lib.getWinner.argtypes = [ctypes.c_void_p]
+        lib.getWinner.restype = ctypes.c_int
+        
+        lib.getPositionHash.argtypes = [ctypes.c_void_p]
+        lib.getPositionHash.restype = ctypes.c_ulonglong
+        lib.getCanonicalHash.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+        lib.getCanonicalHash.restype = ctypes.c_ulonglong
+        
+        lib.getRepetitionCount.argtypes = [ctypes.c_void_p]
+        lib.getRepetitionCount.restype = ctypes.c_int
+        
+        lib.setRepetitionLimit.argtypes = [ctypes.c_void_p, ctypes.c_int]
         
-        self.lib.loadGame.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
-        self.lib.loadGame.restype = ctypes.c_bool
+        # Undo / redo
+        lib.undoMove.argtypes = [ctypes.c_void_p]
+        lib.undoMove.restype = ctypes.c_bool
         
-        self.lib.startNewGame.argtypes = [ctypes.c_void_p]
+        lib.redoMove.argtypes = [ctypes.c_void_p]
+        lib.redoMove.restype = ctypes.c_bool
+        
+        lib.getHistoryLength.argtypes = [ctypes.c_void_p]
+        lib.getHistoryLength.restype = ctypes.c_int
+        
+        lib.getRedoLength.argtypes = [ctypes.c_void_p]
+        lib.getRedoLength.restype = ctypes.c_int
+        
+        # Search
+        lib.searchBestMove.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                       ctypes.POINTER(SearchInfo)]
+        lib.searchBestMove.restype = ctypes.c_bool
+        
+        lib.setSearchProgressCallback.argtypes = [ctypes.c_void_p, SEARCH_PROGRESS_CALLBACK,
+                                                  ctypes.c_void_p]
+        lib.stopSearch.argtypes = [ctypes.c_void_p]
+        lib.clearSearchStop.argtypes = [ctypes.c_void_p]
+        
+        # cloneGame / copyGame
+        lib.cloneGame.argtypes = [ctypes.c_void_p]
+        lib.cloneGame.restype = ctypes.c_void_p
+        lib.copyGame.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        
+        lib.setSearchHashSize.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.setSearchNodeLimit.argtypes = [ctypes.c_void_p, ctypes.c_longlong]
+
+        # MCTS
+        lib.mctsSearch.argtypes = [ctypes.c_void_p, ctypes.c_longlong, ctypes.c_int, ctypes.c_int,
+                                   ctypes.c_int, ctypes.POINTER(MctsInfo),
+                                   ctypes.POINTER(MctsMoveInfo), ctypes.c_int]
+        lib.mctsSearch.restype = ctypes.c_bool
+        lib.setMctsMemory.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+        # Ендшпільні таблиці (frontend/tablebase.py)
+        lib.probeTablebase.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_longlong,
+                                       ctypes.POINTER(ctypes.c_int)]
+        lib.probeTablebase.restype = ctypes.c_int
 
     def create_initial_board(self):
         """Create initial board state if C++ fails to provide one."""
@@ -112,24 +428,74 @@ class GameBridge:
             board[8][col] = 'W'
         return board
 
+    def get_board_snapshot(self):
+        """Fetch the board, side to move and captures in a single FFI call.
+
+        Returns:
+            tuple (cells, current_player, captures): cells is a 9x9 NumPy
+            uint8 view when NumPy is installed, otherwise a 9x9 memoryview;
+            values are EMPTY/BLACK/WHITE. Both alias this bridge's buffer
+            and are overwritten by the next snapshot, copy them to keep.
+        """
+        self.lib.getBoardSnapshot(self.game, self._cells, ctypes.byref(self._player),
+                                  ctypes.byref(self._black_captured),
+                                  ctypes.byref(self._white_captured))
+        np = _np()
+        if np is not None:
+            cells = np.frombuffer(self._cells, dtype=np.uint8).reshape(BOARD_SIZE, BOARD_SIZE)
+        else:
+            cells = memoryview(self._cells).cast('B', (BOARD_SIZE, BOARD_SIZE))
+        player = 'black' if self._player.value == BLACK else 'white'
+        captures = {
+            'black': self._black_captured.value,
+            'white': self._white_captured.value
+        }
+        return cells, player, captures
+
+    def get_board_bytes(self):
+        """Return the 81 board cells (row-major, EMPTY/BLACK/WHITE) as bytes."""
+        self.lib.getBoardSnapshot(self.game, self._cells, None, None, None)
+        return bytes(self._cells)
+
+    def get_board_maps(self):
+        """Mobility and capture-threat maps of the current position in one FFI call.
+
+        Returns:
+            dict of 9x9 arrays (NumPy uint8 when installed, otherwise
+            memoryviews): 'mobility' (moves of the piece on each square),
+            'reach' {'black': ..., 'white': ...} (how many pieces of that
+            colour can move to each empty square) and 'threats' (1 where the
+            piece can be captured by the opponent's next move); plus totals
+            'moves' and 'threatened' as {'black': n, 'white': n}.
+        """
+        maps = (ctypes.c_uint8 * (4 * BOARD_CELLS))()
+        totals = (ctypes.c_int * 4)()
+        self.lib.getBoardMaps(self.game, maps, totals)
+        np = _np()
+        if np is not None:
+            grids = np.frombuffer(maps, dtype=np.uint8).reshape(4, BOARD_SIZE, BOARD_SIZE)
+        else:
+            raw = memoryview(maps).cast('B')
+            grids = [raw[i * BOARD_CELLS:(i + 1) * BOARD_CELLS].cast('B', (BOARD_SIZE, BOARD_SIZE))
+                     for i in range(4)]
+        return {
+            'mobility': grids[0],
+            'reach': {'black': grids[1], 'white': grids[2]},
+            'threats': grids[3],
+            'moves': {'black': totals[0], 'white': totals[1]},
+            'threatened': {'black': totals[2], 'white': totals[3]},
+        }
+
     def get_board_state(self):
-        try:
-            state_bytes = self.lib.getBoardState(self.game)
-            if not state_bytes:
-                print("Warning: getBoardState returned None")
-                return self.create_initial_board()
-            
-            state_str = state_bytes.decode('utf-8')
-            print("Raw board state:", state_str)  # Debug print
-            try:
-                board_state = json.loads(state_str)
-                return board_state
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON: {e}")
-                return self.create_initial_board()
-        except Exception as e:
-            print(f"Error in get_board_state: {e}")
-            return self.create_initial_board()
+        """Board as a 9x9 list of 'B'/'W'/'E', decoded from the binary snapshot."""
+        raw = self.get_board_bytes()
+        return [[CELL_SYMBOLS[cell] for cell in raw[row:row + BOARD_SIZE]]
+                for row in range(0, BOARD_CELLS, BOARD_SIZE)]
+
+    def get_board_state_json(self):
+        """Raw JSON board from Board::serialize. Debugging only, use get_board_state."""
+        state_bytes = self.lib.getBoardState(self.game)
+        return state_bytes.decode('utf-8') if state_bytes else None
 
     def make_move(self, from_pos, to_pos):
         """Make a move on the board.
@@ -147,10 +513,99 @@ class GameBridge:
         
         return self.lib.makeMove(self.game, from_row, from_col, to_row, to_col)
 
+    def get_all_legal_moves_packed(self):
+        """All moves of the side to move as packed (from, to) square indices.
+
+        Square index is row * 9 + col. Returns an (n, 2) NumPy uint8 view when
+        NumPy is installed, otherwise a flat memoryview of 2 * n bytes. The
+        result aliases this bridge's buffer until the next call.
+        """
+        count = self.lib.getAllLegalMoves(self.game, self._moves, MAX_LEGAL_MOVES)
+        np = _np()
+        if np is not None:
+            return np.frombuffer(self._moves, dtype=np.uint8, count=2 * count).reshape(count, 2)
+        return memoryview(self._moves).cast('B')[:2 * count]
+
+    def get_all_legal_moves(self):
+        """All moves of the side to move as a list of ((row, col), (row, col))."""
+        count = self.lib.getAllLegalMoves(self.game, self._moves, MAX_LEGAL_MOVES)
+        packed = bytes(self._moves[:2 * count])
+        return [(divmod(packed[i], BOARD_SIZE), divmod(packed[i + 1], BOARD_SIZE))
+                for i in range(0, 2 * count, 2)]
+
+    def make_move_ex(self, from_pos, to_pos):
+        """Make a move and return everything it changed in one FFI call.
+
+        Returns:
+            MoveDelta, or None if the move is illegal
+        """
+        result = self._move_result
+        if not self.lib.makeMoveEx(self.game, from_pos[0], from_pos[1],
+                                   to_pos[0], to_pos[1], ctypes.byref(result)):
+            return None
+        return _move_delta(result)
+
+    def replay_moves(self, moves, deltas=False, branching=False):
+        """Play a whole move sequence in one FFI call, stopping at the first illegal move.
+
+        Args:
+            moves: list of ((row, col), (row, col)), or bytes of packed
+                (from, to) square indices as get_all_legal_moves_packed gives
+            deltas: also return the MoveDelta of every move played
+            branching: also return the number of legal moves before each move
+        Returns:
+            tuple (played, deltas, branching); the lists are None unless
+            requested. played < len(moves) means moves[played] is illegal.
+        """
+        packed = pack_squares(moves)
+        count = len(packed) // 2
+        if not count:
+            return 0, [] if deltas else None, [] if branching else None
+        results = (MoveResult * count)() if deltas else None
+        counts = (ctypes.c_int * count)() if branching else None
+        buffer = (ctypes.c_uint8 * len(packed)).from_buffer_copy(packed)
+        played = self.lib.replayMoves(self.game, buffer, count, results, counts)
+        return (played,
+                [_move_delta(result) for result in results[:played]] if deltas else None,
+                counts[:played] if branching else None)
+
     def get_current_player(self):
         player = self.lib.getCurrentPlayer(self.game)
         return 'black' if player == 1 else 'white'
 
+    def is_game_over(self):
+        """Native game-over check: nine captures or the repetition rule."""
+        return self.lib.isGameOver(self.game)
+
+    def get_winner(self):
+        """'black', 'white' or None (game running or drawn by repetition)."""
+        winner = self.lib.getWinner(self.game)
+        return {BLACK: 'black', WHITE: 'white'}.get(winner)
+
+    def get_position_hash(self):
+        """64-bit Zobrist key of the position, including side to move."""
+        return self.lib.getPositionHash(self.game)
+
+    def get_canonical_hash(self):
+        """Smallest position key among the symmetric variants of the position.
+
+        Returns:
+            (key, symmetry) where symmetry (frontend.symmetry.IDENTITY,
+            MIRROR, SWAP or MIRROR_SWAP) maps this position to the one
+            with that key, and maps its moves back.
+        """
+        symmetry = ctypes.c_int(0)
+        key = self.lib.getCanonicalHash(self.game, ctypes.byref(symmetry))
+        return key, symmetry.value
+
+    def get_repetition_count(self):
+        """How many times the current position has occurred, counting now."""
+        return self.lib.getRepetitionCount(self.game)
+
+    def set_repetition_limit(self, limit):
+        """End the game as a draw once a position occurs limit times, 0 disables."""
+        self.lib.setRepetitionLimit(self.game, limit)
+
     def get_captures(self):
         return {
             'black': self.lib.getBlackCaptured(self.game),
@@ -163,9 +618,174 @@ class GameBridge:
     def load_game(self, filename):
         return self.lib.loadGame(self.game, filename.encode('utf-8'))
 
+    def get_move_history(self):
+        """Moves played since the start of the history as a list of ((row, col), (row, col))."""
+        length = self.lib.getMoveHistory(self.game, None, 0)
+        buffer = (ctypes.c_uint8 * (2 * length))()
+        count = self.lib.getMoveHistory(self.game, buffer, length)
+        packed = bytes(buffer[:2 * count])
+        return [(divmod(packed[i], BOARD_SIZE), divmod(packed[i + 1], BOARD_SIZE))
+                for i in range(0, 2 * count, 2)]
+
+    def get_start_snapshot(self):
+        """Position the move history starts from (initial or loaded).
+
+        Returns:
+            tuple (cells, current_player, captures) with cells as 81 bytes
+        """
+        cells = (ctypes.c_uint8 * BOARD_CELLS)()
+        player, black, white = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        self.lib.getStartSnapshot(self.game, cells, ctypes.byref(player),
+                                  ctypes.byref(black), ctypes.byref(white))
+        return (bytes(cells), 'black' if player.value == BLACK else 'white',
+                {'black': black.value, 'white': white.value})
+
+    def set_position(self, cells, current_player, captures):
+        """Set an arbitrary position and clear the history.
+
+        Args:
+            cells: 81 bytes of EMPTY/BLACK/WHITE, row-major
+            current_player: 'black' or 'white'
+            captures: dict with 'black' and 'white' capture counts
+        Returns:
+            False if the position data is invalid
+        """
+        buffer = (ctypes.c_uint8 * BOARD_CELLS).from_buffer_copy(bytes(cells))
+        player = BLACK if current_player == 'black' else WHITE
+        return self.lib.setPosition(self.game, buffer, player,
+                                    captures['black'], captures['white'])
+
     def start_new_game(self):
         self.lib.startNewGame(self.game)
-        print("New game started")  # Debug print
+        logger.debug("New game started")
+
+    def undo_move(self):
+        """Take back the last move. Returns False if there is nothing to undo."""
+        return self.lib.undoMove(self.game)
+
+    def redo_move(self):
+        """Replay the last undone move. Returns False if there is nothing to redo."""
+        return self.lib.redoMove(self.game)
+
+    def can_undo(self):
+        return self.lib.getHistoryLength(self.game) > 0
+
+    def can_redo(self):
+        return self.lib.getRedoLength(self.game) > 0
+
+    def search_best_move(self, depth, time_ms=0, progress=None):
+        """Run the native iterative-deepening alpha-beta search.
+
+        Args:
+            depth: maximum search depth in plies
+            time_ms: time budget in milliseconds, 0 for no limit
+            progress: optional callable(dict) receiving the best result so
+                far after every iteration and about every 100 ms; it runs
+                on the searching thread
+        Returns:
+            dict with 'move' ((row, col), (row, col)) or None if there is no
+            legal move, 'score' (from the side to move's view), 'depth'
+            (last completed iteration), 'nodes', 'nps', 'time_ms' and 'pv'
+            (list of moves).
+        """
+        info = SearchInfo()
+        if progress is None:
+            found = self.lib.searchBestMove(self.game, depth, time_ms, ctypes.byref(info))
+            return _search_info_dict(info, found)
+
+        def report(partial, _user_data):
+            progress(_search_info_dict(partial.contents))
+
+        # Посилання на callback має жити, доки native-код може його викликати
+        callback = SEARCH_PROGRESS_CALLBACK(report)
+        self.lib.setSearchProgressCallback(self.game, callback, None)
+        try:
+            found = self.lib.searchBestMove(self.game, depth, time_ms, ctypes.byref(info))
+        finally:
+            self.lib.setSearchProgressCallback(self.game, SEARCH_PROGRESS_CALLBACK(), None)
+        return _search_info_dict(info, found)
+
+    def stop_search(self):
+        """Make a running search_best_move return its best move so far.
+
+        Safe to call from any thread. The stop stays in effect (later
+        searches return at once) until clear_search_stop().
+        """
+        self.lib.stopSearch(self.game)
+
+    def clear_search_stop(self):
+        self.lib.clearSearchStop(self.game)
+
+    def clone(self):
+        """Independent GameBridge with a copy of this game's state (no search tables)."""
+        return GameBridge(self.lib.cloneGame(self.game))
+
+    def copy_from(self, other):
+        """Replace this game's state with other's, keeping this bridge's search tables."""
+        self.lib.copyGame(self.game, other.game)
+
+    def set_search_hash_size(self, size_mb):
+        """Resize this game's transposition table."""
+        self.lib.setSearchHashSize(self.game, size_mb)
+
+    def set_search_node_limit(self, max_nodes):
+        """Limit nodes per search, 0 removes the limit."""
+        self.lib.setSearchNodeLimit(self.game, max_nodes)
+
+    def mcts_search(self, playouts=0, time_ms=1000, threads=1, batch=1):
+        """Run the native parallel Monte Carlo tree search (UCT).
+
+        The tree is kept between calls on this bridge: when the new position
+        is within two moves of the last root, its subtree is reused. The
+        search also honours stop_search().
+
+        Args:
+            playouts: playout budget, 0 for no limit
+            time_ms: time budget in milliseconds, 0 for no limit (both 0 means 1 s)
+            threads: worker threads sharing the tree
+            batch: random playouts per leaf on each descent
+        Returns:
+            dict with 'move' (most visited root move, or None if there is no
+            legal move), 'playouts', 'playouts_per_sec', 'time_ms',
+            'tree_nodes', 'reused_visits' and 'root_moves': a list of
+            (move, visits, value) sorted by visits, where value is the mean
+            result for the side to move (1 win, 0.5 draw, 0 loss).
+        """
+        info = MctsInfo()
+        stats = (MctsMoveInfo * MAX_LEGAL_MOVES)()
+        found = self.lib.mctsSearch(self.game, playouts, time_ms, threads, batch,
+                                    ctypes.byref(info), stats, MAX_LEGAL_MOVES)
+        root_moves = [((divmod(stat.from_, BOARD_SIZE), divmod(stat.to, BOARD_SIZE)),
+                       stat.visits, stat.value)
+                      for stat in stats[:info.rootMoveCount]]
+        return {
+            'move': ((info.fromRow, info.fromCol), (info.toRow, info.toCol)) if found else None,
+            'playouts': info.playouts,
+            'playouts_per_sec': info.playoutsPerSecond,
+            'time_ms': info.elapsedMs,
+            'tree_nodes': info.treeNodes,
+            'reused_visits': info.reusedVisits,
+            'root_moves': root_moves,
+        }
+
+    def set_mcts_memory(self, size_mb):
+        """Memory budget of the MCTS node pool; drops the kept tree."""
+        self.lib.setMctsMemory(self.game, size_mb)
+
+    def probe_tablebase(self, tablebase):
+        """Exact result of the current position from an open frontend.tablebase.Tablebase.
+
+        Returns:
+            dict with 'result' ('win', 'loss' or 'draw' for the side to move)
+            and 'distance' (plies to the end of the game with best play), or
+            None when the position is not in the tables.
+        """
+        distance = ctypes.c_int(0)
+        value = self.lib.probeTablebase(self.game, tablebase.address, tablebase.size,
+                                        ctypes.byref(distance))
+        if value < 0:
+            return None
+        return {'result': TABLEBASE_RESULTS[value], 'distance': distance.value}
 
     def __del__(self):
         if hasattr(self, 'lib') and hasattr(self, 'game'):
@@ -190,7 +810,7 @@ class GameBridge:
                 
             # Декодуємо байти в рядок
             moves_str = moves_str.decode('utf-8')
-            print(f"Raw moves string: {moves_str}")  # Debug print
+            logger.debug("Raw moves string: %s", moves_str)
             
             # Парсимо [row1,col1;row2,col2;...]
             if moves_str == "[]":
@@ -211,5 +831,47 @@ class GameBridge:
             return moves
             
         except Exception as e:
-            print(f"Error in get_valid_moves: {e}")
-            return []
\ No newline at end of file
+            logger.exception("Error in get_valid_moves: %s", e)
+            return []
+
+# Вибір рушія: 'native' - лише C++, 'python' - frontend.py_engine, 'auto' - C++, якщо
+# бібліотека завантажується, інакше Python
+ENGINE_ENV = 'HASAMI_ENGINE'
+ENGINES = ('auto', 'native', 'python')
+
+
+_auto_class = None
+
+
+def bridge_class(engine=None):
+    """GameBridge or py_engine.PyGameBridge for engine ('auto', 'native' or 'python').
+
+    engine defaults to HASAMI_ENGINE, then 'auto'. 'native' raises the
+    library loading error; 'auto' logs it and falls back to Python, and
+    remembers the choice for the rest of the process.
+    """
+    global _auto_class
+    engine = (engine or os.environ.get(ENGINE_ENV) or 'auto').lower()
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    if engine == 'native':
+        GameBridge.load_library()
+        return GameBridge
+    if engine == 'auto':
+        if _auto_class is None:
+            try:
+                GameBridge.load_library()
+                _auto_class = GameBridge
+            except (RuntimeError, OSError, AttributeError) as e:
+                # AttributeError - бібліотека старої збірки без потрібних експортів
+                logger.warning("Native library unavailable (%s), using the pure-Python engine", e)
+                from .py_engine import PyGameBridge
+                _auto_class = PyGameBridge
+        return _auto_class
+    from .py_engine import PyGameBridge
+    return PyGameBridge
+
+
+def create_bridge(engine=None):
+    """New game on the engine chosen by bridge_class."""
+    return bridge_class(engine)()
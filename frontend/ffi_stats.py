@@ -0,0 +1,113 @@
+# frontend/ffi_stats.py
+"""Opt-in per-function call counts and latency histograms for the native library.
+
+GameBridge.enable_instrumentation() (or HASAMI_FFI_STATS=1 in the
+environment) routes the bridge's ctypes calls through InstrumentedLibrary,
+which records every call into an FFIStats object. Histograms use
+power-of-two nanosecond buckets so recording stays O(1) per call.
+"""
+import json
+import threading
+import time
+
+# Кошик k містить виклики тривалістю до 2**k наносекунд
+_BUCKETS = 40
+
+
+class FFIStats:
+    """Thread-safe call counters and latency histograms keyed by function name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def record(self, name, elapsed_ns):
+        bucket = min(elapsed_ns.bit_length(), _BUCKETS - 1)
+        with self._lock:
+            entry = self._functions.get(name)
+            if entry is None:
+                entry = self._functions[name] = {
+                    'calls': 0, 'total_ns': 0, 'min_ns': elapsed_ns, 'max_ns': 0,
+                    'histogram': [0] * _BUCKETS,
+                }
+            entry['calls'] += 1
+            entry['total_ns'] += elapsed_ns
+            entry['min_ns'] = min(entry['min_ns'], elapsed_ns)
+            entry['max_ns'] = max(entry['max_ns'], elapsed_ns)
+            entry['histogram'][bucket] += 1
+
+    def wrap(self, name, func):
+        """Return a callable that times func and records it under name."""
+        record = self.record
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args):
+            start = perf_counter_ns()
+            try:
+                return func(*args)
+            finally:
+                record(name, perf_counter_ns() - start)
+
+        timed.__name__ = name
+        return timed
+
+    def reset(self):
+        with self._lock:
+            self._functions.clear()
+
+    def snapshot(self):
+        """Summary per function: calls, total/mean/min/max and approximate p50/p99 in ns."""
+        with self._lock:
+            functions = {name: dict(entry, histogram=list(entry['histogram']))
+                         for name, entry in self._functions.items()}
+        summary = {}
+        for name, entry in sorted(functions.items()):
+            histogram = entry['histogram']
+            summary[name] = {
+                'calls': entry['calls'],
+                'total_ns': entry['total_ns'],
+                'mean_ns': entry['total_ns'] / entry['calls'],
+                'min_ns': entry['min_ns'],
+                'max_ns': entry['max_ns'],
+                'p50_ns': _percentile(histogram, entry['calls'], 0.50),
+                'p99_ns': _percentile(histogram, entry['calls'], 0.99),
+                'histogram': {f'<={1 << k}ns': count
+                              for k, count in enumerate(histogram) if count},
+            }
+        return summary
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+
+def _percentile(histogram, calls, fraction):
+    # Верхня межа кошика, в який потрапляє потрібний перцентиль
+    target = fraction * calls
+    seen = 0
+    for k, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return 1 << k
+    return 1 << (len(histogram) - 1)
+
+
+class InstrumentedLibrary:
+    """Proxy over a ctypes library that times every exported function call."""
+
+    def __init__(self, lib, stats):
+        self._lib = lib
+        self._stats = stats
+
+    def __getattr__(self, name):
+        wrapper = self._stats.wrap(name, getattr(self._lib, name))
+        # Кешуємо обгортку, щоб наступні звернення не йшли через __getattr__
+        setattr(self, name, wrapper)
+        return wrapper
+
+
+# Спільна статистика процесу, якщо викликач не передав свою
+ffi_stats = FFIStats()
@@ -0,0 +1,351 @@
+# frontend/game_archive.py
+"""Binary archive of many complete games, with random access by game number.
+
+Each move is stored in 12 bits: from square (7 bits), direction (2 bits:
+right, left, down, up as in Board::getValidMoves) and distance - 1 (3 bits).
+That is the same numbering as BatchBoard actions. Two moves pack into
+3 bytes, so a game costs 1.5 bytes per ply plus a 6-byte record header.
+
+File layout (little-endian):
+
+    header   magic b'HSGA', u16 version, u16 flags, u32 game count,
+             u64 index offset, u32 reserved
+    records  per game: u8 flags, u8 result, u32 plies,
+             [start position if flags & 1: 21 bytes of 2-bit cells,
+              u8 side to move, u8 black captured, u8 white captured],
+             ceil(plies * 1.5) bytes of moves
+    index    u64 record offset per game
+
+ArchiveReader mmaps the file and decodes games only when asked for them;
+reader.packed(k) gives the moves as (from, to) square bytes ready for
+GameBridge.replay_moves.
+ArchiveWriter streams records and writes the index on close.
+
+    python -m frontend.game_archive info games.hsga
+    python -m frontend.game_archive show games.hsga 17
+    python -m frontend.game_archive import games.hsga saves/*.hsg
+    python -m frontend.game_archive verify games.hsga
+"""
+import argparse
+import mmap
+import struct
+from collections import namedtuple
+
+from .cpp_bridge import BOARD_SIZE, BOARD_CELLS, EMPTY, BLACK, WHITE
+
+MAGIC = b'HSGA'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQI')
+RECORD = struct.Struct('<BBI')
+START = struct.Struct('<BBB')
+OFFSET = struct.Struct('<Q')
+
+# Прапорці запису партії
+HAS_START = 0x01
+
+PACKED_CELLS = (BOARD_CELLS + 3) // 4
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+RESULTS = (None, 'black', 'white', 'draw')
+
+# cells - 81 байт EMPTY/BLACK/WHITE; None у GameRecord.start - стандартна початкова позиція
+StartPosition = namedtuple('StartPosition', ['cells', 'current_player', 'captures'])
+GameRecord = namedtuple('GameRecord', ['moves', 'result', 'start'])
+# Те саме з ходами як bytes пар (from, to) індексів клітинок - формат GameBridge.replay_moves
+PackedGame = namedtuple('PackedGame', ['squares', 'result', 'start'])
+
+INITIAL_CELLS = bytes([BLACK] * BOARD_SIZE + [EMPTY] * (BOARD_CELLS - 2 * BOARD_SIZE)
+                      + [WHITE] * BOARD_SIZE)
+
+
+def encode_move(from_pos, to_pos):
+    """12-bit code of a straight-line move."""
+    (fr, fc), (tr, tc) = from_pos, to_pos
+    if fr == tr and tc != fc:
+        direction, distance = (0, tc - fc) if tc > fc else (1, fc - tc)
+    elif fc == tc and tr != fr:
+        direction, distance = (2, tr - fr) if tr > fr else (3, fr - tr)
+    else:
+        raise ValueError(f'Not a straight-line move: {from_pos} -> {to_pos}')
+    return (fr * BOARD_SIZE + fc) << 5 | direction << 3 | (distance - 1)
+
+
+def decode_move(code):
+    square, direction, distance = code >> 5, (code >> 3) & 3, (code & 7) + 1
+    row, col = divmod(square, BOARD_SIZE)
+    dr, dc = DIRECTIONS[direction]
+    return (row, col), (row + dr * distance, col + dc * distance)
+
+
+def _code_squares():
+    # 12-бітний код ходу -> 2 байти (from, to); коди за межами дошки дають 0xFF, який відкидає replay_moves
+    table = []
+    for code in range(1 << 12):
+        (fr, fc), (tr, tc) = decode_move(code)
+        if fr < BOARD_SIZE and 0 <= tr < BOARD_SIZE and 0 <= tc < BOARD_SIZE:
+            table.append(bytes((fr * BOARD_SIZE + fc, tr * BOARD_SIZE + tc)))
+        else:
+            table.append(b'\xff\xff')
+    return tuple(table)
+
+
+CODE_SQUARES = _code_squares()
+
+
+def pack_moves(moves):
+    codes = [encode_move(from_pos, to_pos) for from_pos, to_pos in moves]
+    if len(codes) % 2:
+        codes.append(0)
+    out = bytearray()
+    for i in range(0, len(codes), 2):
+        pair = codes[i] | codes[i + 1] << 12
+        out += pair.to_bytes(3, 'little')
+    return bytes(out)
+
+
+def unpack_moves(data, plies):
+    moves = []
+    for i in range(0, 3 * ((plies + 1) // 2), 3):
+        pair = int.from_bytes(data[i:i + 3], 'little')
+        moves.append(decode_move(pair & 0xFFF))
+        moves.append(decode_move(pair >> 12))
+    del moves[plies:]
+    return moves
+
+
+def _pack_start(start):
+    packed = bytearray(PACKED_CELLS)
+    for square, cell in enumerate(start.cells):
+        packed[square >> 2] |= cell << (2 * (square & 3))
+    side = BLACK if start.current_player == 'black' else WHITE
+    return bytes(packed) + START.pack(side, start.captures['black'], start.captures['white'])
+
+
+def _unpack_start(data, offset):
+    packed = data[offset:offset + PACKED_CELLS]
+    cells = bytes((packed[square >> 2] >> (2 * (square & 3))) & 3
+                  for square in range(BOARD_CELLS))
+    side, black, white = START.unpack_from(data, offset + PACKED_CELLS)
+    return StartPosition(cells, 'black' if side == BLACK else 'white',
+                         {'black': black, 'white': white})
+
+
+class ArchiveWriter:
+    """Append games to a new archive file; the index is written by close()."""
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._offsets = []
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+
+    def add(self, moves, result=None, start=None):
+        """Store one game and return its number.
+
+        Args:
+            moves: list of ((row, col), (row, col)) from the start position
+            result: 'black', 'white', 'draw' or None if unfinished
+            start: StartPosition, or None for the standard initial position
+        """
+        flags = HAS_START if start is not None else 0
+        self._offsets.append(self._file.tell())
+        self._file.write(RECORD.pack(flags, RESULTS.index(result), len(moves)))
+        if start is not None:
+            self._file.write(_pack_start(start))
+        self._file.write(pack_moves(moves))
+        return len(self._offsets) - 1
+
+    def add_record(self, record):
+        return self.add(record.moves, record.result, record.start)
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(b''.join(OFFSET.pack(offset) for offset in self._offsets))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(self._offsets), index_offset, 0))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveReader:
+    """Memory-mapped archive: len(), reader[k] and lazy iteration over GameRecords."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'{path}: empty file')
+        if len(self._data) < HEADER.size:
+            self.close()
+            raise ValueError(f'{path}: not a game archive')
+        magic, version, _, self._count, self._index, _ = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path}: not a version {VERSION} game archive')
+        if self._index + self._count * OFFSET.size > len(self._data):
+            self.close()
+            raise ValueError(f'{path}: truncated archive')
+
+    def __len__(self):
+        return self._count
+
+    def _locate(self, index):
+        # (result, plies, start, зміщення ходів) запису партії index
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('game index out of range')
+        data = self._data
+        offset, = OFFSET.unpack_from(data, self._index + index * OFFSET.size)
+        flags, result, plies = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        start = None
+        if flags & HAS_START:
+            start = _unpack_start(data, offset)
+            offset += PACKED_CELLS + START.size
+        return RESULTS[result], plies, start, offset
+
+    def __getitem__(self, index):
+        result, plies, start, offset = self._locate(index)
+        moves = unpack_moves(self._data[offset:offset + 3 * ((plies + 1) // 2)], plies)
+        return GameRecord(moves, result, start)
+
+    def packed(self, index):
+        """Game index as a PackedGame, without building a tuple per move as reader[index] does."""
+        result, plies, start, offset = self._locate(index)
+        raw = self._data[offset:offset + 3 * ((plies + 1) // 2)]
+        table = CODE_SQUARES
+        squares = b''.join(table[pair & 0xFFF] + table[pair >> 12]
+                           for pair in (int.from_bytes(raw[i:i + 3], 'little')
+                                        for i in range(0, len(raw), 3)))
+        return PackedGame(squares[:2 * plies], result, start)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self):
+        if getattr(self, '_data', None) is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_from_bridge(bridge, result=None):
+    """GameRecord of the game in a GameBridge: its start position and all moves played.
+
+    Without an explicit result it is taken from the bridge: the winner,
+    'draw' for a finished game without one, or None for a game in progress.
+    """
+    cells, player, captures = bridge.get_start_snapshot()
+    start = StartPosition(cells, player, captures)
+    if start == StartPosition(INITIAL_CELLS, 'black', {'black': 0, 'white': 0}):
+        start = None
+    if result is None:
+        result = bridge.get_winner() or ('draw' if bridge.is_game_over() else None)
+    return GameRecord(bridge.get_move_history(), result, start)
+
+
+def replay(bridge, record):
+    """Set the record's start position in the bridge and play its moves in one call."""
+    if record.start is None:
+        bridge.start_new_game()
+    elif not bridge.set_position(*record.start):
+        raise ValueError('Invalid start position')
+    played, _, _ = bridge.replay_moves(record.moves)
+    if played < len(record.moves):
+        from_pos, to_pos = record.moves[played]
+        raise ValueError(f'Illegal move at ply {played}: {from_pos} -> {to_pos}')
+
+
+def read_hsg(path):
+    """Parse a GameBridge.save_game file into a StartPosition (same format as Game::load)."""
+    with open(path, encoding='utf-8') as f:
+        content = f.readline().strip()
+    board, player, black, white = content.rsplit(';', 3)
+    symbols = {'E': EMPTY, 'B': BLACK, 'W': WHITE}
+    cells = bytes(symbols[ch] for ch in board if ch in symbols)
+    if len(cells) != BOARD_CELLS:
+        raise ValueError(f'{path}: expected {BOARD_CELLS} cells, got {len(cells)}')
+    return StartPosition(cells, 'black' if player == 'B' else 'white',
+                         {'black': int(black), 'white': int(white)})
+
+
+def import_hsg(paths, writer):
+    """Store each .hsg save as a game without moves that starts from the saved position."""
+    for path in paths:
+        writer.add([], start=read_hsg(path))
+    return len(paths)
+
+
+def verify(path):
+    """Replay every game through the game engine (create_bridge); returns (games, plies) checked."""
+    from .cpp_bridge import create_bridge
+
+    bridge = create_bridge()
+    games = plies = 0
+    with ArchiveReader(path) as reader:
+        for index, record in enumerate(reader):
+            try:
+                replay(bridge, record)
+            except ValueError as e:
+                raise ValueError(f'game {index}: {e}') from None
+            games += 1
+            plies += len(record.moves)
+    return games, plies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hasami Shogi game archive tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help='game count and totals')
+    info.add_argument('archive')
+    show = commands.add_parser('show', help='print one game')
+    show.add_argument('archive')
+    show.add_argument('index', type=int)
+    imp = commands.add_parser('import', help='create an archive from .hsg saves')
+    imp.add_argument('archive')
+    imp.add_argument('saves', nargs='+')
+    check = commands.add_parser('verify', help='replay all games through the engine')
+    check.add_argument('archive')
+    args = parser.parse_args(argv)
+
+    if args.command == 'info':
+        with ArchiveReader(args.archive) as reader:
+            results = {}
+            plies = 0
+            for record in reader:
+                results[record.result or 'unfinished'] = results.get(record.result or 'unfinished', 0) + 1
+                plies += len(record.moves)
+            print(f'{len(reader)} games, {plies} plies, results: {results}')
+    elif args.command == 'show':
+        with ArchiveReader(args.archive) as reader:
+            record = reader[args.index]
+        print(f"result: {record.result or 'unfinished'}, plies: {len(record.moves)}"
+              + (', custom start' if record.start else ''))
+        for ply, ((fr, fc), (tr, tc)) in enumerate(record.moves, 1):
+            print(f'{ply:4d}. ({fr},{fc}) -> ({tr},{tc})')
+    elif args.command == 'import':
+        with ArchiveWriter(args.archive) as writer:
+            count = import_hsg(args.saves, writer)
+        print(f'imported {count} saves into {args.archive}')
+    elif args.command == 'verify':
+        games, plies = verify(args.archive)
+        print(f'OK: {games} games, {plies} plies replay legally')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+# frontend/game_stats.py
+"""Aggregate statistics over game archives, computed in parallel chunks.
+
+Games are read lazily from memory-mapped archives (frontend.game_archive)
+and replayed with one GameBridge.replay_moves call each, which also gives
+the per-ply deltas and the number of legal moves before every ply. Work is
+split into chunks of consecutive games; at most max_pending chunks are in
+flight at once and each worker returns a small GameStats, so memory stays
+bounded however many games the archives hold.
+
+Collected: results, game length, capture timing (ply of every capture and
+of the first one), win rates per first move and the branching factor.
+Histograms use buckets of BUCKET plies keyed by their first ply.
+
+    python -m frontend.game_stats games.hsga more.hsga --workers 4 --json stats.json
+    python -m frontend.game_stats --verify
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .cpp_bridge import BOARD_SIZE, create_bridge
+from .game_archive import ArchiveReader, ArchiveWriter, import_hsg, record_from_bridge
+
+BUCKET = 10
+DEFAULT_CHUNK = 2000
+
+
+def _bucket(ply):
+    return ply - ply % BUCKET
+
+
+def _move_name(squares):
+    (fr, fc), (tr, tc) = divmod(squares[0], BOARD_SIZE), divmod(squares[1], BOARD_SIZE)
+    return f'({fr},{fc})->({tr},{tc})'
+
+
+class GameStats:
+    """Mergeable counters for a set of games; to_dict() gives the summary."""
+
+    def __init__(self):
+        self.games = 0
+        self.plies = 0
+        self.illegal = 0
+        self.results = Counter()
+        self.min_plies = None
+        self.max_plies = 0
+        self.lengths = Counter()
+        self.captures = 0
+        self.capture_plies = Counter()
+        self.first_capture = Counter()
+        self.no_capture_games = 0
+        self.first_moves = {}
+        self.branching_sum = 0
+        self.branching_plies = Counter()
+        self.branching_by_ply = Counter()
+
+    def add_game(self, result, first_move, deltas, branching):
+        """Count one replayed game.
+
+        Args:
+            result: 'black', 'white', 'draw' or None if unfinished
+            first_move: name of the first move, or None for a game without moves
+            deltas: MoveDelta of every ply played
+            branching: number of legal moves before every ply
+        """
+        plies = len(deltas)
+        self.games += 1
+        self.plies += plies
+        self.results[result or 'unfinished'] += 1
+        self.min_plies = plies if self.min_plies is None else min(self.min_plies, plies)
+        self.max_plies = max(self.max_plies, plies)
+        self.lengths[_bucket(plies)] += 1
+
+        first = None
+        for ply, delta in enumerate(deltas):
+            if delta.captured:
+                self.captures += len(delta.captured)
+                self.capture_plies[_bucket(ply)] += len(delta.captured)
+                if first is None:
+                    first = ply
+        if first is None:
+            self.no_capture_games += 1
+        else:
+            self.first_capture[_bucket(first)] += 1
+
+        if first_move is not None:
+            self.first_moves.setdefault(first_move, Counter())[result or 'unfinished'] += 1
+
+        for ply, count in enumerate(branching):
+            bucket = _bucket(ply)
+            self.branching_plies[bucket] += 1
+            self.branching_by_ply[bucket] += count
+        self.branching_sum += sum(branching)
+
+    def merge(self, other):
+        """Add the counters of another GameStats; returns self."""
+        self.games += other.games
+        self.plies += other.plies
+        self.illegal += other.illegal
+        self.results.update(other.results)
+        if other.min_plies is not None:
+            self.min_plies = (other.min_plies if self.min_plies is None
+                              else min(self.min_plies, other.min_plies))
+        self.max_plies = max(self.max_plies, other.max_plies)
+        self.lengths.update(other.lengths)
+        self.captures += other.captures
+        self.capture_plies.update(other.capture_plies)
+        self.first_capture.update(other.first_capture)
+        self.no_capture_games += other.no_capture_games
+        for move, results in other.first_moves.items():
+            self.first_moves.setdefault(move, Counter()).update(results)
+        self.branching_sum += other.branching_sum
+        self.branching_plies.update(other.branching_plies)
+        self.branching_by_ply.update(other.branching_by_ply)
+        return self
+
+    def to_dict(self):
+        games, plies = self.games, self.plies
+        first_moves = {}
+        for move, results in sorted(self.first_moves.items(), key=lambda item: -sum(item[1].values())):
+            count = sum(results.values())
+            first_moves[move] = {
+                'games': count,
+                'black': results['black'] / count,
+                'white': results['white'] / count,
+                'draw': results['draw'] / count,
+            }
+        return {
+            'games': games,
+            'plies': plies,
+            'illegal_games': self.illegal,
+            'results': dict(self.results),
+            'length': {
+                'mean': plies / games if games else 0.0,
+                'min': self.min_plies or 0,
+                'max': self.max_plies,
+                'histogram': dict(sorted(self.lengths.items())),
+            },
+            'captures': {
+                'total': self.captures,
+                'per_game': self.captures / games if games else 0.0,
+                'by_ply': dict(sorted(self.capture_plies.items())),
+                'first_capture_by_ply': dict(sorted(self.first_capture.items())),
+                'games_without_capture': self.no_capture_games,
+            },
+            'first_moves': first_moves,
+            'branching': {
+                'mean': self.branching_sum / plies if plies else 0.0,
+                'by_ply': {bucket: self.branching_by_ply[bucket] / count
+                           for bucket, count in sorted(self.branching_plies.items())},
+            },
+        }
+
+
+def iter_chunks(paths, chunk_size=DEFAULT_CHUNK):
+    """Lazily yield (path, start, stop) ranges of at most chunk_size games per archive."""
+    for path in paths:
+        with ArchiveReader(path) as reader:
+            count = len(reader)
+        for start in range(0, count, chunk_size):
+            yield path, start, min(start + chunk_size, count)
+
+
+def analyze_chunk(task, engine=None):
+    """GameStats of games start..stop of one archive, replayed on one bridge."""
+    path, start, stop = task
+    stats = GameStats()
+    bridge = create_bridge(engine)
+    with ArchiveReader(path) as reader:
+        for index in range(start, stop):
+            game = reader.packed(index)
+            if game.start is None:
+                bridge.start_new_game()
+            elif not bridge.set_position(*game.start):
+                stats.illegal += 1
+                continue
+            played, deltas, branching = bridge.replay_moves(game.squares, deltas=True, branching=True)
+            if 2 * played < len(game.squares):
+                # Пошкоджена партія не змішується з рештою статистики
+                stats.illegal += 1
+                continue
+            stats.add_game(game.result, _move_name(game.squares) if game.squares else None,
+                           deltas, branching)
+    return stats
+
+
+def analyze(paths, workers=None, chunk_size=DEFAULT_CHUNK, max_pending=None, engine=None,
+            progress=None):
+    """GameStats of all games in the archives.
+
+    Args:
+        paths: archive files
+        workers: worker processes (default: CPU count); 1 analyzes in this process
+        chunk_size: games per task
+        max_pending: chunks in flight at once (default: 2 * workers)
+        engine: 'native', 'python' or None for create_bridge's default
+        progress: optional callable(games done) after every chunk
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_chunks(paths, chunk_size)
+    total = GameStats()
+    if workers == 1:
+        for task in chunks:
+            total.merge(analyze_chunk(task, engine))
+            if progress is not None:
+                progress(total.games + total.illegal)
+        return total
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for task in chunks:
+            pending.add(executor.submit(analyze_chunk, task, engine))
+            if len(pending) < max_pending:
+                continue
+            # Нові частини подаються лише після завершення старих - черга не росте
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                total.merge(future.result())
+            if progress is not None:
+                progress(total.games + total.illegal)
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def verify_engines(games=20, plies=120, seed=0):
+    """Differential test: the same archive analyzed on the native and the Python engine.
+
+    The archive holds random games plus an imported .hsg save, i.e. a game
+    without moves from a custom start position. Raises AssertionError if
+    the statistics differ or a game is skipped; returns the games checked.
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'verify.hsga')
+        bridge = create_bridge('native')
+        with ArchiveWriter(path) as writer:
+            for _ in range(games):
+                bridge.start_new_game()
+                for _ in range(rng.randrange(plies)):
+                    moves = bridge.get_all_legal_moves()
+                    if bridge.is_game_over() or not moves:
+                        break
+                    bridge.make_move(*rng.choice(moves))
+                writer.add_record(record_from_bridge(bridge))
+            save = os.path.join(tmpdir, 'save.hsg')
+            bridge.save_game(save)
+            import_hsg([save], writer)
+        total = games + 1
+        native = analyze_chunk((path, 0, total), 'native').to_dict()
+        python = analyze_chunk((path, 0, total), 'python').to_dict()
+    assert native['games'] == total and native['illegal_games'] == 0, f'skipped games: {native}'
+    assert native == python, 'native and Python statistics differ'
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Statistics over Hasami Shogi game archives')
+    parser.add_argument('archives', nargs='*')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help='games per task')
+    parser.add_argument('--engine', choices=('native', 'python'),
+                        help='game engine for replay (default: HASAMI_ENGINE or auto)')
+    parser.add_argument('--json', help='write the full statistics to this JSON file')
+    parser.add_argument('--verify', action='store_true',
+                        help='differential test of the native and Python engines')
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        games = verify_engines()
+        print(f'OK: {games} games give the same statistics on both engines')
+        if not args.archives:
+            return
+    elif not args.archives:
+        parser.error('no archives given')
+
+    start = time.perf_counter()
+    summary = analyze(args.archives, args.workers, args.chunk, engine=args.engine).to_dict()
+    elapsed = time.perf_counter() - start
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    games = summary['games']
+    length, captures = summary['length'], summary['captures']
+    print(f"{games} games, {summary['plies']} plies in {elapsed:.1f}s "
+          f"({games / elapsed if elapsed > 0 else 0.0:.0f} games/s), "
+          f"{summary['illegal_games']} skipped as illegal")
+    print(f"results: {summary['results']}")
+    print(f"length: mean {length['mean']:.1f}, min {length['min']}, max {length['max']}")
+    print(f"captures: {captures['per_game']:.2f} per game, "
+          f"{captures['games_without_capture']} games without any")
+    print(f"branching: mean {summary['branching']['mean']:.1f} legal moves per ply")
+    for move, entry in list(summary['first_moves'].items())[:10]:
+        print(f"  {move}: {entry['games']} games, black {entry['black']:.1%}, "
+              f"white {entry['white']:.1%}, draw {entry['draw']:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,18 @@
+import logging
+
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtGui import QPainter, QColor, QPen, QBrush
-from PyQt5.QtCore import Qt, QPoint, QSize, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QPen, QBrush, QPixmap
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, pyqtSignal
+
+logger = logging.getLogger(__name__)
 
 class BoardView(QWidget):
     move_made = pyqtSignal(tuple, tuple)  # Сигнал для ходу
     valid_moves_requested = pyqtSignal(tuple)  # Сигнал для запиту можливих ходів
 
+    # Рамка виділення (перо 2px) виходить за межі клітинки, тому брудна область ширша
+    DIRTY_PADDING = 2
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.board_size = 9
@@ -14,136 +21,268 @@ class BoardView(QWidget):
         self.selected_cell = None
         self.valid_moves = []
         self.board_state = None
+        # Вимикається, поки рушій думає над ходом комп'ютера
+        self.input_enabled = True
+        # Теплова карта загроз: 9x9 пар (загроза фігурі 0/1, скільки фігур суперника
+        # можуть стати на порожню клітинку) або None, якщо накладку вимкнено
+        self.heatmap = None
+        # Кеш фону з сіткою (перемальовується лише при зміні розміру)
+        # і спрайтів фігур за ключем (колір, розмір клітинки)
+        self._background = None
+        self._sprites = {}
         self.setMinimumSize(self.calculate_size())
 
     def calculate_size(self):
         width = height = 2 * self.margin + self.board_size * self.cell_size
         return QSize(width, height)
-        
+
+    def cell_rect(self, row, col):
+        return QRect(self.margin + col * self.cell_size,
+                     self.margin + row * self.cell_size,
+                     self.cell_size, self.cell_size)
+
+    def update_cells(self, cells):
+        """Schedule a repaint of only the given (row, col) cells."""
+        pad = self.DIRTY_PADDING
+        for row, col in cells:
+            self.update(self.cell_rect(row, col).adjusted(-pad, -pad, pad, pad))
+
+    def resizeEvent(self, event):
+        self._background = None
+        super().resizeEvent(event)
+
+    def background_pixmap(self):
+        if self._background is None or self._background.size() != self.size():
+            pixmap = QPixmap(self.size())
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self.draw_board(painter, pixmap.rect())
+            self.draw_grid(painter)
+            painter.end()
+            self._background = pixmap
+        return self._background
+
+    def piece_sprite(self, piece):
+        key = (piece, self.cell_size)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = QPixmap(self.cell_size, self.cell_size)
+            sprite.fill(Qt.transparent)
+            painter = QPainter(sprite)
+            painter.setRenderHint(QPainter.Antialiasing)
+            center = QPoint(self.cell_size // 2, self.cell_size // 2)
+            radius = self.cell_size // 2 - 5
+
+            if piece == 'B':
+                color = Qt.black
+                painter.setPen(Qt.NoPen)
+            else:  # piece == 'W'
+                color = Qt.white
+                painter.setPen(QPen(Qt.black, 2))
+
+            painter.setBrush(QBrush(color))
+            painter.drawEllipse(center, radius, radius)
+            painter.end()
+            self._sprites[key] = sprite
+        return sprite
+
+    def cells_in(self, rect):
+        """(row, col) cells that intersect rect, in row-major order."""
+        first_col = max(0, (rect.left() - self.margin) // self.cell_size)
+        last_col = min(self.board_size - 1, (rect.right() - self.margin) // self.cell_size)
+        first_row = max(0, (rect.top() - self.margin) // self.cell_size)
+        last_row = min(self.board_size - 1, (rect.bottom() - self.margin) // self.cell_size)
+        return [(row, col)
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)]
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Малюємо дошку
-        self.draw_board(painter)
-        self.draw_grid(painter)
-        
-        # Малюємо можливі ходи під фігурами
+        dirty = event.rect()
+
+        # Фон і сітка - з кешу, лише в межах брудної області
+        painter.drawPixmap(dirty, self.background_pixmap(), dirty)
+        cells = self.cells_in(dirty)
+
+        # Теплова карта і можливі ходи - під фігурами
+        if self.heatmap:
+            self.draw_heatmap(painter, cells)
+
         if self.valid_moves:
-            self.draw_valid_moves(painter)
-        
+            self.draw_valid_moves(painter, cells)
+
         # Малюємо фігури
         if self.board_state:
-            self.draw_pieces(painter)
-            
+            self.draw_pieces(painter, cells)
+
         # Малюємо виділення вибраної клітинки
         if self.selected_cell:
             self.draw_selection(painter)
-        
-    def draw_board(self, painter):
-        board_rect = self.rect()
-        painter.fillRect(board_rect, QColor(222, 184, 135))
-        
+
+    def draw_board(self, painter, rect):
+        painter.fillRect(rect, QColor(222, 184, 135))
+
     def draw_grid(self, painter):
         pen = QPen(Qt.black, 1)
         painter.setPen(pen)
-        
+
         for i in range(self.board_size + 1):
             # Вертикальні лінії
             x = self.margin + i * self.cell_size
             painter.drawLine(x, self.margin,
                            x, self.margin + self.board_size * self.cell_size)
-            
+
             # Горизонтальні лінії
             y = self.margin + i * self.cell_size
             painter.drawLine(self.margin, y,
                            self.margin + self.board_size * self.cell_size, y)
-                           
-    def draw_pieces(self, painter):
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                piece = self.board_state[row][col]
-                if piece and piece != 'E':  # Малюємо тільки якщо не порожня клітинка
-                    x = self.margin + col * self.cell_size + self.cell_size // 2
-                    y = self.margin + row * self.cell_size + self.cell_size // 2
-                    radius = self.cell_size // 2 - 5
-
-                    if piece == 'B':
-                        color = Qt.black
-                        painter.setPen(Qt.NoPen)
-                    else:  # piece == 'W'
-                        color = Qt.white
-                        painter.setPen(QPen(Qt.black, 2))
-
-                    painter.setBrush(QBrush(color))
-                    painter.drawEllipse(QPoint(x, y), radius, radius)
+
+    def draw_pieces(self, painter, cells):
+        for row, col in cells:
+            piece = self.board_state[row][col]
+            if piece and piece != 'E':  # Малюємо тільки якщо не порожня клітинка
+                painter.drawPixmap(self.cell_rect(row, col).topLeft(), self.piece_sprite(piece))
 
     def draw_selection(self, painter):
         row, col = self.selected_cell
-        x = self.margin + col * self.cell_size
-        y = self.margin + row * self.cell_size
-        
+
         pen = QPen(QColor(255, 0, 0))  # Червоний колір для виділення
         pen.setWidth(2)
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
-        painter.drawRect(x, y, self.cell_size, self.cell_size)
-                    
+        painter.drawRect(self.cell_rect(row, col))
+
     def update_board(self, board_state):
-        print("Updating board state")  # Debug print
+        logger.debug("Updating board state")
+        dirty = set(self.valid_moves)
+        if self.selected_cell:
+            dirty.add(self.selected_cell)
         if board_state is not None:
-            self.board_state = board_state
+            if self.board_state is None:
+                dirty = None
+            else:
+                dirty.update((row, col)
+                             for row in range(self.board_size)
+                             for col in range(self.board_size)
+                             if self.board_state[row][col] != board_state[row][col])
+            self.board_state = [list(row) for row in board_state]
+        self.selected_cell = None
+        self.valid_moves = []
+        if dirty is None:
+            self.update()
+        else:
+            self.update_cells(dirty)
+
+    def apply_move_delta(self, delta):
+        """Apply a MoveDelta in place and repaint only the cells it touched."""
+        if self.board_state is None:
+            return
+        dirty = set(self.valid_moves)
+        if self.selected_cell:
+            dirty.add(self.selected_cell)
+        (fr, fc), (tr, tc) = delta.from_pos, delta.to_pos
+        self.board_state[fr][fc] = 'E'
+        self.board_state[tr][tc] = delta.piece
+        for row, col in delta.captured:
+            self.board_state[row][col] = 'E'
+        dirty.update([delta.from_pos, delta.to_pos])
+        dirty.update(delta.captured)
         self.selected_cell = None
         self.valid_moves = []
-        self.update()
+        self.update_cells(dirty)
+
+    def set_input_enabled(self, enabled):
+        self.input_enabled = enabled
+        if not enabled and self.selected_cell is not None:
+            dirty = [self.selected_cell] + self.valid_moves
+            self.selected_cell = None
+            self.valid_moves = []
+            self.update_cells(dirty)
 
     def mousePressEvent(self, event):
-        if not self.board_state:
+        if not self.board_state or not self.input_enabled:
             return
-            
+
         x = event.x() - self.margin
         y = event.y() - self.margin
-        
+
         if x >= 0 and y >= 0:
             col = x // self.cell_size
             row = y // self.cell_size
-            
+
             if col < self.board_size and row < self.board_size:
-                print(f"Clicked cell: ({row}, {col})")  # Debug print
+                logger.debug("Clicked cell: (%d, %d)", row, col)
                 if self.selected_cell is None:
                     # Перевіряємо, чи є фігура в клітинці
                     if self.board_state[row][col] not in ['E', None]:
                         self.selected_cell = (row, col)
-                        print(f"Selected cell: {self.selected_cell}")  # Debug print
-                        print("Emitting valid_moves_requested signal")  # Debug print
+                        logger.debug("Selected cell: %s", self.selected_cell)
                         self.valid_moves_requested.emit((row, col))
-                        self.update()
+                        self.update_cells([self.selected_cell])
                 else:
                     # Спроба зробити хід
                     from_pos = self.selected_cell
                     to_pos = (row, col)
-                    print(f"Attempting move from {from_pos} to {to_pos}")  # Debug print
-                    print(f"Valid moves: {self.valid_moves}")  # Debug print
+                    logger.debug("Attempting move from %s to %s", from_pos, to_pos)
+                    dirty = [from_pos] + self.valid_moves
                     if to_pos in self.valid_moves:
                         self.move_made.emit(from_pos, to_pos)
                     else:
-                        print("Invalid move: destination not in valid moves")  # Debug print
+                        logger.debug("Invalid move: %s not in valid moves %s", to_pos, self.valid_moves)
                     self.selected_cell = None
                     self.valid_moves = []
-                    self.update()
+                    self.update_cells(dirty)
 
-    def draw_valid_moves(self, painter):
-        print(f"Drawing valid moves: {self.valid_moves}")  # Debug print
+    def draw_valid_moves(self, painter, cells):
         highlight_color = QColor(0, 255, 0, 80)
         painter.setBrush(QBrush(highlight_color))
         painter.setPen(Qt.NoPen)
-        
+
+        visible = set(cells)
         for row, col in self.valid_moves:
-            x = self.margin + col * self.cell_size
-            y = self.margin + row * self.cell_size
-            painter.drawRect(x, y, self.cell_size, self.cell_size)
+            if (row, col) in visible:
+                painter.drawRect(self.cell_rect(row, col))
+
+    def draw_heatmap(self, painter, cells):
+        painter.setPen(Qt.NoPen)
+        for row, col in cells:
+            threatened, reach = self.heatmap[row][col]
+            if threatened:
+                painter.setBrush(QBrush(QColor(220, 0, 0, 120)))
+            elif reach:
+                painter.setBrush(QBrush(QColor(255, 140, 0, min(40 * reach, 160))))
+            else:
+                continue
+            painter.drawRect(self.cell_rect(row, col))
+
+    def set_heatmap(self, threats, reach):
+        """Show the threat overlay, or hide it when threats is None.
+
+        threats[row][col] is 1 for a piece the opponent can capture next
+        move; reach[row][col] is how many opposing pieces can move to an
+        empty cell. Only cells whose values changed are repainted.
+        """
+        old = self.heatmap
+        if threats is None:
+            self.heatmap = None
+        else:
+            self.heatmap = [[(threats[row][col], reach[row][col]) for col in range(self.board_size)]
+                            for row in range(self.board_size)]
+        if old is None or self.heatmap is None:
+            if old is not self.heatmap:
+                self.update()
+            return
+        self.update_cells((row, col)
+                          for row in range(self.board_size)
+                          for col in range(self.board_size)
+                          if old[row][col] != self.heatmap[row][col])
 
     def set_valid_moves(self, moves):
-        print(f"Setting valid moves: {moves}")  # Debug print
-        self.valid_moves = moves if moves else []
-        self.update()
\ No newline at end of file
+        logger.debug("Setting valid moves: %s", moves)
+        moves = moves if moves else []
+        dirty = set(self.valid_moves).symmetric_difference(moves)
+        if self.selected_cell:
+            dirty.add(self.selected_cell)
+        self.valid_moves = moves
+        self.update_cells(dirty)
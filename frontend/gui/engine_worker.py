@@ -0,0 +1,140 @@
+# frontend/gui/engine_worker.py
+"""Engine searches on a background QThread so the GUI thread never blocks.
+
+EngineService lives on the GUI thread. request_search() snapshots the game
+(GameBridge.clone) and queues it to EngineWorker. The worker runs on its
+own QThread with a persistent engine GameBridge, so the transposition
+table stays warm between moves. Progress and results come back as Qt
+signals, which are delivered on the GUI thread.
+
+The native search releases the GIL and polls an atomic stop flag, so
+cancel() and move_now() take effect within a few milliseconds.
+"""
+import itertools
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+class SearchRequest:
+    __slots__ = ('id', 'game', 'depth', 'time_ms', 'cancelled', 'stopped')
+
+    def __init__(self, request_id, game, depth, time_ms):
+        self.id = request_id
+        self.game = game
+        self.depth = depth
+        self.time_ms = time_ms
+        self.cancelled = threading.Event()
+        # Move Now, що прийшов, поки запит ще чекав у черзі
+        self.stopped = threading.Event()
+
+
+class EngineWorker(QObject):
+    """Runs SearchRequests on the engine thread."""
+
+    progress = pyqtSignal(int, object)   # request id, search dict so far
+    finished = pyqtSignal(int, object)   # request id, search dict or None if cancelled
+
+    def __init__(self):
+        super().__init__()
+        self.engine = None
+        self._lock = threading.Lock()
+        self._current = None
+
+    @pyqtSlot(object)
+    def search(self, request):
+        if self.engine is None:
+            # Рушій того самого типу, що й знімок: copy_from працює лише між однаковими
+            self.engine = type(request.game)()
+        # Скидаємо прапорець до того, як запит стане поточним: зупинка, що прийде
+        # пізніше, виставить його знову, а раніша записана в request.stopped
+        self.engine.clear_search_stop()
+        with self._lock:
+            self._current = request
+            if request.stopped.is_set():
+                self.engine.stop_search()
+        result = None
+        if not request.cancelled.is_set():
+            self.engine.copy_from(request.game)
+            try:
+                result = self.engine.search_best_move(
+                    request.depth, request.time_ms,
+                    lambda info: self.progress.emit(request.id, info))
+            except Exception:
+                logger.exception("Engine search failed")
+        with self._lock:
+            self._current = None
+        self.finished.emit(request.id, None if request.cancelled.is_set() else result)
+
+    def stop(self, request, discard):
+        """Stop request (from any thread); discard drops its result."""
+        if discard:
+            request.cancelled.set()
+        with self._lock:
+            request.stopped.set()
+            if self._current is request:
+                self.engine.stop_search()
+
+
+class EngineService(QObject):
+    """GUI-side handle to the engine thread: one active search at a time."""
+
+    progress = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    _submit = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._active = None
+        self._thread = QThread()
+        self._thread.setObjectName('engine')
+        self._worker = EngineWorker()
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.search)
+        self._worker.progress.connect(self._on_progress)
+        self._worker.finished.connect(self._on_finished)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        return self._active is not None
+
+    def request_search(self, bridge, depth, time_ms):
+        """Search the current position of bridge in the background; returns the request id.
+
+        Any search still running is cancelled first.
+        """
+        self.cancel()
+        request = SearchRequest(next(self._ids), bridge.clone(), depth, time_ms)
+        self._active = request
+        self._submit.emit(request)
+        return request.id
+
+    def cancel(self):
+        """Abort the active search; its finished signal carries None."""
+        if self._active is not None:
+            self._worker.stop(self._active, discard=True)
+            self._active = None
+
+    def move_now(self):
+        """Stop the active search early and deliver its best move so far."""
+        if self._active is not None:
+            self._worker.stop(self._active, discard=False)
+
+    def shutdown(self):
+        self.cancel()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _on_progress(self, request_id, info):
+        if self._active is not None and self._active.id == request_id:
+            self.progress.emit(request_id, info)
+
+    def _on_finished(self, request_id, result):
+        if self._active is not None and self._active.id == request_id:
+            self._active = None
+        self.finished.emit(request_id, result)
@@ -1,14 +1,31 @@
+import logging
+
 from PyQt5.QtWidgets import (QMainWindow, QAction, QMessageBox, QFileDialog, QLabel,
                              QVBoxLayout, QPushButton, QWidget, QHBoxLayout)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from .board_view import BoardView
+from .engine_worker import EngineService
 from ..controllers.game_controller import GameController
 
+logger = logging.getLogger(__name__)
+
 class MainWindow(QMainWindow):
+    # Обмеження пошуку для ходу комп'ютера: глибина - верхня межа, зупиняє час
+    ENGINE_DEPTH = 32
+    ENGINE_TIME_MS = 2000
+
     def __init__(self):
         super().__init__()
         self.game_controller = GameController()
+        # Кольори, за які грає комп'ютер; пошук іде в окремому потоці
+        self.computer_sides = set()
+        self.engine = EngineService(self)
+        self.engine.progress.connect(self.on_engine_progress)
+        self.engine.finished.connect(self.on_engine_finished)
+        self.engine_request = None
+        self.engine_position = None
         self.init_ui()
+        self.game_controller.add_move_listener(self.on_move_applied)
 
     def init_ui(self):
         self.setWindowTitle('Хасамі Шогі')
@@ -37,15 +54,15 @@ class MainWindow(QMainWindow):
         self.status_bar = self.statusBar()
         self.player_label = QLabel("Поточний гравець: Чорний")
         self.status_bar.addWidget(self.player_label)
+        self.engine_label = QLabel()
+        self.status_bar.addPermanentWidget(self.engine_label)
 
         self.create_menu()
         self.update_board_state()
 
 
     def handle_valid_moves_request(self, position):
-        print(f"MainWindow: Handling valid moves request for position: {position}")  # Debug print
         valid_moves = self.game_controller.get_valid_moves(position)
-        print(f"MainWindow: Got valid moves: {valid_moves}")  # Debug print
         self.board_view.set_valid_moves(valid_moves)
 
     
@@ -66,12 +83,9 @@ class MainWindow(QMainWindow):
         return side_layout
 
     def handle_move(self, from_pos, to_pos):
-        print(f"MainWindow: Handling move from {from_pos} to {to_pos}")  # Debug print
-        if self.game_controller.make_move(from_pos, to_pos):
-            self.update_board_state()
-            # Перевіряємо чи гра закінчилась після ходу
-            self.check_game_over()
-        else:
+        logger.debug("Handling move from %s to %s", from_pos, to_pos)
+        # Дошку і статус оновлює on_move_applied з дельти ходу
+        if not self.game_controller.make_move(from_pos, to_pos):
             self.status_bar.showMessage('Invalid move!', 2000)
 
     def create_menu(self):
@@ -95,6 +109,42 @@ class MainWindow(QMainWindow):
 
         file_menu.addSeparator()
 
+        edit_menu = menu_bar.addMenu('Edit')
+
+        self.undo_action = QAction('Undo', self)
+        self.undo_action.setShortcut('Ctrl+Z')
+        self.undo_action.triggered.connect(self.undo_move)
+        edit_menu.addAction(self.undo_action)
+
+        self.redo_action = QAction('Redo', self)
+        self.redo_action.setShortcut('Ctrl+Y')
+        self.redo_action.triggered.connect(self.redo_move)
+        edit_menu.addAction(self.redo_action)
+
+        engine_menu = menu_bar.addMenu('Engine')
+
+        self.computer_actions = {}
+        for side, title in (('black', 'Computer plays Black'), ('white', 'Computer plays White')):
+            action = QAction(title, self)
+            action.setCheckable(True)
+            action.toggled.connect(lambda checked, side=side: self.set_computer_side(side, checked))
+            engine_menu.addAction(action)
+            self.computer_actions[side] = action
+
+        self.move_now_action = QAction('Move Now', self)
+        self.move_now_action.setShortcut('Ctrl+M')
+        self.move_now_action.triggered.connect(self.engine.move_now)
+        self.move_now_action.setEnabled(False)
+        engine_menu.addAction(self.move_now_action)
+
+        view_menu = menu_bar.addMenu('View')
+
+        self.heatmap_action = QAction('Threat Map', self)
+        self.heatmap_action.setShortcut('Ctrl+T')
+        self.heatmap_action.setCheckable(True)
+        self.heatmap_action.toggled.connect(self.refresh_heatmap)
+        view_menu.addAction(self.heatmap_action)
+
         help_menu = menu_bar.addMenu('Help')
 
         rules_action = QAction('Rulet', self)
@@ -117,8 +167,36 @@ class MainWindow(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No,
                                    QMessageBox.No)
         if reply == QMessageBox.Yes:
+            self.cancel_engine()
             self.game_controller.start_new_game()
             self.update_board_state()
+            self.schedule_engine_move()
+
+    def _step_over_computer_turns(self, step):
+        # Проти комп'ютера відкат/повтор доходить до ходу людини, інакше рушій
+        # одразу зіграв би той самий хід знову
+        if len(self.computer_sides) == 1:
+            while (self.game_controller.get_current_player() in self.computer_sides
+                   and step()):
+                pass
+
+    def undo_move(self):
+        self.cancel_engine()
+        if self.game_controller.undo_move():
+            self._step_over_computer_turns(self.game_controller.undo_move)
+            self.update_board_state()
+            self.schedule_engine_move()
+        else:
+            self.status_bar.showMessage('Nothing to undo', 2000)
+
+    def redo_move(self):
+        self.cancel_engine()
+        if self.game_controller.redo_move():
+            self._step_over_computer_turns(self.game_controller.redo_move)
+            self.update_board_state()
+            self.schedule_engine_move()
+        else:
+            self.status_bar.showMessage('Nothing to redo', 2000)
 
     def save_game(self):
         filename, _ = QFileDialog.getSaveFileName(self,
@@ -135,9 +213,11 @@ class MainWindow(QMainWindow):
                                                 'saves/',
                                                 'Hasami Shogi Save (*.hsg)')
         if filename:
+            self.cancel_engine()
             if self.game_controller.load_game(filename):
                 self.update_board_state()
                 self.status_bar.showMessage('Game loaded successfully', 2000)
+                self.schedule_engine_move()
             else:
                 QMessageBox.warning(self, 'Error', 'Failed to load game')
 
@@ -149,28 +229,56 @@ class MainWindow(QMainWindow):
         about_text = "Hasami Shogi v1.0\nCreated as a coursework project"
         QMessageBox.about(self, 'About', about_text)
 
+    def on_move_applied(self, delta):
+        """Move listener: patch the board and status from the MoveDelta, no re-fetch."""
+        self.board_view.apply_move_delta(delta)
+        self.refresh_heatmap()
+        self.show_status(delta.current_player, delta.captures)
+        self.undo_action.setEnabled(True)
+        self.redo_action.setEnabled(False)
+        if delta.game_over:
+            self.check_game_over()
+        self.schedule_engine_move()
+
     def update_board_state(self):
         board_state = self.game_controller.get_board_state()
         self.board_view.update_board(board_state)
+        self.refresh_heatmap()
         self.update_status()
 
+    def refresh_heatmap(self):
+        """Redraw the threat overlay from the engine's board maps, or hide it."""
+        if not self.heatmap_action.isChecked():
+            self.board_view.set_heatmap(None, None)
+            return
+        maps = self.game_controller.get_board_maps()
+        # Порожні клітинки - куди може стати суперник того, хто зараз ходить
+        opponent = 'white' if self.game_controller.get_current_player() == 'black' else 'black'
+        self.board_view.set_heatmap(maps['threats'].tolist(), maps['reach'][opponent].tolist())
+
     def update_status(self):
         current_player = self.game_controller.get_current_player()
         captures = self.game_controller.get_captures()
-        status = f"Current Player: {current_player.capitalize()} | "
-        status += f"Captures - Black: {captures['black']}, White: {captures['white']}"
-        self.player_label.setText(status)
+        self.show_status(current_player, captures)
+        self.undo_action.setEnabled(self.game_controller.can_undo())
+        self.redo_action.setEnabled(self.game_controller.can_redo())
         
         # Перевіряємо стан гри при кожному оновленні статусу
         if self.game_controller.is_game_over():
             self.check_game_over()
 
+    def show_status(self, current_player, captures):
+        status = f"Current Player: {current_player.capitalize()} | "
+        status += f"Captures - Black: {captures['black']}, White: {captures['white']}"
+        self.player_label.setText(status)
+
     def check_game_over(self):
         if self.game_controller.is_game_over():
             captures = self.game_controller.get_captures()
-            winner = "Black" if captures['white'] >= 9 else "White"
+            winner = self.game_controller.get_winner()
+            result = f'{winner} wins!' if winner else 'Draw by repetition!'
             QMessageBox.information(self, 'Game Over', 
-                                  f'Game Over! {winner} wins!\n\n'
+                                  f'Game Over! {result}\n\n'
                                   f'Captures:\n'
                                   f'Black captured: {captures["black"]} pieces\n'
                                   f'White captured: {captures["white"]} pieces')
@@ -180,4 +288,68 @@ class MainWindow(QMainWindow):
                                        QMessageBox.Yes | QMessageBox.No,
                                        QMessageBox.Yes)
             if reply == QMessageBox.Yes:
-                self.new_game()
\ No newline at end of file
+                self.new_game()
+
+    def set_computer_side(self, side, enabled):
+        if enabled:
+            self.computer_sides.add(side)
+        else:
+            self.computer_sides.discard(side)
+            if self.game_controller.get_current_player() == side:
+                self.cancel_engine()
+        self.schedule_engine_move()
+
+    def schedule_engine_move(self):
+        # Через чергу подій: спершу домалювати дошку й закрити діалоги
+        QTimer.singleShot(0, self.start_engine_move)
+
+    def start_engine_move(self):
+        """Start a background search if the computer is to move and none is running."""
+        if self.engine_request is not None:
+            return
+        if (self.game_controller.get_current_player() not in self.computer_sides
+                or self.game_controller.is_game_over()):
+            return
+        self.engine_position = self.game_controller.get_position_hash()
+        self.engine_request = self.engine.request_search(
+            self.game_controller.game_bridge, self.ENGINE_DEPTH, self.ENGINE_TIME_MS)
+        self.board_view.set_input_enabled(False)
+        self.move_now_action.setEnabled(True)
+        self.engine_label.setText('Engine thinking...')
+
+    def cancel_engine(self):
+        if self.engine_request is not None:
+            self.engine.cancel()
+            self._engine_idle()
+
+    def _engine_idle(self):
+        self.engine_request = None
+        self.board_view.set_input_enabled(True)
+        self.move_now_action.setEnabled(False)
+
+    def on_engine_progress(self, request_id, info):
+        if request_id != self.engine_request or info['move'] is None:
+            return
+        (fr, fc), (tr, tc) = info['move']
+        self.engine_label.setText(
+            f"Engine: depth {info['depth']}, nodes {info['nodes']:,}, "
+            f"best ({fr},{fc})->({tr},{tc}), score {info['score']}")
+
+    def on_engine_finished(self, request_id, result):
+        if request_id != self.engine_request:
+            return
+        self._engine_idle()
+        # Позиція могла змінитися, поки рушій думав (відкат, нова гра)
+        if (result is None or result['move'] is None
+                or self.game_controller.get_position_hash() != self.engine_position):
+            self.engine_label.clear()
+            return
+        self.engine_label.setText(
+            f"Engine: depth {result['depth']}, nodes {result['nodes']:,}, "
+            f"{result['time_ms']} ms, score {result['score']}")
+        if not self.game_controller.make_move(*result['move']):
+            logger.warning("Engine returned an illegal move %s", result['move'])
+
+    def closeEvent(self, event):
+        self.engine.shutdown()
+        super().closeEvent(event)
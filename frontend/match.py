@@ -0,0 +1,256 @@
+# frontend/match.py
+"""Headless engine-vs-engine match runner.
+
+Plays N games between two players through GameController/GameBridge,
+spreading games over a process pool, and writes one JSON line per game.
+
+Usage:
+    python -m frontend.match --games 200 --player-a greedy --player-b random \
+        --workers 8 --seed 1 --output results.jsonl --archive games.hsga
+
+Player specs:
+    random                  uniformly random legal move
+    greedy                  move capturing the most pieces, random tie-break
+    engine[:depth=4,ms=100] native alpha-beta search
+    engine:book=book.hspi   the same, playing position-index book moves first
+    engine:tb=endgame.hstb  the same, playing perfect endgame moves from tablebases
+    mcts[:ms=100,threads=1,playouts=0,batch=1]
+                            native parallel Monte Carlo tree search
+    package.module:function any callable policy(controller, rng) -> (from_pos, to_pos)
+"""
+import argparse
+import functools
+import importlib
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .controllers.game_controller import GameController
+from .game_archive import ArchiveWriter
+
+
+def random_player(controller, rng):
+    moves = controller.get_all_legal_moves()
+    return rng.choice(moves) if moves else None
+
+
+def greedy_capture_player(controller, rng):
+    """Pick the move that captures the most pieces (make/undo per candidate).
+
+    Candidates are tried on game_bridge directly; every make is undone, so
+    the controller's legal-move cache stays valid.
+    """
+    bridge = controller.game_bridge
+    moves = controller.get_all_legal_moves()
+    if not moves:
+        return None
+    side = bridge.get_current_player()
+    before = bridge.get_captures()[side]
+    best_gain, best_moves = -1, []
+    for from_pos, to_pos in moves:
+        bridge.make_move(from_pos, to_pos)
+        gain = bridge.get_captures()[side] - before
+        bridge.undo_move()
+        if gain > best_gain:
+            best_gain, best_moves = gain, [(from_pos, to_pos)]
+        elif gain == best_gain:
+            best_moves.append((from_pos, to_pos))
+    return rng.choice(best_moves)
+
+
+def engine_player(controller, rng, depth=4, time_ms=100, book=None, tablebase=None):
+    if tablebase is not None:
+        if controller.tablebase is None or controller.tablebase.path != tablebase:
+            controller.open_tablebase(tablebase)
+        found = controller.tablebase_move()
+        if found is not None:
+            return found[0]
+    if book is not None:
+        if controller.book is None or controller.book.path != book:
+            controller.open_book(book)
+        move = controller.book_move(rng)
+        if move is not None:
+            return move
+    return controller.search_best_move(depth, time_ms)['move']
+
+
+def mcts_player(controller, rng, time_ms=100, playouts=0, threads=1, batch=1):
+    return controller.mcts_search(time_ms, playouts, threads, batch)['move']
+
+
+def make_player(spec):
+    """Build a policy callable from a player spec string (see module docstring)."""
+    name, _, args = spec.partition(':')
+    if name == 'random':
+        return random_player
+    if name == 'greedy':
+        return greedy_capture_player
+    if name == 'engine':
+        options = dict(item.split('=', 1) for item in args.split(',') if item)
+        return functools.partial(engine_player,
+                                 depth=int(options.get('depth', 4)),
+                                 time_ms=int(options.get('ms', 100)),
+                                 book=options.get('book'),
+                                 tablebase=options.get('tb'))
+    if name == 'mcts':
+        options = dict(item.split('=', 1) for item in args.split(',') if item)
+        return functools.partial(mcts_player,
+                                 time_ms=int(options.get('ms', 100)),
+                                 playouts=int(options.get('playouts', 0)),
+                                 threads=int(options.get('threads', 1)),
+                                 batch=int(options.get('batch', 1)))
+    if not args:
+        raise ValueError(f"Unknown player '{spec}'")
+    policy = getattr(importlib.import_module(name), args)
+    if not callable(policy):
+        raise ValueError(f"Player '{spec}' is not callable")
+    return policy
+
+
+def play_game(index, spec_a, spec_b, seed, opening_plies, max_plies, repetition_limit):
+    """Play one game in the current process and return its result record.
+
+    Player A has Black in even-numbered games and White in odd ones.
+    """
+    rng = random.Random(seed * 1000003 + index)
+    a_is_black = index % 2 == 0
+    players = {
+        'black': make_player(spec_a if a_is_black else spec_b),
+        'white': make_player(spec_b if a_is_black else spec_a),
+    }
+
+    controller = GameController()
+    bridge = controller.game_bridge
+    bridge.set_repetition_limit(repetition_limit)
+
+    moves = []
+    while len(moves) < max_plies and not bridge.is_game_over():
+        side = bridge.get_current_player()
+        # Випадковий дебют, щоб партії з одним seed не повторювали одна одну
+        policy = random_player if len(moves) < opening_plies else players[side]
+        move = policy(controller, rng)
+        if move is None or not controller.make_move(*move):
+            break
+        (fr, fc), (tr, tc) = move
+        moves.append([fr, fc, tr, tc])
+
+    winner = bridge.get_winner()
+    if winner is None:
+        winner_player = None
+    else:
+        winner_player = 'A' if (winner == 'black') == a_is_black else 'B'
+    return {
+        'game': index,
+        'seed': seed,
+        'black': spec_a if a_is_black else spec_b,
+        'white': spec_b if a_is_black else spec_a,
+        'result': winner or 'draw',
+        'winner': winner_player,
+        'plies': len(moves),
+        'captures': bridge.get_captures(),
+        'moves': moves,
+    }
+
+
+def _elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(results, elapsed):
+    """Aggregate W/D/L for player A, Elo difference with a 95% interval and throughput."""
+    games = len(results)
+    wins = sum(1 for r in results if r['winner'] == 'A')
+    losses = sum(1 for r in results if r['winner'] == 'B')
+    draws = games - wins - losses
+    score = (wins + 0.5 * draws) / games if games else 0.5
+    if games:
+        variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2
+                    + losses * score ** 2) / games
+        margin = 1.96 * math.sqrt(variance / games)
+    else:
+        margin = 0.0
+    return {
+        'games': games,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'score': score,
+        'elo': _elo(score),
+        'elo_error': (_elo(score + margin) - _elo(score - margin)) / 2,
+        'avg_plies': sum(r['plies'] for r in results) / games if games else 0.0,
+        'games_per_sec': games / elapsed if elapsed > 0 else 0.0,
+        'elapsed_sec': elapsed,
+    }
+
+
+def run_match(spec_a, spec_b, games, workers=None, seed=0, opening_plies=4,
+              max_plies=300, repetition_limit=3, output=None, archive=None):
+    """Play a match on a process pool, streaming JSON lines to output as games finish.
+
+    archive, if given, is an ArchiveWriter that receives every game in
+    completion order.
+    """
+    # Перевіряємо специфікації до запуску пулу, щоб помилка була одразу
+    make_player(spec_a)
+    make_player(spec_b)
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, index, spec_a, spec_b, seed,
+                                   opening_plies, max_plies, repetition_limit)
+                   for index in range(games)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if output is not None:
+                output.write(json.dumps(result) + '\n')
+            if archive is not None:
+                moves = [((fr, fc), (tr, tc)) for fr, fc, tr, tc in result['moves']]
+                archive.add(moves, result['result'])
+    return summarize(results, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless Hasami Shogi match runner')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--player-a', default='greedy')
+    parser.add_argument('--player-b', default='random')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--opening-plies', type=int, default=4,
+                        help='random plies at the start of every game')
+    parser.add_argument('--max-plies', type=int, default=300,
+                        help='games longer than this are scored as draws')
+    parser.add_argument('--repetition-limit', type=int, default=3,
+                        help='draw after this many repetitions, 0 disables')
+    parser.add_argument('--output', help='JSON lines file for per-game results (default: none)')
+    parser.add_argument('--archive', help='binary game archive to write (see frontend.game_archive)')
+    args = parser.parse_args(argv)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    archive = ArchiveWriter(args.archive) if args.archive else None
+    try:
+        summary = run_match(args.player_a, args.player_b, args.games, args.workers,
+                            args.seed, args.opening_plies, args.max_plies,
+                            args.repetition_limit, output, archive)
+    finally:
+        if output is not None:
+            output.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"{args.player_a} vs {args.player_b}: "
+          f"+{summary['wins']} ={summary['draws']} -{summary['losses']} "
+          f"(score {summary['score']:.3f}, Elo {summary['elo']:+.0f} "
+          f"± {summary['elo_error']:.0f})")
+    print(f"{summary['games']} games in {summary['elapsed_sec']:.1f}s, "
+          f"{summary['games_per_sec']:.2f} games/s, avg {summary['avg_plies']:.1f} plies")
+
+
+if __name__ == '__main__':
+    main()
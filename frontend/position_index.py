@@ -0,0 +1,262 @@
+# frontend/position_index.py
+"""Sorted on-disk index from position key to the moves played there and their results.
+
+Built offline by replaying archived games (frontend.game_archive) through
+the C++ engine. Position keys are Game::getPositionHash (board plus side
+to move). Each entry is one (position, move) pair with the number of
+games and the results for the side that played the move. Entries are
+sorted by (key, move). A 65536-slot table on the top 16 key bits narrows
+each lookup to a short binary search over the memory-mapped file.
+
+File layout (little-endian):
+
+    header   magic b'HSPI', u16 version, u16 reserved, u64 entry count,
+             u64 positions, u64 games indexed
+    buckets  (65536 + 1) u32: first entry index for each top-16-bit prefix
+    entries  u64 key, u16 move (12-bit game_archive code), 2 pad bytes,
+             u32 games, u32 wins, u32 draws, u32 losses
+
+    python -m frontend.position_index build book.hspi games.hsga --max-plies 20
+    python -m frontend.position_index query book.hspi
+    python -m frontend.position_index bench book.hspi --lookups 100000
+"""
+import argparse
+import mmap
+import random
+import struct
+import time
+from collections import namedtuple
+
+from .game_archive import ArchiveReader, decode_move, encode_move
+
+MAGIC = b'HSPI'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQ')
+ENTRY = struct.Struct('<QHxxIIII')
+PREFIX_BITS = 16
+BUCKETS = struct.Struct(f'<{(1 << PREFIX_BITS) + 1}I')
+KEY = struct.Struct('<Q')
+MASK32 = 0xFFFFFFFF
+
+# Результати з погляду того, хто зробив хід; games може бути більше за суму
+# wins + draws + losses, якщо частина партій не дограна
+BookMove = namedtuple('BookMove', ['move', 'games', 'wins', 'draws', 'losses'])
+
+
+def collect(archives, max_plies=None, bridge=None):
+    """Replay archived games and count (position key, move) occurrences.
+
+    Returns (stats, games) where stats maps key << 12 | move code to the
+    packed counters games | wins << 32 | draws << 64 | losses << 96.
+    """
+    from .cpp_bridge import create_bridge
+    from .game_archive import replay
+
+    bridge = bridge or create_bridge()
+    # Один int на запис замість списку: менше пам'яті й одна операція зі словником
+    increments = {'draw': 1 | 1 << 64, None: 1}
+    stats = {}
+    games = 0
+    for path in archives:
+        with ArchiveReader(path) as reader:
+            for record in reader:
+                moves = record.moves if max_plies is None else record.moves[:max_plies]
+                replay(bridge, record._replace(moves=[]))
+                mover = bridge.get_current_player()
+                if record.result in increments:
+                    increment = other = increments[record.result]
+                else:
+                    win, loss = 1 | 1 << 32, 1 | 1 << 96
+                    increment, other = (win, loss) if record.result == mover else (loss, win)
+                get_hash, make_move = bridge.get_position_hash, bridge.make_move
+                for from_pos, to_pos in moves:
+                    slot = get_hash() << 12 | encode_move(from_pos, to_pos)
+                    stats[slot] = stats.get(slot, 0) + increment
+                    if not make_move(from_pos, to_pos):
+                        raise ValueError(f'{path}: illegal move {from_pos} -> {to_pos}')
+                    increment, other = other, increment
+                games += 1
+    return stats, games
+
+
+def write_index(path, stats, games=0):
+    """Write collect() output as a sorted index file. Returns the entry count."""
+    slots = sorted(stats)
+    buckets = [0] * ((1 << PREFIX_BITS) + 1)
+    positions = 0
+    previous_key = None
+    for slot in slots:
+        key = slot >> 12
+        if key != previous_key:
+            positions += 1
+            previous_key = key
+        buckets[(key >> (64 - PREFIX_BITS)) + 1] += 1
+    for prefix in range(1, len(buckets)):
+        buckets[prefix] += buckets[prefix - 1]
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(slots), positions, games))
+        f.write(BUCKETS.pack(*buckets))
+        pack = ENTRY.pack
+        chunk = []
+        for slot in slots:
+            counters = stats[slot]
+            chunk.append(pack(slot >> 12, slot & 0xFFF, counters & MASK32,
+                              counters >> 32 & MASK32, counters >> 64 & MASK32, counters >> 96))
+            if len(chunk) >= 65536:
+                f.write(b''.join(chunk))
+                chunk.clear()
+        f.write(b''.join(chunk))
+    return len(slots)
+
+
+def build(path, archives, max_plies=None):
+    """Build an index file from archives. Returns (entries, positions, games)."""
+    stats, games = collect(archives, max_plies)
+    entries = write_index(path, stats, games)
+    with PositionIndex(path) as index:
+        return entries, index.positions, games
+
+
+class PositionIndex:
+    """Memory-mapped position index with binary-search lookups."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'{path}: empty file')
+        if len(self._data) < HEADER.size + BUCKETS.size:
+            self.close()
+            raise ValueError(f'{path}: not a position index')
+        magic, version, _, self._count, self.positions, self.games = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path}: not a version {VERSION} position index')
+        self._buckets = BUCKETS.unpack_from(self._data, HEADER.size)
+        self._entries = HEADER.size + BUCKETS.size
+        if self._entries + self._count * ENTRY.size > len(self._data):
+            self.close()
+            raise ValueError(f'{path}: truncated index')
+
+    def __len__(self):
+        return self._count
+
+    def _first_at_or_after(self, key):
+        prefix = key >> (64 - PREFIX_BITS)
+        lo, hi = self._buckets[prefix], self._buckets[prefix + 1]
+        data, base, size = self._data, self._entries, ENTRY.size
+        unpack_key = KEY.unpack_from
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if unpack_key(data, base + mid * size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, key):
+        """BookMoves recorded for a position key, most played first."""
+        index = self._first_at_or_after(key)
+        data, base = self._data, self._entries
+        moves = []
+        while index < self._count:
+            entry_key, code, games, wins, draws, losses = ENTRY.unpack_from(
+                data, base + index * ENTRY.size)
+            if entry_key != key:
+                break
+            moves.append(BookMove(decode_move(code), games, wins, draws, losses))
+            index += 1
+        moves.sort(key=lambda m: m.games, reverse=True)
+        return moves
+
+    def count(self, key):
+        """How many indexed games passed through the position."""
+        return sum(m.games for m in self.lookup(key))
+
+    def __contains__(self, key):
+        index = self._first_at_or_after(key)
+        return (index < self._count and
+                KEY.unpack_from(self._data, self._entries + index * ENTRY.size)[0] == key)
+
+    def random_keys(self, n, rng):
+        """n keys of indexed positions, for benchmarks."""
+        return [KEY.unpack_from(self._data, self._entries + rng.randrange(self._count) * ENTRY.size)[0]
+                for _ in range(n)]
+
+    def close(self):
+        if getattr(self, '_data', None) is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(path, lookups=100000, seed=0):
+    """Lookup latency over indexed keys (hits) and random keys (mostly misses), in µs."""
+    rng = random.Random(seed)
+    with PositionIndex(path) as index:
+        hits = index.random_keys(lookups, rng)
+        misses = [rng.getrandbits(64) for _ in range(lookups)]
+        result = {'entries': len(index), 'positions': index.positions}
+        for name, keys in (('hit', hits), ('miss', misses)):
+            start = time.perf_counter()
+            for key in keys:
+                index.lookup(key)
+            result[f'{name}_us'] = (time.perf_counter() - start) / lookups * 1e6
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Position index over archived games')
+    commands = parser.add_subparsers(dest='command', required=True)
+    make = commands.add_parser('build', help='build an index from game archives')
+    make.add_argument('index')
+    make.add_argument('archives', nargs='+')
+    make.add_argument('--max-plies', type=int, default=None,
+                      help='index only the first N plies of each game (opening book)')
+    query = commands.add_parser('query', help='book moves for the initial position or a saved game')
+    query.add_argument('index')
+    query.add_argument('--save', help='.hsg file with the position to query')
+    bench = commands.add_parser('bench', help='measure lookup latency')
+    bench.add_argument('index')
+    bench.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        stats, games = collect(args.archives, args.max_plies)
+        collected = time.perf_counter()
+        entries = write_index(args.index, stats, games)
+        elapsed = time.perf_counter() - start
+        plies = sum(counters & MASK32 for counters in stats.values())
+        print(f'{games} games, {plies} plies -> {entries} entries in {elapsed:.1f}s '
+              f'(replay {plies / (collected - start):,.0f} plies/s, '
+              f'write {entries / max(elapsed - (collected - start), 1e-9):,.0f} entries/s)')
+    elif args.command == 'query':
+        from .cpp_bridge import create_bridge
+
+        bridge = create_bridge()
+        if args.save and not bridge.load_game(args.save):
+            parser.error(f'cannot load {args.save}')
+        with PositionIndex(args.index) as index:
+            for m in index.lookup(bridge.get_position_hash()):
+                (fr, fc), (tr, tc) = m.move
+                print(f'({fr},{fc}) -> ({tr},{tc}): {m.games} games, '
+                      f'+{m.wins} ={m.draws} -{m.losses}')
+    elif args.command == 'bench':
+        result = benchmark(args.index, args.lookups)
+        print(f"{result['entries']:,} entries, {result['positions']:,} positions: "
+              f"hit {result['hit_us']:.2f} µs, miss {result['miss_us']:.2f} µs per lookup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1169 @@
+# frontend/py_engine.py
+"""Pure-Python engine with the GameBridge interface, for hosts without the native library.
+
+cpp_bridge.create_bridge falls back to PyGameBridge when the native
+library cannot be loaded (the repository ships only a Windows build), and
+HASAMI_ENGINE=python or run.py --engine python selects it explicitly.
+
+Rules, move order, save files and position keys (the Zobrist keys of
+backend/src/zobrist.cpp) match the C++ core exactly, so books and caches
+built with one engine work with the other. The board is a bytearray of 81
+cells and moves walk precomputed ray tables. The alpha-beta search uses a
+material and centrality evaluation only and MCTS runs on one thread, so
+both are slower than the native players and may choose other moves.
+
+    python -m frontend.py_engine diff --games 200
+    python -m frontend.py_engine bench
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from .cpp_bridge import (BOARD_SIZE, BOARD_CELLS, EMPTY, BLACK, WHITE, CELL_SYMBOLS,
+                         MAX_LEGAL_MOVES, SEARCH_MAX_PV, MoveDelta, _np, pack_squares)
+from .ffi_stats import ffi_stats
+
+START_PIECES = 9
+MASK64 = (1 << 64) - 1
+
+# Searcher: ті самі межі й рахунок мату, що в search.hpp
+MAX_PLY = 64
+MATE_SCORE = 30000
+INF = 32000
+CAPTURE_VALUE = 100
+PROGRESS_INTERVAL_MS = 100
+# Приблизний розмір запису TT і вузла MCTS у Python, для лімітів пам'яті в МБ
+TT_ENTRY_BYTES = 200
+MCTS_NODE_BYTES = 160
+
+# Mcts: ті самі константи, що в mcts.cpp / mcts.hpp
+EXPLORATION = 0.7
+ROLLOUT_PLIES = 40
+ROLLOUT_CANDIDATES = 4
+
+
+def _build_rays():
+    # Промені в порядку Board::generateMoves: вправо, вліво, вниз, вгору
+    rays = []
+    for square in range(BOARD_CELLS):
+        row, col = divmod(square, BOARD_SIZE)
+        rays.append((
+            tuple(row * BOARD_SIZE + c for c in range(col + 1, BOARD_SIZE)),
+            tuple(row * BOARD_SIZE + c for c in range(col - 1, -1, -1)),
+            tuple(r * BOARD_SIZE + col for r in range(row + 1, BOARD_SIZE)),
+            tuple(r * BOARD_SIZE + col for r in range(row - 1, -1, -1)),
+        ))
+    return tuple(rays)
+
+
+def _zobrist_keys():
+    # Та сама послідовність splitmix64, що в KeyTable (zobrist.cpp)
+    state = 0x9E3779B97F4A7C15
+
+    def next_key():
+        nonlocal state
+        state = (state + 0x9E3779B97F4A7C15) & MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    pieces = tuple((0, next_key(), next_key()) for _ in range(BOARD_CELLS))
+    return pieces, next_key()
+
+
+def _symmetry_tables():
+    # Симетрії zobrist::Symmetry: біт 1 - дзеркало, біт 2 - заміна кольорів з відображенням
+    squares, colors = [], []
+    for symmetry in range(4):
+        table = []
+        for square in range(BOARD_CELLS):
+            row, col = divmod(square, BOARD_SIZE)
+            if symmetry & 1:
+                col = BOARD_SIZE - 1 - col
+            if symmetry & 2:
+                row = BOARD_SIZE - 1 - row
+            table.append(row * BOARD_SIZE + col)
+        squares.append(tuple(table))
+        colors.append((EMPTY, WHITE, BLACK) if symmetry & 2 else (EMPTY, BLACK, WHITE))
+    return tuple(squares), tuple(colors)
+
+
+RAYS = _build_rays()
+PIECE_KEYS, SIDE_KEY = _zobrist_keys()
+SYMMETRY_SQUARES, SYMMETRY_COLORS = _symmetry_tables()
+CENTRALITY = tuple(4 - max(abs(square // BOARD_SIZE - 4), abs(square % BOARD_SIZE - 4))
+                   for square in range(BOARD_CELLS))
+
+
+def _position(square):
+    return divmod(square, BOARD_SIZE)
+
+
+def _square(position):
+    row, col = position
+    if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+        return -1
+    return row * BOARD_SIZE + col
+
+
+def _parse_board(text):
+    """81 cell codes from Board::serialize text, or None if malformed."""
+    text = text.replace(' ', '').replace('"', '')
+    if not (text.startswith('[[') and text.endswith(']]')):
+        return None
+    rows = text[2:-2].split('],[')
+    if len(rows) != BOARD_SIZE:
+        return None
+    cells = bytearray()
+    for row in rows:
+        values = row.split(',')
+        if len(values) != BOARD_SIZE or any(value not in CELL_SYMBOLS for value in values):
+            return None
+        cells.extend(CELL_SYMBOLS.index(value) for value in values)
+    return cells
+
+
+class _Node:
+    """MCTS tree node; reward is in half-points for the player who moved into it."""
+    __slots__ = ('move', 'children', 'visits', 'reward')
+
+    def __init__(self, move):
+        self.move = move
+        self.children = None
+        self.visits = 0
+        self.reward = 0
+
+
+class PyGameBridge:
+    """GameBridge replacement written in Python; see the module docstring.
+
+    Like GameBridge, one instance must not be shared between threads
+    without locking, except stop_search, which is safe from any thread.
+    """
+
+    def __init__(self):
+        self._cells = bytearray(BOARD_CELLS)
+        self._player = BLACK
+        self._captured = [0, 0, 0]  # [_, захопили чорні, захопили білі]
+        self._hash = 0
+        self._history = []          # (from, to, захоплені клітинки)
+        self._redo = []
+        self._keys = []             # ключі позицій: [0] - початкова, [i + 1] - після history[i]
+        self._start = None
+        self._repetition_limit = 0
+        # Буфери знімків, як у GameBridge: перезаписуються наступним викликом
+        self._snapshot = bytearray(BOARD_CELLS)
+        self._moves = bytearray(2 * MAX_LEGAL_MOVES)
+        # Пошук
+        self._tt = {}
+        self._tt_entries = 16 * 1024 * 1024 // TT_ENTRY_BYTES
+        self._node_limit = 0
+        self._stop = threading.Event()
+        self._mcts_nodes = 64 * 1024 * 1024 // MCTS_NODE_BYTES
+        self._reset_board()
+
+    # --- Стан гри ---
+
+    def _reset_board(self):
+        cells = bytearray(BOARD_CELLS)
+        cells[:BOARD_SIZE] = bytes([BLACK]) * BOARD_SIZE
+        cells[-BOARD_SIZE:] = bytes([WHITE]) * BOARD_SIZE
+        self._set_state(cells, BLACK, 0, 0)
+
+    def _set_state(self, cells, player, black, white):
+        self._cells[:] = cells
+        self._player = player
+        self._captured = [0, black, white]
+        board_hash = 0
+        for square, color in enumerate(self._cells):
+            board_hash ^= PIECE_KEYS[square][color]
+        self._hash = board_hash
+        self._history = []
+        self._redo = []
+        self._keys = [self._key()]
+        self._start = (bytes(self._cells), player, black, white)
+
+    def _copy_state(self, other):
+        self._cells[:] = other._cells
+        self._player = other._player
+        self._captured = list(other._captured)
+        self._hash = other._hash
+        self._history = list(other._history)
+        self._redo = list(other._redo)
+        self._keys = list(other._keys)
+        self._start = other._start
+        self._repetition_limit = other._repetition_limit
+
+    def _key(self):
+        return self._hash ^ SIDE_KEY if self._player == WHITE else self._hash
+
+    def _apply(self, frm, to):
+        """Play frm -> to for the side to move; the captured squares, or None if illegal."""
+        cells = self._cells
+        side = self._player
+        if not (0 <= frm < BOARD_CELLS and 0 <= to < BOARD_CELLS) or cells[frm] != side:
+            return None
+        for ray in RAYS[frm]:
+            if to in ray:
+                for square in ray:
+                    if cells[square]:
+                        return None
+                    if square == to:
+                        break
+                break
+        else:
+            return None
+        keys = PIECE_KEYS
+        cells[frm] = EMPTY
+        cells[to] = side
+        board_hash = self._hash ^ keys[frm][side] ^ keys[to][side]
+        opp = 3 - side
+        captured = []
+        for ray in RAYS[to]:
+            run = 0
+            for square in ray:
+                color = cells[square]
+                if color != opp:
+                    if color == side and run:
+                        captured.extend(ray[:run])
+                    break
+                run += 1
+        for square in captured:
+            cells[square] = EMPTY
+            board_hash ^= keys[square][opp]
+        self._hash = board_hash
+        self._captured[side] += len(captured)
+        self._player = opp
+        self._history.append((frm, to, tuple(captured)))
+        self._keys.append(self._key())
+        return captured
+
+    def _unmake(self):
+        frm, to, captured = self._history.pop()
+        self._keys.pop()
+        cells = self._cells
+        keys = PIECE_KEYS
+        mover = cells[to]
+        victim = 3 - mover
+        board_hash = self._hash
+        for square in captured:
+            cells[square] = victim
+            board_hash ^= keys[square][victim]
+        cells[to] = EMPTY
+        cells[frm] = mover
+        self._hash = board_hash ^ keys[frm][mover] ^ keys[to][mover]
+        self._captured[mover] -= len(captured)
+        self._player = mover
+        return frm, to
+
+    def _legal_moves(self):
+        """All moves of the side to move as (from, to) squares, in Game::getAllLegalMoves order."""
+        cells = self._cells
+        side = self._player
+        moves = []
+        append = moves.append
+        for frm in range(BOARD_CELLS):
+            if cells[frm] != side:
+                continue
+            for ray in RAYS[frm]:
+                for to in ray:
+                    if cells[to]:
+                        break
+                    append((frm, to))
+        return moves
+
+    def _targets(self, frm):
+        cells = self._cells
+        targets = []
+        for ray in RAYS[frm]:
+            for to in ray:
+                if cells[to]:
+                    break
+                targets.append(to)
+        return targets
+
+    def _capture_count(self, frm, to, side):
+        # Як captureCount у search.cpp: хід не виконуємо, клітинка from вважається порожньою
+        cells = self._cells
+        opp = 3 - side
+        total = 0
+        for ray in RAYS[to]:
+            run = 0
+            for square in ray:
+                color = cells[square]
+                if color != opp:
+                    if color == side and run and square != frm:
+                        total += run
+                    break
+                run += 1
+        return total
+
+    def _winner(self):
+        if self._captured[BLACK] >= START_PIECES:
+            return BLACK
+        if self._captured[WHITE] >= START_PIECES:
+            return WHITE
+        return EMPTY
+
+    def _repetition_count(self):
+        keys = self._keys
+        history = self._history
+        key = keys[-1]
+        count = 1
+        current = len(history)
+        # Захоплення незворотні, тож далі останнього захоплення позиції не повторюються
+        for i in range(current - 1, -1, -1):
+            if history[i][2]:
+                break
+            if (current - i) % 2 == 0 and keys[i] == key:
+                count += 1
+        return count
+
+    def _game_over(self):
+        if self._captured[BLACK] >= START_PIECES or self._captured[WHITE] >= START_PIECES:
+            return True
+        return self._repetition_limit > 0 and self._repetition_count() >= self._repetition_limit
+
+    def _serialize(self):
+        return '[' + ','.join(
+            '[' + ','.join(f'"{CELL_SYMBOLS[cell]}"' for cell in self._cells[row:row + BOARD_SIZE]) + ']'
+            for row in range(0, BOARD_CELLS, BOARD_SIZE)) + ']'
+
+    # --- Інтерфейс GameBridge ---
+
+    def enable_instrumentation(self, stats=None):
+        """Kept for GameBridge compatibility: there are no native calls to record."""
+        return stats or ffi_stats
+
+    def disable_instrumentation(self):
+        pass
+
+    def create_initial_board(self):
+        """Initial board as a 9x9 list of 'B' / 'W' / None, as GameBridge returns it."""
+        board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for col in range(BOARD_SIZE):
+            board[0][col] = 'B'
+            board[BOARD_SIZE - 1][col] = 'W'
+        return board
+
+    def get_board_snapshot(self):
+        """(cells, current_player, captures); cells alias a buffer overwritten by the next call."""
+        self._snapshot[:] = self._cells
+        np = _np()
+        if np is not None:
+            cells = np.frombuffer(self._snapshot, dtype=np.uint8).reshape(BOARD_SIZE, BOARD_SIZE)
+        else:
+            cells = memoryview(self._snapshot).cast('B', (BOARD_SIZE, BOARD_SIZE))
+        return cells, self.get_current_player(), self.get_captures()
+
+    def get_board_bytes(self):
+        return bytes(self._cells)
+
+    def get_board_maps(self):
+        """Mobility, reach and capture-threat maps; see GameBridge.get_board_maps."""
+        cells = self._cells
+        maps = bytearray(4 * BOARD_CELLS)
+        moves = [0, 0, 0]
+        threatened = [0, 0, 0]
+        for frm in range(BOARD_CELLS):
+            color = cells[frm]
+            if not color:
+                continue
+            targets = self._targets(frm)
+            maps[frm] = len(targets)
+            moves[color] += len(targets)
+            reach = color * BOARD_CELLS
+            for to in targets:
+                maps[reach + to] += 1
+        # Фігура під загрозою, якщо якийсь хід суперника її захоплює
+        threats = 3 * BOARD_CELLS
+        for frm in range(BOARD_CELLS):
+            side = cells[frm]
+            if not side:
+                continue
+            opp = 3 - side
+            for to in self._targets(frm):
+                for ray in RAYS[to]:
+                    run = 0
+                    for square in ray:
+                        color = cells[square]
+                        if color != opp:
+                            if color == side and run and square != frm:
+                                for victim in ray[:run]:
+                                    if not maps[threats + victim]:
+                                        maps[threats + victim] = 1
+                                        threatened[opp] += 1
+                            break
+                        run += 1
+        np = _np()
+        if np is not None:
+            grids = np.frombuffer(maps, dtype=np.uint8).reshape(4, BOARD_SIZE, BOARD_SIZE)
+        else:
+            raw = memoryview(maps)
+            grids = [raw[i * BOARD_CELLS:(i + 1) * BOARD_CELLS].cast('B', (BOARD_SIZE, BOARD_SIZE))
+                     for i in range(4)]
+        return {
+            'mobility': grids[0],
+            'reach': {'black': grids[1], 'white': grids[2]},
+            'threats': grids[3],
+            'moves': {'black': moves[BLACK], 'white': moves[WHITE]},
+            'threatened': {'black': threatened[BLACK], 'white': threatened[WHITE]},
+        }
+
+    def get_board_state(self):
+        """Board as a 9x9 list of 'B'/'W'/'E'."""
+        raw = self._cells
+        return [[CELL_SYMBOLS[cell] for cell in raw[row:row + BOARD_SIZE]]
+                for row in range(0, BOARD_CELLS, BOARD_SIZE)]
+
+    def get_board_state_json(self):
+        """JSON board in the Board::serialize format."""
+        return self._serialize()
+
+    def get_valid_moves(self, position):
+        """Target squares of the piece on position if it belongs to the side to move."""
+        square = _square(position)
+        if square < 0 or self._cells[square] != self._player:
+            return []
+        return [divmod(to, BOARD_SIZE) for to in self._targets(square)]
+
+    def make_move(self, from_pos, to_pos):
+        frm, to = _square(from_pos), _square(to_pos)
+        if frm < 0 or to < 0 or self._apply(frm, to) is None:
+            return False
+        self._redo.clear()
+        return True
+
+    def get_all_legal_moves_packed(self):
+        """Packed (from, to) square indices, aliasing a buffer like GameBridge's."""
+        moves = self._legal_moves()
+        buffer = self._moves
+        for i, (frm, to) in enumerate(moves):
+            buffer[2 * i] = frm
+            buffer[2 * i + 1] = to
+        count = len(moves)
+        np = _np()
+        if np is not None:
+            return np.frombuffer(buffer, dtype=np.uint8, count=2 * count).reshape(count, 2)
+        return memoryview(buffer)[:2 * count]
+
+    def get_all_legal_moves(self):
+        return [(divmod(frm, BOARD_SIZE), divmod(to, BOARD_SIZE)) for frm, to in self._legal_moves()]
+
+    def make_move_ex(self, from_pos, to_pos):
+        """Make a move and return its MoveDelta, or None if the move is illegal."""
+        frm, to = _square(from_pos), _square(to_pos)
+        captured = self._apply(frm, to) if frm >= 0 and to >= 0 else None
+        if captured is None:
+            return None
+        self._redo.clear()
+        names = {BLACK: 'black', WHITE: 'white'}
+        return MoveDelta(
+            piece=CELL_SYMBOLS[self._cells[to]],
+            from_pos=divmod(frm, BOARD_SIZE),
+            to_pos=divmod(to, BOARD_SIZE),
+            captured=[divmod(square, BOARD_SIZE) for square in captured],
+            captures=self.get_captures(),
+            current_player=names[self._player],
+            game_over=self._game_over(),
+            winner=names.get(self._winner()),
+        )
+
+    def replay_moves(self, moves, deltas=False, branching=False):
+        """Play a move sequence; arguments and result as GameBridge.replay_moves."""
+        packed = pack_squares(moves)
+        names = {BLACK: 'black', WHITE: 'white'}
+        played = 0
+        move_deltas = [] if deltas else None
+        counts = [] if branching else None
+        for i in range(0, len(packed) - 1, 2):
+            frm, to = packed[i], packed[i + 1]
+            if branching:
+                count = len(self._legal_moves())
+            captured = self._apply(frm, to)
+            if captured is None:
+                break
+            self._redo.clear()
+            played += 1
+            if branching:
+                counts.append(count)
+            if deltas:
+                move_deltas.append(MoveDelta(
+                    piece=CELL_SYMBOLS[self._cells[to]],
+                    from_pos=divmod(frm, BOARD_SIZE),
+                    to_pos=divmod(to, BOARD_SIZE),
+                    captured=[divmod(square, BOARD_SIZE) for square in captured],
+                    captures=self.get_captures(),
+                    current_player=names[self._player],
+                    game_over=self._game_over(),
+                    winner=names.get(self._winner()),
+                ))
+        return played, move_deltas, counts
+
+    def get_current_player(self):
+        return 'black' if self._player == BLACK else 'white'
+
+    def is_game_over(self):
+        return self._game_over()
+
+    def get_winner(self):
+        return {BLACK: 'black', WHITE: 'white'}.get(self._winner())
+
+    def get_position_hash(self):
+        """64-bit Zobrist key, equal to the native getPositionHash."""
+        return self._key()
+
+    def get_canonical_hash(self):
+        """(key, symmetry) as GameBridge.get_canonical_hash."""
+        keys = [0, 0, 0, 0]
+        for square, color in enumerate(self._cells):
+            if not color:
+                continue
+            for symmetry in range(4):
+                keys[symmetry] ^= PIECE_KEYS[SYMMETRY_SQUARES[symmetry][square]][SYMMETRY_COLORS[symmetry][color]]
+        for symmetry in range(4):
+            if SYMMETRY_COLORS[symmetry][self._player] == WHITE:
+                keys[symmetry] ^= SIDE_KEY
+        best = min(range(4), key=lambda symmetry: (keys[symmetry], symmetry))
+        return keys[best], best
+
+    def get_repetition_count(self):
+        return self._repetition_count()
+
+    def set_repetition_limit(self, limit):
+        self._repetition_limit = limit if limit > 0 else 0
+
+    def get_captures(self):
+        return {'black': self._captured[BLACK], 'white': self._captured[WHITE]}
+
+    def save_game(self, filename):
+        """Write the position in the Game::save format."""
+        try:
+            with open(filename, 'w') as file:
+                file.write(f"{self._serialize()};{'B' if self._player == BLACK else 'W'};"
+                           f"{self._captured[BLACK]};{self._captured[WHITE]}")
+        except OSError:
+            return False
+        return True
+
+    def load_game(self, filename):
+        """Read a Game::save file; the position starts a new history."""
+        try:
+            with open(filename) as file:
+                content = file.readline().rstrip('\n')
+        except OSError:
+            return False
+        parts = content.split(';')
+        if len(parts) < 4:
+            return False
+        cells = _parse_board(parts[0])
+        if cells is None:
+            return False
+        try:
+            black, white = int(parts[2]), int(parts[3])
+        except ValueError:
+            return False
+        self._set_state(cells, BLACK if parts[1] == 'B' else WHITE, black, white)
+        return True
+
+    def get_move_history(self):
+        return [(divmod(frm, BOARD_SIZE), divmod(to, BOARD_SIZE)) for frm, to, _ in self._history]
+
+    def get_start_snapshot(self):
+        cells, player, black, white = self._start
+        return cells, 'black' if player == BLACK else 'white', {'black': black, 'white': white}
+
+    def set_position(self, cells, current_player, captures):
+        cells = bytes(cells)
+        if len(cells) != BOARD_CELLS or any(cell > WHITE for cell in cells):
+            return False
+        if current_player not in ('black', 'white') or captures['black'] < 0 or captures['white'] < 0:
+            return False
+        self._set_state(cells, BLACK if current_player == 'black' else WHITE,
+                        captures['black'], captures['white'])
+        return True
+
+    def start_new_game(self):
+        self._reset_board()
+
+    def undo_move(self):
+        if not self._history:
+            return False
+        self._redo.append(self._unmake())
+        return True
+
+    def redo_move(self):
+        if not self._redo:
+            return False
+        frm, to = self._redo[-1]
+        if self._apply(frm, to) is None:
+            return False
+        self._redo.pop()
+        return True
+
+    def can_undo(self):
+        return bool(self._history)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clone(self):
+        """Independent PyGameBridge with a copy of this game's state (no search tables)."""
+        copy = PyGameBridge()
+        copy._copy_state(self)
+        return copy
+
+    def copy_from(self, other):
+        """Replace this game's state with other's, keeping this bridge's search tables."""
+        if other is not self:
+            self._copy_state(other)
+
+    def set_search_hash_size(self, size_mb):
+        self._tt_entries = max(size_mb, 1) * 1024 * 1024 // TT_ENTRY_BYTES
+        self._tt.clear()
+
+    def set_search_node_limit(self, max_nodes):
+        self._node_limit = max(max_nodes, 0)
+
+    def stop_search(self):
+        """Make a running search return its best move so far (any thread)."""
+        self._stop.set()
+
+    def clear_search_stop(self):
+        self._stop.clear()
+
+    # --- Альфа-бета ---
+
+    def search_best_move(self, depth, time_ms=0, progress=None):
+        """Iterative-deepening alpha-beta; same arguments and result as GameBridge.search_best_move."""
+        search = _Search(self, time_ms, progress)
+        result = {'move': None, 'score': 0, 'depth': 0, 'nodes': 0, 'nps': 0, 'time_ms': 0, 'pv': []}
+        root = self.clone()
+        root._tt = self._tt
+        root._tt_entries = self._tt_entries
+        root_moves = [] if root._game_over() else root._legal_moves()
+        if root_moves:
+            # Запасний хід на випадок, якщо ліміт спрацює ще на першій ітерації
+            result['move'] = tuple(map(_position, root_moves[0]))
+        search.current = result
+        for iteration in range(1, max(1, min(depth, MAX_PLY - 1)) + 1):
+            if not root_moves or search.stopped:
+                break
+            score = search.alpha_beta(root, iteration, 0, -INF, INF)
+            if search.stopped:
+                break
+            pv = search.pv[0][:SEARCH_MAX_PV]
+            result.update(move=tuple(map(_position, pv[0])), score=score, depth=iteration,
+                          pv=[tuple(map(_position, move)) for move in pv])
+            if progress:
+                search.report(result)
+            # Знайдений форсований результат глибша ітерація вже не змінить
+            if abs(score) >= MATE_SCORE - MAX_PLY:
+                break
+        search.finish(result)
+        return result
+
+    # --- MCTS ---
+
+    def set_mcts_memory(self, size_mb):
+        self._mcts_nodes = max(size_mb, 1) * 1024 * 1024 // MCTS_NODE_BYTES
+
+    def mcts_search(self, playouts=0, time_ms=1000, threads=1, batch=1):
+        """UCT search with the native rollout policy; result as GameBridge.mcts_search.
+
+        Runs on the calling thread whatever threads is, and does not keep
+        the tree between calls ('reused_visits' is always 0).
+        """
+        if not playouts and not time_ms:
+            time_ms = 1000
+        batch = max(1, min(batch, 64))
+        start = time.perf_counter()
+        deadline = start + time_ms / 1000 if time_ms else None
+        game = self.clone()
+        rng = random.Random()
+        root = _Node(None)
+        tree_nodes = 1
+        done = 0
+        if not game._game_over() and game._legal_moves():
+            while not self._stop.is_set():
+                if playouts and done >= playouts:
+                    break
+                if deadline and time.perf_counter() >= deadline:
+                    break
+                node = root
+                path = [root]
+                # Спуск за UCT до листка
+                while node.children:
+                    log_visits = math.log(node.visits) if node.visits else 0.0
+                    best, best_value = None, -1.0
+                    for child in node.children:
+                        if not child.visits:
+                            best = child
+                            break
+                        value = (child.reward / (2 * child.visits) +
+                                 EXPLORATION * math.sqrt(log_visits / child.visits))
+                        if value > best_value:
+                            best, best_value = child, value
+                    node = best
+                    game._apply(*node.move)
+                    path.append(node)
+                if node.visits and not game._game_over() and tree_nodes < self._mcts_nodes:
+                    moves = game._legal_moves()
+                    if moves:
+                        node.children = [_Node(move) for move in moves]
+                        tree_nodes += len(moves)
+                        node = node.children[0]
+                        game._apply(*node.move)
+                        path.append(node)
+                reward = 0
+                for _ in range(batch):
+                    reward += _rollout_reward(game, rng)
+                done += batch
+                # reward - у півочках для того, хто ходить у листку; вузол зберігає для того, хто в нього зайшов
+                for node in reversed(path):
+                    node.visits += batch
+                    node.reward += 2 * batch - reward
+                    reward = 2 * batch - reward
+                for _ in range(len(path) - 1):
+                    game._unmake()
+        elapsed = time.perf_counter() - start
+        children = sorted(root.children or [], key=lambda child: -child.visits)
+        best = children[0].move if children else None
+        return {
+            'move': tuple(map(_position, best)) if best else None,
+            'playouts': done,
+            'playouts_per_sec': int(done / max(elapsed, 1e-3)),
+            'time_ms': int(elapsed * 1000),
+            'tree_nodes': tree_nodes,
+            'reused_visits': 0,
+            'root_moves': [(tuple(map(_position, child.move)), child.visits,
+                            child.reward / (2 * child.visits) if child.visits else 0.0)
+                           for child in children],
+        }
+
+    # --- Ендшпільні таблиці ---
+
+    def probe_tablebase(self, tablebase):
+        """Exact result from an open frontend.tablebase.Tablebase; see GameBridge.probe_tablebase."""
+        if self._game_over():
+            return None
+        squares = {BLACK: [], WHITE: []}
+        for square, color in enumerate(self._cells):
+            if color:
+                squares[color].append(square)
+        black, white = squares[BLACK], squares[WHITE]
+        # Таблиці рахують перемогу як захоплення всіх фігур на дошці
+        if (self._captured[BLACK] != START_PIECES - len(white) or
+                self._captured[WHITE] != START_PIECES - len(black)):
+            return None
+        return tablebase.lookup(black, white, 'black' if self._player == BLACK else 'white')
+
+
+def _rollout_reward(game, rng):
+    """Random playout as Mcts rollout; result in half-points for the side to move, undone after."""
+    side_to_move = game._player
+    plies = 0
+    winner = EMPTY
+    decided = False
+    cells = game._cells
+    while plies < ROLLOUT_PLIES:
+        winner = game._winner()
+        if winner:
+            decided = True
+            break
+        side = game._player
+        squares = [square for square in range(BOARD_CELLS) if cells[square] == side]
+        chosen = None
+        tried = 0
+        while squares and tried < ROLLOUT_CANDIDATES:
+            i = rng.randrange(len(squares))
+            frm = squares[i]
+            squares[i] = squares[-1]
+            squares.pop()
+            targets = game._targets(frm)
+            if not targets:
+                continue
+            if chosen is None:
+                chosen = (frm, targets[rng.randrange(len(targets))])
+            capture = next((to for to in targets if game._capture_count(frm, to, side)), None)
+            if capture is not None:
+                chosen = (frm, capture)
+                break
+            tried += 1
+        if chosen is None:
+            # Немає ходів - поразка того, хто ходить
+            winner = 3 - side
+            decided = True
+            break
+        game._apply(*chosen)
+        plies += 1
+    if not decided:
+        # Розіграш обірвано: перемагає той, хто захопив більше
+        black, white = game._captured[BLACK], game._captured[WHITE]
+        winner = BLACK if black > white else WHITE if white > black else EMPTY
+    for _ in range(plies):
+        game._unmake()
+    if winner == EMPTY:
+        return 1
+    return 2 if winner == side_to_move else 0
+
+
+class _Search:
+    """State of one search_best_move call: limits, counters, killers and PV."""
+
+    def __init__(self, bridge, time_ms, progress):
+        self.bridge = bridge
+        self.tt = bridge._tt
+        self.tt_entries = bridge._tt_entries
+        self.time_ms = time_ms
+        self.node_limit = bridge._node_limit
+        self.stop = bridge._stop
+        self.progress = progress
+        self.start = time.perf_counter()
+        self.nodes = 0
+        self.stopped = self.stop.is_set()
+        self.last_progress_ms = 0
+        self.current = None
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}
+        self.pv = [[] for _ in range(MAX_PLY + 1)]
+
+    def elapsed_ms(self):
+        return int((time.perf_counter() - self.start) * 1000)
+
+    def check_limits(self):
+        elapsed = self.elapsed_ms()
+        if self.node_limit and self.nodes >= self.node_limit:
+            self.stopped = True
+        if self.time_ms and elapsed >= self.time_ms:
+            self.stopped = True
+        if self.stop.is_set():
+            self.stopped = True
+        if (not self.stopped and self.progress and self.current and
+                elapsed - self.last_progress_ms >= PROGRESS_INTERVAL_MS):
+            self.report(self.current)
+        return self.stopped
+
+    def finish(self, result):
+        elapsed = self.elapsed_ms()
+        result.update(nodes=self.nodes, time_ms=elapsed, nps=self.nodes * 1000 // max(elapsed, 1))
+
+    def report(self, result):
+        self.finish(result)
+        self.last_progress_ms = result['time_ms']
+        self.progress(dict(result))
+
+    def evaluate(self, game):
+        side = game._player
+        material = game._captured[side] - game._captured[3 - side]
+        positional = 0
+        for square, color in enumerate(game._cells):
+            if color:
+                positional += CENTRALITY[square] if color == side else -CENTRALITY[square]
+        return material * CAPTURE_VALUE + positional
+
+    def alpha_beta(self, game, depth, ply, alpha, beta):
+        self.pv[ply] = []
+        self.nodes += 1
+        if not self.nodes & 255 and self.check_limits():
+            return 0
+        if game._game_over():
+            # Перемогу міг здобути лише суперник своїм останнім ходом; інакше - нічия
+            return 0 if game._winner() == EMPTY else -MATE_SCORE + ply
+        if ply and game._repetition_count() > 1:
+            return 0
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self.evaluate(game)
+
+        key = game._key()
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, tt_move = entry
+            if ply and entry_depth >= depth:
+                score = _score_from_tt(entry_score, ply)
+                if (bound == 0 or (bound == 1 and score >= beta) or
+                        (bound == 2 and score <= alpha)):
+                    return score
+
+        moves = game._legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply
+        side = game._player
+        killers = self.killers[ply]
+        history = self.history
+        ordered = []
+        for move in moves:
+            if move == tt_move:
+                score = 1 << 30
+            else:
+                captured = game._capture_count(move[0], move[1], side)
+                if captured:
+                    score = (1 << 29) + captured
+                elif move == killers[0]:
+                    score = (1 << 28) + 1
+                elif move == killers[1]:
+                    score = 1 << 28
+                else:
+                    score = history.get(move, 0)
+            ordered.append((score, move))
+        ordered.sort(key=lambda item: -item[0])
+
+        original_alpha = alpha
+        best_score = -INF
+        best_move = ordered[0][1]
+        for order, move in ordered:
+            game._apply(*move)
+            score = -self.alpha_beta(game, depth - 1, ply + 1, -beta, -alpha)
+            game._unmake()
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = [move] + self.pv[ply + 1]
+                    if alpha >= beta:
+                        if not game._capture_count(move[0], move[1], side):
+                            if move != killers[0]:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                            history[move] = history.get(move, 0) + depth * depth
+                        break
+
+        bound = 0
+        if best_score <= original_alpha:
+            bound = 2
+        elif best_score >= beta:
+            bound = 1
+        tt = self.tt
+        if key not in tt and len(tt) >= self.tt_entries:
+            tt.clear()
+        stored = tt.get(key)
+        if stored is None or depth >= stored[0]:
+            tt[key] = (depth, _score_to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+
+# Перетворення рахунку мату між "від кореня" і "від поточного вузла" для TT
+def _score_to_tt(score, ply):
+    if score > MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score < -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    if score > MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score < -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+# --- Порівняння з C++ ---
+
+def _state(bridge):
+    maps = bridge.get_board_maps()
+    grids = [maps['mobility'], maps['reach']['black'], maps['reach']['white'], maps['threats']]
+    return {
+        'board': bridge.get_board_bytes(),
+        'player': bridge.get_current_player(),
+        'captures': bridge.get_captures(),
+        'hash': bridge.get_position_hash(),
+        'canonical': bridge.get_canonical_hash(),
+        'repetitions': bridge.get_repetition_count(),
+        'game_over': bridge.is_game_over(),
+        'winner': bridge.get_winner(),
+        'moves': bridge.get_all_legal_moves(),
+        'maps': [grid.tobytes() for grid in grids],
+        'totals': (maps['moves'], maps['threatened']),
+        'json': bridge.get_board_state_json(),
+        'can_undo': bridge.can_undo(),
+        'can_redo': bridge.can_redo(),
+    }
+
+
+def differential(games=100, max_plies=150, seed=0, native=None):
+    """Play random games on both engines in lockstep and compare every observable.
+
+    Each ply compares the board, side to move, captures, position and
+    canonical keys, repetitions, game over, the legal move list (in
+    order), board maps and move deltas; undo/redo, illegal moves and a
+    save/load round trip are mixed in. Returns (plies checked, mismatches)
+    with mismatches as (game, ply, what, native value, python value).
+    """
+    from .cpp_bridge import GameBridge
+
+    native_class = native or GameBridge
+    rng = random.Random(seed)
+    mismatches = []
+    plies = 0
+    for game in range(games):
+        cpp, py = native_class(), PyGameBridge()
+        limit = rng.choice((0, 3))
+        cpp.set_repetition_limit(limit)
+        py.set_repetition_limit(limit)
+
+        def check(ply, what, a, b):
+            if a != b:
+                mismatches.append((game, ply, what, a, b))
+
+        for ply in range(max_plies):
+            a, b = _state(cpp), _state(py)
+            for name in a:
+                check(ply, name, a[name], b[name])
+            plies += 1
+            if a['game_over'] or not a['moves']:
+                break
+            roll = rng.random()
+            if roll < 0.05 and cpp.can_undo():
+                check(ply, 'undo', cpp.undo_move(), py.undo_move())
+                continue
+            if roll < 0.08 and cpp.can_redo():
+                check(ply, 'redo', cpp.redo_move(), py.redo_move())
+                continue
+            if roll < 0.12:
+                # Недопустимий хід: чужа фігура, зайнята клітинка чи поза дошкою
+                frm = (rng.randrange(-1, BOARD_SIZE + 1), rng.randrange(-1, BOARD_SIZE + 1))
+                to = (rng.randrange(-1, BOARD_SIZE + 1), rng.randrange(-1, BOARD_SIZE + 1))
+                if (frm, to) not in a['moves']:
+                    check(ply, 'illegal move', cpp.make_move(frm, to), py.make_move(frm, to))
+                square = (rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE))
+                check(ply, 'valid moves', cpp.get_valid_moves(square), py.get_valid_moves(square))
+                continue
+            move = rng.choice(a['moves'])
+            check(ply, 'delta', cpp.make_move_ex(*move), py.make_move_ex(*move))
+        check(-1, 'history', cpp.get_move_history(), py.get_move_history())
+        # Пакетне відтворення тієї самої партії з дельтами і кількістю ходів
+        history = cpp.get_move_history() + [((0, 0), (0, 0))]
+        start = cpp.get_start_snapshot()
+        replays = []
+        for bridge in (native_class(), PyGameBridge()):
+            bridge.set_repetition_limit(limit)
+            bridge.set_position(*start)
+            replays.append(bridge.replay_moves(history, deltas=True, branching=True))
+            # Порожня послідовність: запитані списки порожні, решта None
+            replays.append([bridge.replay_moves([], deltas=with_deltas, branching=with_branching)
+                            for with_deltas in (False, True) for with_branching in (False, True)])
+        check(-1, 'replay', replays[0], replays[2])
+        check(-1, 'empty replay', replays[1], replays[3])
+        check(-1, 'start', cpp.get_start_snapshot(), py.get_start_snapshot())
+        # Файли збереження взаємозамінні: C++ читає файл Python і навпаки
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cpp_file, py_file = os.path.join(tmpdir, 'cpp.txt'), os.path.join(tmpdir, 'py.txt')
+            cpp.save_game(cpp_file)
+            py.save_game(py_file)
+            with open(cpp_file) as a, open(py_file) as b:
+                check(-1, 'save file', a.read(), b.read())
+            check(-1, 'load', cpp.load_game(py_file), py.load_game(cpp_file))
+            check(-1, 'loaded', _state(cpp), _state(py))
+    return plies, mismatches
+
+
+def perft(bridge, depth):
+    """Leaf count at depth through the public bridge interface."""
+    if depth <= 0:
+        return 1
+    if bridge.is_game_over():
+        return 0
+    moves = bridge.get_all_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        bridge.make_move(*move)
+        nodes += perft(bridge, depth - 1)
+        bridge.undo_move()
+    return nodes
+
+
+def benchmark(depth=3, search_depth=3, native=None):
+    """Time the same workloads on both engines.
+
+    Returns {name: {'native': seconds or None, 'python': seconds}} for
+    perft(depth) through the bridge interface, a fixed-depth search from a
+    midgame position and 1000 random moves with undo.
+    """
+    from .cpp_bridge import GameBridge
+
+    engines = {'python': PyGameBridge}
+    native_class = native or GameBridge
+    try:
+        native_class.load_library()
+        engines['native'] = native_class
+    except (RuntimeError, OSError):
+        pass
+
+    def midgame(bridge):
+        rng = random.Random(1)
+        for _ in range(12):
+            bridge.make_move(*rng.choice(bridge.get_all_legal_moves()))
+
+    def moves(bridge):
+        rng = random.Random(2)
+        for _ in range(1000):
+            legal = bridge.get_all_legal_moves()
+            if not legal or bridge.is_game_over():
+                bridge.start_new_game()
+                continue
+            bridge.make_move(*rng.choice(legal))
+            if rng.random() < 0.3:
+                bridge.undo_move()
+
+    workloads = {
+        f'perft({depth})': (lambda bridge: None, lambda bridge: perft(bridge, depth)),
+        f'search(depth={search_depth})': (midgame, lambda bridge: bridge.search_best_move(search_depth)),
+        'moves(1000)': (lambda bridge: None, moves),
+    }
+    results = {}
+    for name, (setup, run) in workloads.items():
+        results[name] = {}
+        for engine, cls in engines.items():
+            bridge = cls()
+            setup(bridge)
+            start = time.perf_counter()
+            run(bridge)
+            results[name][engine] = time.perf_counter() - start
+        results[name].setdefault('native', None)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pure-Python engine: checks against the C++ core')
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff = commands.add_parser('diff', help='differential test against the native library')
+    diff.add_argument('--games', type=int, default=100)
+    diff.add_argument('--max-plies', type=int, default=150)
+    diff.add_argument('--seed', type=int, default=0)
+    bench = commands.add_parser('bench', help='time both engines on the same workloads')
+    bench.add_argument('--depth', type=int, default=3, help='perft depth')
+    bench.add_argument('--search-depth', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'diff':
+        plies, mismatches = differential(args.games, args.max_plies, args.seed)
+        for game, ply, what, expected, got in mismatches[:20]:
+            print(f'game {game} ply {ply}: {what}\n  native {expected!r}\n  python {got!r}')
+        print(f'{args.games} games, {plies} positions compared, {len(mismatches)} mismatches')
+        return 1 if mismatches else 0
+    results = benchmark(args.depth, args.search_depth)
+    print(f"{'workload':24s} {'native':>10s} {'python':>10s} {'ratio':>8s}")
+    for name, times in results.items():
+        native, python = times['native'], times['python']
+        native_text = f'{native * 1000:8.1f}ms' if native is not None else '         -'
+        ratio = f'{python / native:7.1f}x' if native else '       -'
+        print(f'{name:24s} {native_text} {python * 1000:8.1f}ms {ratio}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,570 @@
+# frontend/server.py
+"""asyncio game server: many concurrent games in one process over a local socket.
+
+Protocol: newline-delimited JSON over TCP or a Unix socket. Every request
+is an object with an "op" and an optional "id", which the response
+echoes. Responses carry "ok": true or "ok": false with an "error".
+
+    {"id": 1, "op": "create"}                                -> {"game": 7}
+    {"id": 2, "op": "legal", "game": 7}                      -> {"moves": [[fr, fc, tr, tc], ...]}
+    {"id": 2, "op": "legal", "game": 7, "packed": true}      -> {"moves": "hex: from, to square per move"}
+    {"id": 3, "op": "move", "game": 7, "from": [0, 0], "to": [3, 0]}
+                                   -> {"captured": [[r, c], ...], "player", "captures", "over", "winner"}
+    {"id": 4, "op": "state", "game": 7}  -> {"board": 81 chars of ".BW", "player", "captures", "over", "winner"}
+    {"id": 5, "op": "engine", "game": 7, "depth": 4, "time_ms": 100, "play": true}
+                                   -> search result, plus the move fields if play is true
+    {"id": 6, "op": "resign", "game": 7}                     -> {"winner": "white"}
+    {"id": 7, "op": "close", "game": 7}
+    {"id": 8, "op": "stats"}
+
+Squares in "from"/"to" may be [row, col] or a square index row * 9 + col.
+The packed form saves most of the JSON encode/decode cost of "legal".
+
+Games belong to the connection that created them and are closed when it
+disconnects. Closed GameBridges are reset and reused for new games.
+
+Requests on one connection may be pipelined. Quick calls take
+microseconds and run inline on the event loop. Engine searches run in a
+thread pool: the native search releases the GIL. Each search works on a
+clone of the game, and other moves in that game are refused until it
+finishes. A connection with max_inflight unanswered requests, or with a
+full write buffer, is not read from until it catches up. The kernel
+socket buffers then push back on the client.
+
+    python -m frontend.server serve --port 7878
+    python -m frontend.server load --games 1000 --connections 32
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cpp_bridge import create_bridge, BOARD_SIZE
+
+logger = logging.getLogger(__name__)
+
+BOARD_TABLE = bytes.maketrans(b'\x00\x01\x02', b'.BW')
+LINE_LIMIT = 64 * 1024
+WRITE_HIGH_WATER = 256 * 1024
+MAX_ENGINE_DEPTH = 32
+
+
+class ProtocolError(Exception):
+    """Bad request; reported to the client as {"ok": false, "error": ...}."""
+
+
+def _position(value, name):
+    if isinstance(value, int) and 0 <= value < BOARD_SIZE * BOARD_SIZE:
+        return divmod(value, BOARD_SIZE)
+    try:
+        row, col = value
+        return int(row), int(col)
+    except (TypeError, ValueError):
+        raise ProtocolError(f"'{name}' must be [row, col] or a square index") from None
+
+
+def _move_fields(delta):
+    return {
+        'captured': [list(pos) for pos in delta.captured],
+        'player': delta.current_player,
+        'captures': delta.captures,
+        'over': delta.game_over,
+        'winner': delta.winner,
+    }
+
+
+class GameSession:
+    __slots__ = ('id', 'bridge', 'owner', 'resigned', 'busy')
+
+    def __init__(self, game_id, bridge, owner):
+        self.id = game_id
+        self.bridge = bridge
+        self.owner = owner
+        self.resigned = None   # колір, що здався
+        self.busy = False      # рушій думає над цією партією
+
+    @property
+    def over(self):
+        return self.resigned is not None or self.bridge.is_game_over()
+
+    @property
+    def winner(self):
+        if self.resigned is not None:
+            return 'white' if self.resigned == 'black' else 'black'
+        return self.bridge.get_winner()
+
+
+class GamePool:
+    """Live games by id, with a free list of reset GameBridges for reuse."""
+
+    def __init__(self, max_games=10000, max_free=1024):
+        self.max_games = max_games
+        self.max_free = max_free
+        self.games = {}
+        self._free = []
+        self._ids = itertools.count(1)
+        self.created = 0
+
+    def create(self, owner):
+        if len(self.games) >= self.max_games:
+            raise ProtocolError('server is full')
+        if self._free:
+            bridge = self._free.pop()
+            bridge.start_new_game()
+        else:
+            bridge = create_bridge()
+        session = GameSession(next(self._ids), bridge, owner)
+        self.games[session.id] = session
+        self.created += 1
+        return session
+
+    def get(self, game_id, owner):
+        if not isinstance(game_id, int) or isinstance(game_id, bool):
+            raise ProtocolError('game must be an integer id')
+        session = self.games.get(game_id)
+        if session is None or session.owner is not owner:
+            raise ProtocolError(f'no game {game_id}')
+        return session
+
+    def close(self, session):
+        del self.games[session.id]
+        # Партію, над якою ще думає рушій, не повертаємо: її клон уже у пошуку,
+        # але сам bridge може бути виданий новій партії лише після завершення
+        if not session.busy and len(self._free) < self.max_free:
+            self._free.append(session.bridge)
+
+    def close_owned(self, owner):
+        for session in [s for s in self.games.values() if s.owner is owner]:
+            self.close(session)
+
+
+class Connection:
+    __slots__ = ('writer', 'slots')
+
+    def __init__(self, writer, max_inflight):
+        self.writer = writer
+        self.slots = asyncio.Semaphore(max_inflight)
+
+    def send(self, response):
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+
+
+class GameServer:
+    def __init__(self, max_games=10000, engine_workers=None, max_inflight=64, max_engine_ms=5000):
+        self.pool = GamePool(max_games)
+        self.max_inflight = max_inflight
+        self.max_engine_ms = max_engine_ms
+        self.executor = ThreadPoolExecutor(engine_workers or os.cpu_count() or 1,
+                                           thread_name_prefix='engine')
+        self._local = threading.local()
+        self._searching = set()
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+        self._ops = {
+            'create': self.op_create,
+            'legal': self.op_legal,
+            'move': self.op_move,
+            'state': self.op_state,
+            'resign': self.op_resign,
+            'close': self.op_close,
+            'stats': self.op_stats,
+        }
+
+    async def start(self, host='127.0.0.1', port=7878, unix=None):
+        if unix:
+            self._server = await asyncio.start_unix_server(self.handle_connection, unix,
+                                                           limit=LINE_LIMIT)
+        else:
+            self._server = await asyncio.start_server(self.handle_connection, host, port,
+                                                      limit=LINE_LIMIT)
+        return self._server
+
+    @property
+    def addresses(self):
+        return [sock.getsockname() for sock in self._server.sockets]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for engine in list(self._searching):
+            engine.stop_search()
+        self.executor.shutdown(wait=True)
+
+    async def handle_connection(self, reader, writer):
+        conn = Connection(writer, self.max_inflight)
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    conn.send({'ok': False, 'error': f'line longer than {LINE_LIMIT} bytes'})
+                    break
+                if not line:
+                    break
+                # Не читаємо далі, поки клієнт не забере відповіді
+                await conn.slots.acquire()
+                self.requests += 1
+                self.handle_line(line, conn)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            self.pool.close_owned(conn)
+            writer.close()
+
+    def handle_line(self, line, conn):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ProtocolError('invalid JSON') from None
+            if not isinstance(request, dict):
+                raise ProtocolError('request must be an object')
+            request_id = request.get('id')
+            op = request.get('op')
+            if op == 'engine':
+                task = asyncio.create_task(self.op_engine(request, conn))
+                task.add_done_callback(lambda t: self._engine_done(t, request_id, conn))
+                return
+            handler = self._ops.get(op)
+            if handler is None:
+                raise ProtocolError(f'unknown op {op!r}')
+            response = handler(request, conn)
+            response['ok'] = True
+        except ProtocolError as e:
+            response = {'ok': False, 'error': str(e)}
+        except Exception as e:
+            # Помилка одного запиту не повинна обривати з'єднання
+            logger.exception("Request failed: %r", line)
+            response = {'ok': False, 'error': f'internal error: {e}'}
+        if request_id is not None:
+            response['id'] = request_id
+        conn.send(response)
+        conn.slots.release()
+
+    def _engine_done(self, task, request_id, conn):
+        if task.cancelled():
+            response = {'ok': False, 'error': 'cancelled'}
+        elif isinstance(task.exception(), ProtocolError):
+            response = {'ok': False, 'error': str(task.exception())}
+        elif task.exception() is not None:
+            response = {'ok': False, 'error': f'engine failed: {task.exception()}'}
+        else:
+            response = task.result()
+            response['ok'] = True
+        if request_id is not None:
+            response['id'] = request_id
+        conn.send(response)
+        conn.slots.release()
+
+    def _session(self, request, conn):
+        return self.pool.get(request.get('game'), conn)
+
+    def op_create(self, request, conn):
+        return {'game': self.pool.create(conn).id}
+
+    def op_legal(self, request, conn):
+        session = self._session(request, conn)
+        if session.over:
+            return {'moves': '' if request.get('packed') else []}
+        if request.get('packed'):
+            return {'moves': bytes(session.bridge.get_all_legal_moves_packed()).hex()}
+        return {'moves': [[fr, fc, tr, tc]
+                          for (fr, fc), (tr, tc) in session.bridge.get_all_legal_moves()]}
+
+    def op_move(self, request, conn):
+        session = self._session(request, conn)
+        from_pos = _position(request.get('from'), 'from')
+        to_pos = _position(request.get('to'), 'to')
+        if session.busy:
+            raise ProtocolError('engine is thinking in this game')
+        if session.over:
+            raise ProtocolError('game is over')
+        delta = session.bridge.make_move_ex(from_pos, to_pos)
+        if delta is None:
+            raise ProtocolError('illegal move')
+        return _move_fields(delta)
+
+    def op_state(self, request, conn):
+        session = self._session(request, conn)
+        bridge = session.bridge
+        return {
+            'board': bridge.get_board_bytes().translate(BOARD_TABLE).decode(),
+            'player': bridge.get_current_player(),
+            'captures': bridge.get_captures(),
+            'over': session.over,
+            'winner': session.winner,
+        }
+
+    def op_resign(self, request, conn):
+        session = self._session(request, conn)
+        if session.over:
+            raise ProtocolError('game is over')
+        session.resigned = session.bridge.get_current_player()
+        return {'winner': session.winner}
+
+    def op_close(self, request, conn):
+        self.pool.close(self._session(request, conn))
+        return {}
+
+    def op_stats(self, request, conn):
+        return {'games': len(self.pool.games), 'created': self.pool.created,
+                'connections': self.connections, 'requests': self.requests,
+                'searching': len(self._searching)}
+
+    def _search(self, snapshot, depth, time_ms):
+        # Один рушій на потік пулу: його таблиця транспозицій живе між пошуками
+        engine = getattr(self._local, 'engine', None)
+        if engine is None:
+            engine = self._local.engine = type(snapshot)()
+        engine.clear_search_stop()
+        engine.copy_from(snapshot)
+        self._searching.add(engine)
+        try:
+            return engine.search_best_move(depth, time_ms)
+        finally:
+            self._searching.discard(engine)
+
+    async def op_engine(self, request, conn):
+        session = self._session(request, conn)
+        if session.busy:
+            raise ProtocolError('engine is thinking in this game')
+        if session.over:
+            raise ProtocolError('game is over')
+        depth = max(1, min(int(request.get('depth', 4)), MAX_ENGINE_DEPTH))
+        time_ms = max(0, min(int(request.get('time_ms', 100)), self.max_engine_ms))
+        session.busy = True
+        try:
+            snapshot = session.bridge.clone()
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._search, snapshot, depth, time_ms)
+        finally:
+            session.busy = False
+        response = {
+            'move': [*result['move'][0], *result['move'][1]] if result['move'] else None,
+            'score': result['score'],
+            'depth': result['depth'],
+            'nodes': result['nodes'],
+            'time_ms': result['time_ms'],
+        }
+        if request.get('play') and result['move'] is not None:
+            if self.pool.games.get(session.id) is not session:
+                raise ProtocolError('game was closed')
+            delta = session.bridge.make_move_ex(*result['move'])
+            if delta is None:
+                raise ProtocolError('illegal move')
+            response.update(_move_fields(delta))
+        return response
+
+
+async def serve(host, port, unix, **options):
+    server = GameServer(**options)
+    await server.start(host, port, unix)
+    address = unix or '%s:%d' % server.addresses[0][:2]
+    # Перший рядок читає генератор навантаження, запущений з --spawn
+    print(f'listening on {address}', flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+class Client:
+    """Pipelining NDJSON client: call() may be awaited concurrently."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=7878, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _read_responses(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+
+    async def call(self, op, **fields):
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        fields.update(id=request_id, op=op)
+        self.writer.write(json.dumps(fields, separators=(',', ':')).encode() + b'\n')
+        await self.writer.drain()
+        response = await future
+        if not response['ok']:
+            raise ProtocolError(response['error'])
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._task.cancel()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _play(client, rng, max_moves, latencies):
+    clock = time.perf_counter
+    start = clock()
+    game = (await client.call('create'))['game']
+    latencies['create'].append(clock() - start)
+    moves = 0
+    over = False
+    while moves < max_moves and not over:
+        start = clock()
+        legal = bytes.fromhex((await client.call('legal', game=game, packed=True))['moves'])
+        latencies['legal'].append(clock() - start)
+        if not legal:
+            break
+        i = 2 * rng.randrange(len(legal) // 2)
+        start = clock()
+        over = (await client.call('move', game=game, **{'from': legal[i], 'to': legal[i + 1]}))['over']
+        latencies['move'].append(clock() - start)
+        moves += 1
+    await client.call('close', game=game)
+    return moves
+
+
+async def run_load(host='127.0.0.1', port=7878, unix=None, games=1000, connections=32,
+                   max_moves=60, seed=None):
+    """Play games random-move games concurrently; returns throughput and latency stats."""
+    rng = random.Random(seed)
+    clients = [await Client.connect(host, port, unix) for _ in range(connections)]
+    latencies = {'create': [], 'legal': [], 'move': []}
+    start = time.perf_counter()
+    try:
+        played = await asyncio.gather(*(
+            _play(clients[i % connections], random.Random(rng.random()), max_moves, latencies)
+            for i in range(games)))
+    finally:
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.close()
+    moves = sum(played)
+    requests = sum(len(values) for values in latencies.values()) + games
+    report = {
+        'games': games,
+        'connections': connections,
+        'moves': moves,
+        'requests': requests,
+        'seconds': round(elapsed, 3),
+        'moves_per_sec': round(moves / elapsed, 1),
+        'requests_per_sec': round(requests / elapsed, 1),
+    }
+    for op, values in latencies.items():
+        values.sort()
+        report[f'{op}_p50_ms'] = round(percentile(values, 0.50) * 1000, 3)
+        report[f'{op}_p99_ms'] = round(percentile(values, 0.99) * 1000, 3)
+    return report
+
+
+async def _spawn_server(unix=None):
+    # Окремий процес, щоб сервер і генератор не ділили один GIL
+    args = [sys.executable, '-m', 'frontend.server', 'serve']
+    args += ['--unix', unix] if unix else ['--port', '0']
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    process = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, env=env)
+    line = (await process.stdout.readline()).decode().strip()
+    if not line.startswith('listening on '):
+        process.kill()
+        raise RuntimeError(f'server failed to start: {line!r}')
+    return process, line[len('listening on '):]
+
+
+async def _load_main(args):
+    process = None
+    host, port = args.host, args.port
+    if args.spawn:
+        process, address = await _spawn_server(args.unix)
+        if not args.unix:
+            host, port = address.rsplit(':', 1)
+    try:
+        report = await run_load(host, int(port), args.unix, args.games, args.connections,
+                                args.moves, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            await process.wait()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hasami Shogi game server')
+    commands = parser.add_subparsers(dest='command', required=True)
+    srv = commands.add_parser('serve', help='run the server')
+    srv.add_argument('--host', default='127.0.0.1')
+    srv.add_argument('--port', type=int, default=7878, help='0 picks a free port')
+    srv.add_argument('--unix', help='listen on a Unix socket instead of TCP')
+    srv.add_argument('--max-games', type=int, default=10000)
+    srv.add_argument('--engine-workers', type=int, help='engine threads (default: CPU count)')
+    srv.add_argument('--max-inflight', type=int, default=64,
+                     help='unanswered requests per connection before reading pauses')
+    srv.add_argument('--max-engine-ms', type=int, default=5000)
+    load = commands.add_parser('load', help='load generator: random games over many connections')
+    load.add_argument('--host', default='127.0.0.1')
+    load.add_argument('--port', type=int, default=7878)
+    load.add_argument('--unix')
+    load.add_argument('--spawn', action='store_true',
+                      help='start a server subprocess on a free port (or --unix path) for the run')
+    load.add_argument('--games', type=int, default=1000)
+    load.add_argument('--connections', type=int, default=32)
+    load.add_argument('--moves', type=int, default=60, help='moves per game at most')
+    load.add_argument('--seed', type=int)
+    load.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, max_games=args.max_games,
+                              engine_workers=args.engine_workers, max_inflight=args.max_inflight,
+                              max_engine_ms=args.max_engine_ms))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = asyncio.run(_load_main(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f'{key:20s} {value}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
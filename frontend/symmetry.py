@@ -0,0 +1,147 @@
+# frontend/symmetry.py
+"""Board symmetries and an analysis cache shared between symmetric positions.
+
+The rules and the start position do not change under a left-right mirror
+(MIRROR) or under swapping the colours together with an up-down flip and
+the side to move (SWAP). GameBridge.get_canonical_hash returns the
+smallest position key among the four variants and the symmetry that leads
+there; every symmetry is its own inverse, so the same one maps moves of
+the canonical position back to the real board.
+
+Results are stored in the canonical frame: transform_result maps the move
+fields ('move', 'pv', 'root_moves'); scores and tablebase entries are for
+the side to move and stay as they are.
+"""
+from collections import OrderedDict
+
+from .cpp_bridge import BOARD_SIZE
+
+IDENTITY = 0
+MIRROR = 1
+SWAP = 2
+MIRROR_SWAP = MIRROR | SWAP
+SYMMETRIES = (IDENTITY, MIRROR, SWAP, MIRROR_SWAP)
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def transform_square(square, symmetry):
+    """(row, col) on the board after symmetry."""
+    row, col = square
+    if symmetry & MIRROR:
+        col = BOARD_SIZE - 1 - col
+    if symmetry & SWAP:
+        row = BOARD_SIZE - 1 - row
+    return row, col
+
+
+def transform_move(move, symmetry):
+    """((row, col), (row, col)) after symmetry; None stays None."""
+    if move is None or symmetry == IDENTITY:
+        return move
+    return transform_square(move[0], symmetry), transform_square(move[1], symmetry)
+
+
+def transform_color(color, symmetry):
+    """'black' / 'white' after symmetry (SWAP exchanges them)."""
+    if symmetry & SWAP and color in ('black', 'white'):
+        return 'white' if color == 'black' else 'black'
+    return color
+
+
+def transform_result(result, symmetry):
+    """Copy of a search, MCTS or book result with its moves mapped by symmetry."""
+    if symmetry == IDENTITY or not isinstance(result, dict):
+        return result
+    mapped = dict(result)
+    if 'move' in mapped:
+        mapped['move'] = transform_move(mapped['move'], symmetry)
+    if 'pv' in mapped:
+        mapped['pv'] = [transform_move(move, symmetry) for move in mapped['pv']]
+    if 'root_moves' in mapped:
+        mapped['root_moves'] = [(transform_move(move, symmetry),) + tuple(rest)
+                                for move, *rest in mapped['root_moves']]
+    return mapped
+
+
+def canonical_key(bridge):
+    """(key, symmetry) for the position of bridge, captures included.
+
+    The native key covers the board and the side to move; the capture
+    counts (swapped along with the colours) keep positions reached by
+    set_position with unusual counts apart.
+    """
+    key, symmetry = bridge.get_canonical_hash()
+    captures = bridge.get_captures()
+    black, white = captures['black'], captures['white']
+    if symmetry & SWAP:
+        black, white = white, black
+    return (key, black, white), symmetry
+
+
+class AnalysisCache:
+    """Bounded LRU map from (canonical key, analysis kind) to a result.
+
+    Values are stored as given; callers put results already mapped into
+    the canonical frame (see GameController.cached_analysis).
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        if max_entries < 0:
+            raise ValueError('max_entries must be >= 0')
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Cached value for key (marking it most recently used) or default."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value, evicting the least recently used entries over max_entries."""
+        if self.max_entries == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, max_entries):
+        """Change the size limit, evicting the oldest entries if needed."""
+        if max_entries < 0:
+            raise ValueError('max_entries must be >= 0')
+        self.max_entries = max_entries
+        while len(self._entries) > max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all entries; statistics are kept."""
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,301 @@
+# frontend/tablebase.py
+"""Endgame tablebases: exact results for positions with few pieces per side.
+
+Tables are generated offline by the native hasami_tbgen tool (retrograde
+analysis over every placement of 1..K pieces of each colour, see
+backend/include/tablebase.hpp) and probed in place: the file is
+memory-mapped once and the engine reads one 16-bit entry per probe.
+
+A position is covered when each side has at most K pieces, the capture
+counts match the pieces on the board (9 - pieces left, as in a real game)
+and the game is not over. Results are for the side to move: 'win',
+'loss' or 'draw', with the distance to the end in plies for wins and
+losses. Repetitions are ignored, so 'draw' means neither side can force
+a win.
+
+File layout (little-endian):
+
+    header     magic b'HSTB', u16 version, u16 max pieces, u32 table count, u32 reserved
+    directory  per table: u8 black, u8 white, 6 reserved bytes, u64 data offset,
+               u64 positions
+    data       u16 per position: bits 14-15 result (0 draw, 1 win, 2 loss),
+               bits 0-13 distance
+
+    python -m frontend.tablebase generate endgame.hstb --pieces 2
+    python -m frontend.tablebase info endgame.hstb
+    python -m frontend.tablebase bench endgame.hstb --probes 100000
+    python -m frontend.tablebase verify endgame.hstb --positions 200
+"""
+import argparse
+import ctypes
+import math
+import mmap
+import os
+import random
+import struct
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from .cpp_bridge import GameBridge, TABLEBASE_RESULTS, BOARD_CELLS, EMPTY, BLACK, WHITE, _np
+
+MAGIC = b'HSTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+DIRECTORY_ENTRY = struct.Struct('<BBxxxxxxQQ')
+START_PIECES = 9
+# Searcher::MATE_SCORE: виграш за d півходів пошук оцінює як MATE_SCORE - d
+MATE_SCORE = 30000
+
+TBGEN_NAMES = ('hasami_tbgen', 'hasami_tbgen.exe')
+
+TableInfo = namedtuple('TableInfo', ['black', 'white', 'offset', 'positions'])
+
+
+def index_of(black_squares, white_squares, side):
+    """Entry index in the (black, white) table, as tablebase::indexOf.
+
+    Squares are sorted row * 9 + col lists; side is 'black' or 'white'.
+    """
+    # Комбінаторний номер множини: sum C(s_i, i + 1); білі - серед клітинок без чорних
+    black_rank = sum(math.comb(square, i + 1) for i, square in enumerate(black_squares))
+    white_rank = sum(math.comb(square - sum(b < square for b in black_squares), i + 1)
+                     for i, square in enumerate(white_squares))
+    index = black_rank * math.comb(BOARD_CELLS - len(black_squares), len(white_squares)) + white_rank
+    return index << 1 | (side == 'white')
+
+
+def find_generator():
+    """Path of the hasami_tbgen executable, from HASAMI_TBGEN or the usual build directories."""
+    if os.environ.get('HASAMI_TBGEN'):
+        return Path(os.environ['HASAMI_TBGEN'])
+    backend = Path(__file__).resolve().parent.parent / 'backend'
+    for build in ('build', 'biuld'):
+        for subdir in ('bin', 'bin/Release', 'bin/Debug', 'Release', 'Debug'):
+            for name in TBGEN_NAMES:
+                path = backend / build / subdir / name
+                if path.exists():
+                    return path
+    return None
+
+
+def generate(path, pieces=2, max_total=None, threads=None, generator=None):
+    """Run hasami_tbgen to write tables for up to pieces per side to path.
+
+    max_total limits the pieces of both colours together (e.g. pieces=3,
+    max_total=4 adds 3 against 1 but not 3 against 2). Progress lines go
+    to stdout.
+    """
+    generator = generator or find_generator()
+    if generator is None:
+        raise FileNotFoundError('hasami_tbgen not found (set HASAMI_TBGEN or build with '
+                                'HASAMI_BUILD_TOOLS)')
+    command = [str(generator), '--pieces', str(pieces)]
+    if max_total:
+        command += ['--max-total', str(max_total)]
+    if threads:
+        command += ['--threads', str(threads)]
+    subprocess.run(command + [str(path)], check=True)
+
+
+class Tablebase:
+    """Memory-mapped tablebase file, probed through GameBridge.probe_tablebase."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            # ACCESS_COPY дає записуваний буфер для ctypes без копіювання сторінок
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'{path}: empty file')
+        self.size = len(self._data)
+        if self.size < HEADER.size:
+            self.close()
+            raise ValueError(f'{path}: not a tablebase')
+        magic, version, self.max_pieces, count, _ = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path}: not a version {VERSION} tablebase')
+        self.tables = [TableInfo(*DIRECTORY_ENTRY.unpack_from(self._data,
+                                                              HEADER.size + i * DIRECTORY_ENTRY.size))
+                       for i in range(count)]
+        if any(t.offset + 2 * t.positions > self.size for t in self.tables):
+            self.close()
+            raise ValueError(f'{path}: truncated tablebase')
+        self._buffer = (ctypes.c_ubyte * self.size).from_buffer(self._data)
+        self.address = ctypes.addressof(self._buffer)
+
+    def __len__(self):
+        return sum(t.positions for t in self.tables)
+
+    def covers(self, black, white):
+        """Whether there is a table for black against white pieces."""
+        return any(t.black == black and t.white == white for t in self.tables)
+
+    def lookup(self, black_squares, white_squares, side):
+        """Entry for a position given as sorted square lists, without the capture checks.
+
+        GameBridge.probe_tablebase checks the game in native code; this is
+        the same lookup for callers holding the squares, such as
+        frontend.py_engine. Returns {'result', 'distance'} or None.
+        """
+        for t in self.tables:
+            if t.black != len(black_squares) or t.white != len(white_squares):
+                continue
+            index = index_of(black_squares, white_squares, side)
+            if index >= t.positions:
+                return None
+            value, = struct.unpack_from('<H', self._data, t.offset + 2 * index)
+            return {'result': TABLEBASE_RESULTS[value >> 14], 'distance': value & 0x3FFF}
+        return None
+
+    def counts(self):
+        """{(black, white): {'win': n, 'loss': n, 'draw': n}}; needs NumPy."""
+        np = _np()
+        if np is None:
+            raise RuntimeError('counting results needs NumPy')
+        result = {}
+        for t in self.tables:
+            values = np.frombuffer(self._data, dtype='<u2', count=t.positions, offset=t.offset) >> 14
+            found = np.bincount(values, minlength=3)
+            result[(t.black, t.white)] = dict(zip(TABLEBASE_RESULTS, map(int, found)))
+        return result
+
+    def close(self):
+        # Буфер ctypes тримає експорт mmap - його треба звільнити першим
+        self._buffer = None
+        self.address = None
+        if getattr(self, '_data', None) is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def random_position(bridge, tablebase, rng):
+    """Set bridge to a random covered position; returns (black, white) piece counts."""
+    table = rng.choice(tablebase.tables)
+    squares = rng.sample(range(81), table.black + table.white)
+    cells = bytearray([EMPTY]) * 81
+    for i, square in enumerate(squares):
+        cells[square] = BLACK if i < table.black else WHITE
+    captures = {'black': START_PIECES - table.white, 'white': START_PIECES - table.black}
+    bridge.set_position(bytes(cells), rng.choice(('black', 'white')), captures)
+    return table.black, table.white
+
+
+def benchmark(path, probes=100000, positions=1000, seed=0):
+    """Probe latency in µs over random covered positions: mean and p99 per probe."""
+    rng = random.Random(seed)
+    bridges = []
+    with Tablebase(path) as tablebase:
+        for _ in range(positions):
+            bridge = GameBridge()
+            random_position(bridge, tablebase, rng)
+            bridges.append(bridge)
+        rounds = max(1, probes // positions)
+        samples = []
+        for bridge in bridges:
+            probe = bridge.probe_tablebase
+            start = time.perf_counter_ns()
+            for _ in range(rounds):
+                probe(tablebase)
+            samples.append((time.perf_counter_ns() - start) / rounds / 1e3)
+        samples.sort()
+        return {
+            'positions': len(tablebase),
+            'probes': rounds * len(bridges),
+            'mean_us': sum(samples) / len(samples),
+            'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        }
+
+
+def verify(path, positions=200, max_distance=5, seed=0):
+    """Check won and lost entries against the alpha-beta search.
+
+    For random positions whose result is decided within max_distance
+    plies, a search one ply deeper (to see positions without moves) must
+    find the same mate score. Returns
+    (checked, mismatches) where mismatches lists (snapshot, entry, score).
+    """
+    rng = random.Random(seed)
+    bridge = GameBridge()
+    bridge.set_repetition_limit(1000)
+    checked, mismatches = 0, []
+    attempts = 0
+    with Tablebase(path) as tablebase:
+        while checked < positions and attempts < positions * 1000:
+            attempts += 1
+            random_position(bridge, tablebase, rng)
+            entry = bridge.probe_tablebase(tablebase)
+            if entry is None or entry['result'] == 'draw' or entry['distance'] > max_distance:
+                continue
+            mate = MATE_SCORE - entry['distance']
+            expected = mate if entry['result'] == 'win' else -mate
+            # Ще один півхід: пошук бачить "немає ходів" лише у вузлі, який розгортає
+            score = bridge.search_best_move(entry['distance'] + 1)['score']
+            checked += 1
+            if score != expected:
+                mismatches.append((bridge.get_board_state(), entry, score))
+    return checked, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Endgame tablebases')
+    commands = parser.add_subparsers(dest='command', required=True)
+    make = commands.add_parser('generate', help='generate tables with hasami_tbgen')
+    make.add_argument('tablebase')
+    make.add_argument('--pieces', type=int, default=2, help='max pieces per side')
+    make.add_argument('--max-total', type=int, default=None, help='max pieces of both sides')
+    make.add_argument('--threads', type=int, default=None, help='default: all cores')
+    info = commands.add_parser('info', help='list the tables in a file')
+    info.add_argument('tablebase')
+    bench = commands.add_parser('bench', help='measure probe latency')
+    bench.add_argument('tablebase')
+    bench.add_argument('--probes', type=int, default=100000)
+    check = commands.add_parser('verify', help='compare decided entries with the search')
+    check.add_argument('tablebase')
+    check.add_argument('--positions', type=int, default=200)
+    check.add_argument('--max-distance', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        generate(args.tablebase, args.pieces, args.max_total, args.threads)
+    elif args.command == 'info':
+        with Tablebase(args.tablebase) as tablebase:
+            try:
+                counts = tablebase.counts()
+            except RuntimeError:
+                counts = {}
+            print(f'{args.tablebase}: up to {tablebase.max_pieces} pieces per side, '
+                  f'{len(tablebase):,} positions, {tablebase.size:,} bytes')
+            for t in tablebase.tables:
+                line = f'  {t.black}v{t.white}: {t.positions:14,d} positions'
+                if (t.black, t.white) in counts:
+                    c = counts[(t.black, t.white)]
+                    line += f"  win {c['win']:,}  loss {c['loss']:,}  draw {c['draw']:,}"
+                print(line)
+    elif args.command == 'bench':
+        result = benchmark(args.tablebase, args.probes)
+        print(f"{result['positions']:,} positions: {result['probes']:,} probes, "
+              f"mean {result['mean_us']:.2f} µs, p99 {result['p99_us']:.2f} µs per probe")
+    elif args.command == 'verify':
+        checked, mismatches = verify(args.tablebase, args.positions, args.max_distance)
+        for board, entry, score in mismatches[:10]:
+            print(f"mismatch: {entry['result']} in {entry['distance']}, search score {score}\n{board}")
+        print(f'{checked} decided positions checked, {len(mismatches)} mismatches')
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,37 +1,94 @@
+import argparse
+import logging
 import os
 import sys
+import time
 from pathlib import Path
 
 def setup_environment():
     # Додаємо поточну директорію до PYTHONPATH
     current_dir = Path(__file__).parent.absolute()
     sys.path.append(str(current_dir))
+    # Бібліотеку шукає frontend.cpp_bridge.find_library (або HASAMI_SHOGI_LIB);
+    # змінювати PATH/LD_LIBRARY_PATH тут марно - завантажувач їх уже прочитав
 
-    # Додаємо шлях до бібліотеки в PATH
-    if sys.platform == "win32":
-        dll_path = current_dir / "backend/build/Debug"
-        os.environ["PATH"] = str(dll_path) + os.pathsep + os.environ["PATH"]
-    else:
-        lib_path = current_dir / "backend/build/lib"
-        if "LD_LIBRARY_PATH" not in os.environ:
-            os.environ["LD_LIBRARY_PATH"] = ""
-        os.environ["LD_LIBRARY_PATH"] = str(lib_path) + os.pathsep + os.environ["LD_LIBRARY_PATH"]
+class StartupProfile:
+    """Wall-clock time of each startup stage, printed by --startup-profile."""
+
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+
+    def measure(self, name, func):
+        start = time.perf_counter()
+        result = func()
+        self.stages.append((name, time.perf_counter() - start))
+        return result
+
+    def report(self):
+        total = time.perf_counter() - self.started
+        lines = ["Startup profile:"]
+        for name, seconds in self.stages:
+            lines.append(f"  {name:32s} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':32s} {total * 1000:8.1f} ms")
+        print("\n".join(lines), file=sys.stderr)
+
+def profile_engine(profile):
+    # Ті самі кроки, що виконує MainWindow, але окремо, щоб побачити їхню вартість
+    bridge_module = profile.measure("import frontend.cpp_bridge",
+                                    lambda: __import__("frontend.cpp_bridge", fromlist=["GameBridge"]))
+    GameBridge = bridge_module.GameBridge
+    profile.measure("load library", GameBridge.load_library)
+    for name in ("find_library", "load_library"):
+        seconds = bridge_module.startup_timings.get(name)
+        if seconds is not None:
+            profile.stages.append((f"  ({name})", seconds))
+    lib = GameBridge.load_library()
+    game = profile.measure("createGame", lib.createGame)
+    lib.deleteGame(game)
 
 def main():
+    parser = argparse.ArgumentParser(description="Hasami Shogi")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print time spent in imports, library load and createGame")
+    parser.add_argument("--engine", choices=("auto", "native", "python"),
+                        help="game engine: the C++ library, the pure-Python one or auto "
+                             "(C++ if it loads; default, or HASAMI_ENGINE)")
+    args = parser.parse_args()
+
     setup_environment()
-    
+    if args.engine:
+        # GameController читає вибір рушія з HASAMI_ENGINE (frontend.cpp_bridge.bridge_class)
+        os.environ["HASAMI_ENGINE"] = args.engine
+    # Налагоджувальний вивід вимкнено за замовчуванням: HASAMI_LOG_LEVEL=DEBUG вмикає його
+    logging.basicConfig(level=os.environ.get("HASAMI_LOG_LEVEL", "WARNING").upper())
+    profile = StartupProfile() if args.startup_profile else None
+
     # Імпортуємо та запускаємо головне вікно
     try:
-        from frontend.gui.main_window import MainWindow
-        from PyQt5.QtWidgets import QApplication
-        
-        app = QApplication(sys.argv)
-        window = MainWindow()
-        window.show()
+        if profile:
+            if os.environ.get("HASAMI_ENGINE", "auto") != "python":
+                profile_engine(profile)
+            QApplication = profile.measure(
+                "import PyQt5", lambda: __import__("PyQt5.QtWidgets", fromlist=["QApplication"])).QApplication
+            MainWindow = profile.measure(
+                "import frontend.gui", lambda: __import__("frontend.gui.main_window",
+                                                          fromlist=["MainWindow"])).MainWindow
+            app = profile.measure("QApplication", lambda: QApplication(sys.argv))
+            window = profile.measure("MainWindow", MainWindow)
+            profile.measure("show", window.show)
+            profile.report()
+        else:
+            from frontend.gui.main_window import MainWindow
+            from PyQt5.QtWidgets import QApplication
+
+            app = QApplication(sys.argv)
+            window = MainWindow()
+            window.show()
         sys.exit(app.exec_())
     except Exception as e:
         print(f"Error starting application: {e}")
         input("Press Enter to exit...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()